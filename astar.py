@@ -2,6 +2,11 @@
 import random
 import heapq
 import numpy as np
+from terrain import COST_SCALE, integer_heuristic_scale, min_terrain_weight
+from utils.bucket_queue import MonotoneBucketQueue
+from utils.compact_path import format_path
+from utils.neighbor_masks import NeighborTable
+from utils.shared_grid import grid_array
 
 
 def euclidean_distance(node1, node2):
@@ -43,47 +48,35 @@ class AStarAgentGrid:
     nodes based on the sum of the cost function and the heuristic function.
     It explores the nodes in the frontier and adds the neighbors to the frontier
     based on the lowest sum of the cost function and the heuristic function.
+
+    On weighted terrain the heuristic is multiplied by the smallest terrain
+    weight of the grid so that it stays admissible. With integer_costs the
+    costs are exact fixed-point integers (see terrain.py) and the frontier is
+    a monotone bucket queue keyed by the integer f value.
     """
 
-    def __init__(self, heuristic_func):
+    def __init__(self, heuristic_func, trace=None, integer_costs=False, path_format="list",
+                 connectivity=8, corner_cutting="allow", neighbor_table=None):
         self.frontier = []  # priority queue that keeps track of the nodes to explore
         self.visited = set()  # tracks the visited nodes efficiently
         self.heuristic_func = heuristic_func  # heuristic function for the algorithm
         self.track_cost_dict = {}  # tracks the cost to reach each node
         self.track_path_dict = {}  # tracks the path to the goal
         self.nodes_expanded = 0  # counts the number of nodes expanded
+        self.trace = trace  # optional SearchTrace recording the expansion order
+        self.integer_costs = integer_costs  # exact integer costs with a bucket queue
+        self.path_format = path_format  # "list", "array" or "packed" (see utils.compact_path)
+        # legal moves come from per-cell bitmasks (see utils.neighbor_masks)
+        self.connectivity = connectivity  # 4 or 8
+        self.corner_cutting = corner_cutting  # "allow", "no_squeeze" or "forbid"
+        self.neighbor_table = neighbor_table  # precomputed for the searched grid, or None
         #print(self.heuristic_func)
 
-    def get_neighbors(self, node, grid):
-        """ "
-        Finding all valid neighbors out of 8 possible neighbors
-        of a given node in the grid.
-
-        Args:
-            node (tuple): The current grid coordinates (row, col).
-            grid (np.ndarray): The grid
-
-        Returns:
-            list[tuple]: A list of valid neighbors in a tuple (position, cost to reach them)
-        """
-        directions = [
-            (-1, 0, 1),
-            (1, 0,1),
-            (0, -1,1),
-            (0, 1,1),
-            (-1, -1, np.sqrt(2)),
-            (-1, 1, np.sqrt(2)),
-            (1, -1,np.sqrt(2)),
-            (1, 1,np.sqrt(2)),
-        ]
-        neighbors = []
-        rows, cols = grid.shape
-        for dx, dy,step_cost in directions:
-            x, y = node[0] + dx, node[1] + dy
-            if 0 <= x < rows and 0 <= y < cols and grid[x, y] != -1:
-                neighbors.append(((x, y), step_cost ))
-
-        return neighbors
+    def neighbor_table_for(self, grid):
+        """Returns the given neighbor table, or builds one for the grid."""
+        if self.neighbor_table is not None:
+            return self.neighbor_table
+        return NeighborTable(grid, self.connectivity, self.corner_cutting)
 
     def reconstruct_path(self, goal_node):
         """
@@ -93,7 +86,8 @@ class AStarAgentGrid:
             goal_node (tuple): The goal node coordinates.
 
         Returns:
-            list[tuple]: The path from the initial node to the goal node as a list of coordinates.
+            The path from the initial node to the goal node in self.path_format:
+            a list of coordinates, an (L, 2) int32 array or a PackedPath.
         """
         path = []
         current = goal_node
@@ -101,7 +95,7 @@ class AStarAgentGrid:
             path.append(current)
             current = self.track_path_dict.get(current)
         path.reverse()  # path from start to goal
-        return path
+        return format_path(path, self.path_format)
 
     def search(self, grid, initial_node, goal_node):
         """
@@ -115,11 +109,26 @@ class AStarAgentGrid:
         Returns:
             tuple: A tuple (path from initial node to goal node, number of nodes expanded)
         """
+        grid = grid_array(grid)  # a SharedGrid or its spec is searched in place
+
+        if self.integer_costs:
+            return self.search_integer_costs(grid, initial_node, goal_node)
+        neighbors_of = self.neighbor_table_for(grid).neighbors
+        heuristic_func = self.heuristic_func
+        terrain_scale = min_terrain_weight(grid)
+        if terrain_scale != 1:
+            # keeps the heuristic admissible on weighted terrain
+            heuristic_func = lambda node, goal: self.heuristic_func(node, goal) * terrain_scale
+
+        trace = self.trace
+        if trace is not None:
+            trace.start(grid.shape)
+            trace.record_push(initial_node, 0, heuristic_func(initial_node, goal_node))
 
         # Initialize the frontier with the initial node and its heuristic cost
         heapq.heappush(
             self.frontier,
-            (self.heuristic_func(initial_node, goal_node), initial_node),
+            (heuristic_func(initial_node, goal_node), initial_node),
         )
         self.track_cost_dict[initial_node] = 0
         self.track_path_dict[initial_node] = None
@@ -133,6 +142,8 @@ class AStarAgentGrid:
             # Mark as visited and count expansion
             self.visited.add(current_node)
             self.nodes_expanded += 1  # increment expanded nodes count
+            if trace is not None:
+                trace.record_expansion(current_node, self.track_cost_dict[current_node], current_cost)
 
             # if goal reached then retrace the path
             if current_node == goal_node:
@@ -142,15 +153,73 @@ class AStarAgentGrid:
                         )
 
             # Explore the neighbors of the current node
-            for neighbor, step_cost in self.get_neighbors(current_node, grid):
+            for neighbor, step_cost in neighbors_of(current_node):
                 new_cost = self.track_cost_dict[current_node] + step_cost
                 if (
                     neighbor not in self.track_cost_dict
                     or new_cost < self.track_cost_dict[neighbor]
                 ):
                     self.track_cost_dict[neighbor] = new_cost
-                    priority = new_cost + self.heuristic_func(neighbor, goal_node)
+                    priority = new_cost + heuristic_func(neighbor, goal_node)
                     heapq.heappush(self.frontier, (priority, neighbor))
                     self.track_path_dict[neighbor] = current_node
+                    if trace is not None:
+                        trace.record_push(neighbor, new_cost, priority)
+
+        return (None, self.nodes_expanded, None)  # No path found
+
+    def search_integer_costs(self, grid, initial_node, goal_node):
+        """
+        Implements A* with integer costs in units of 1/COST_SCALE.
+
+        The heuristic is scaled to integer units and rounded down, which
+        keeps it admissible and consistent for the integer step costs; the
+        frontier is a MonotoneBucketQueue keyed by the integer f value.
+
+        Returns:
+            tuple: (path, number of nodes expanded, total cost in steps)
+        """
+        neighbors_of = self.neighbor_table_for(grid).neighbors_integer
+        scale = integer_heuristic_scale(grid)
+        heuristic_func = lambda node: int(self.heuristic_func(node, goal_node) * scale)
+
+        trace = self.trace
+        if trace is not None:
+            trace.start(grid.shape)
+            trace.record_push(initial_node, 0, heuristic_func(initial_node) / COST_SCALE)
+
+        self.frontier = MonotoneBucketQueue()
+        self.frontier.push(heuristic_func(initial_node), initial_node)
+        self.track_cost_dict[initial_node] = 0
+        self.track_path_dict[initial_node] = None
+
+        while self.frontier:
+            current_priority, current_node = self.frontier.pop()
+            if current_node in self.visited:
+                continue
+            self.visited.add(current_node)
+            self.nodes_expanded += 1
+            if trace is not None:
+                trace.record_expansion(current_node, self.track_cost_dict[current_node] / COST_SCALE,
+                                       current_priority / COST_SCALE)
+
+            if current_node == goal_node:
+                return (self.reconstruct_path(goal_node),
+                        self.nodes_expanded,
+                        self.track_cost_dict[goal_node] / COST_SCALE
+                        )
+
+            for neighbor, step_cost in neighbors_of(current_node):
+                new_cost = self.track_cost_dict[current_node] + step_cost
+                if (
+                    neighbor not in self.track_cost_dict
+                    or new_cost < self.track_cost_dict[neighbor]
+                ):
+                    self.track_cost_dict[neighbor] = new_cost
+                    priority = new_cost + heuristic_func(neighbor)
+                    self.frontier.push(priority, neighbor)
+                    self.track_path_dict[neighbor] = current_node
+                    if trace is not None:
+                        trace.record_push(neighbor, new_cost / COST_SCALE, priority / COST_SCALE)
 
         return (None, self.nodes_expanded, None)  # No path found
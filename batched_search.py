@@ -0,0 +1,177 @@
+import argparse
+import time
+import numpy as np
+from distance_field import SQRT2
+from terrain import min_terrain_weight, terrain_weights
+
+
+def batched_search(grids, initial_nodes, goal_nodes, delta=None, return_paths=False):
+    """
+    Solves N independent shortest-path problems in lockstep.
+
+    The grids are padded with a blocked border and laid out one after the
+    other in a single flat array, so the 8 neighbors of a cell are the same
+    index offsets in every grid and no move can leave its own grid. Each
+    iteration relaxes, in one set of array operations for the whole batch,
+    the active cells of every problem whose distance lies within delta of
+    that problem's smallest active distance (delta-stepping with one band
+    per problem). A problem stops as soon as its goal distance is not above
+    its smallest active distance, which makes the goal distance final; the
+    path is then read back by stepping from the goal to the neighbor it was
+    reached from, again for all problems at once.
+
+    Costs are those of UCSAgentGrid (step length times the weight of the
+    entered cell). Cells can be relaxed more than once, so nodes_expanded
+    counts relaxations and can differ from the UCS count.
+
+    Args:
+        grids (np.ndarray): (N, rows, cols) grid stack.
+        initial_nodes, goal_nodes (array-like): (N, 2) start and goal cells.
+        delta (float): width of the distance bands (default: two orthogonal
+                       steps on the cheapest terrain).
+        return_paths (bool): also return the paths as lists of (row, col).
+
+    Returns:
+        dict: per-problem arrays "cost" (inf when unsolvable), "steps" (path
+              length in cells as in results.py, 0 when unsolvable) and
+              "nodes_expanded", the number of lockstep "iterations" and, with
+              return_paths, "paths" (None when unsolvable).
+    """
+    grids = np.asarray(grids)
+    n, rows, cols = grids.shape
+    width = cols + 2
+    plane = (rows + 2) * width  # flat cells per padded grid
+    free = np.zeros((n, rows + 2, width), dtype=bool)
+    free[:, 1:-1, 1:-1] = grids != -1
+    weights = np.zeros((n, rows + 2, width))
+    weights[:, 1:-1, 1:-1] = terrain_weights(grids)
+    free, weights = free.ravel(), weights.ravel()
+    flat = np.full(n * plane, np.inf)
+    if delta is None:
+        delta = 2.0 * min_terrain_weight(grids)
+
+    def flat_ids(nodes):
+        nodes = np.asarray(nodes, dtype=np.int64).reshape(n, 2)
+        return np.arange(n) * plane + (nodes[:, 0] + 1) * width + nodes[:, 1] + 1
+
+    start_ids, goal_ids = flat_ids(initial_nodes), flat_ids(goal_nodes)
+    valid = free[start_ids] & free[goal_ids]
+    flat[start_ids[valid]] = 0
+
+    offsets = np.array([-width, width, -1, 1, -width - 1, -width + 1, width - 1, width + 1])
+    step_lengths = np.array([1, 1, 1, 1, SQRT2, SQRT2, SQRT2, SQRT2])
+    nodes_expanded = np.zeros(n, dtype=np.int64)
+    done = ~valid
+    active = np.sort(start_ids[valid])
+    iterations = 0
+    while active.size:
+        # active is sorted, so the cells of a problem are contiguous
+        problem = active // plane
+        distances = flat[active]
+        first = np.flatnonzero(np.r_[True, problem[1:] != problem[:-1]])
+        minima = np.minimum.reduceat(distances, first)
+        owners = problem[first]
+        done[owners[flat[goal_ids[owners]] <= minima]] = True
+        band = np.repeat(minima, np.diff(np.r_[first, active.size])) + delta
+        keep = ~done[problem]
+        if not keep.all():
+            active, problem, distances, band = active[keep], problem[keep], distances[keep], band[keep]
+            if not active.size:
+                break
+
+        iterations += 1
+        in_band = distances <= band
+        current, later = active[in_band], active[~in_band]
+        nodes_expanded += np.bincount(problem[in_band], minlength=n)
+        targets = current[:, None] + offsets
+        # entering a cell costs its weight
+        candidates = flat[current][:, None] + step_lengths * weights[targets]
+        improved = free[targets] & (candidates < flat[targets])
+        targets, candidates = targets[improved], candidates[improved]
+        np.minimum.at(flat, targets, candidates)
+        active = np.unique(np.concatenate([later, targets]))
+
+    cost = flat[goal_ids]
+    solved = np.isfinite(cost)
+    steps = np.where(solved, 1, 0)
+    trail = []  # (problems, cells) of every step back from the goals
+    cell = goal_ids.copy()
+    walking = np.flatnonzero(solved & (cell != start_ids))
+    while walking.size:
+        at = cell[walking]
+        before = at[:, None] + offsets
+        # the cell reached from a neighbor at the neighbor's distance plus the step cost
+        totals = np.where(free[before], flat[before], np.inf) + step_lengths * weights[at][:, None]
+        cell[walking] = before[np.arange(walking.size), np.argmin(totals, axis=1)]
+        steps[walking] += 1
+        if return_paths:
+            trail.append((walking, cell[walking]))
+        walking = walking[cell[walking] != start_ids[walking]]
+
+    result = {"cost": cost, "steps": steps, "nodes_expanded": nodes_expanded, "iterations": iterations}
+    if return_paths:
+        paths = [None] * n
+        for index in np.flatnonzero(solved).tolist():
+            paths[index] = [int(goal_ids[index])]
+        for problems, cells in trail:
+            for index, flat_cell in zip(problems.tolist(), cells.tolist()):
+                paths[index].append(flat_cell)
+        for index in np.flatnonzero(solved).tolist():
+            local = np.array(paths[index][::-1]) - index * plane
+            paths[index] = [(int(r) - 1, int(c) - 1) for r, c in zip(local // width, local % width)]
+        result["paths"] = paths
+    return result
+
+
+def compare_with_sequential(grids, initial_nodes, goal_nodes):
+    """
+    Solves a batch with batched_search and one problem at a time with
+    UCSAgentGrid, and reports the throughput of both and whether the costs
+    match.
+    """
+    from ucs import UCSAgentGrid
+
+    start = time.perf_counter()
+    batch = batched_search(grids, initial_nodes, goal_nodes)
+    batched_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    costs = []
+    for grid, initial_node, goal_node in zip(grids, initial_nodes, goal_nodes):
+        _, _, total_cost = UCSAgentGrid().search(grid, tuple(initial_node), tuple(goal_node))
+        costs.append(np.inf if total_cost is None else total_cost)
+    sequential_time = time.perf_counter() - start
+
+    return {
+        "problems": len(grids),
+        "batched_seconds": batched_time,
+        "sequential_seconds": sequential_time,
+        "batched_problems_per_second": len(grids) / batched_time,
+        "sequential_problems_per_second": len(grids) / sequential_time,
+        "speedup": sequential_time / batched_time,
+        "iterations": batch["iterations"],
+        "costs_match": bool(np.allclose(batch["cost"], costs)),
+    }
+
+
+if __name__ == "__main__":
+    from grid_corpus import GridCorpus, generate_solvable_grid
+
+    parser = argparse.ArgumentParser(description="Compare batched and sequential solving of a grid stack.")
+    parser.add_argument("--problems", type=int, default=500)
+    parser.add_argument("--grid_size", type=int, nargs=2, default=[32, 32])
+    parser.add_argument("--difficulty", type=int, default=30)
+    parser.add_argument("--corpus", type=str, help="Solve the grids of a grid_corpus directory instead")
+    args = parser.parse_args()
+
+    grid_size = tuple(args.grid_size)
+    if args.corpus:
+        grids, initial_nodes, goal_nodes, _ = GridCorpus(args.corpus).batch(grid_size, args.difficulty)
+    else:
+        problems = [generate_solvable_grid(grid_size, args.difficulty, seed) for seed in range(args.problems)]
+        problems = [problem for problem in problems if problem[0] is not None]
+        grids = np.stack([grid for grid, _, _ in problems])
+        initial_nodes = [initial_node for _, initial_node, _ in problems]
+        goal_nodes = [goal_node for _, _, goal_node in problems]
+    for key, value in compare_with_sequential(grids, initial_nodes, goal_nodes).items():
+        print(f"{key}: {value}")
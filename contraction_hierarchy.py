@@ -0,0 +1,364 @@
+import argparse
+import heapq
+import math
+import time
+import numpy as np
+from distance_oracle import cell_graph
+
+# arrays stored by ContractionHierarchy.save, besides the grid shape
+index_arrays = (
+    "rank", "cells",
+    "forward_offsets", "forward_targets", "forward_costs", "forward_middles",
+    "backward_offsets", "backward_sources", "backward_costs", "backward_middles",
+)
+
+
+def local_search(out_edges, source, excluded, targets, max_cost, max_settled):
+    """
+    Dijkstra from source over the remaining graph, skipping excluded and
+    stopping once every target is settled, beyond max_cost or after
+    max_settled nodes (a witness search).
+
+    Returns:
+        dict: tentative costs of the nodes reached
+    """
+    costs = {source: 0.0}
+    frontier = [(0.0, source)]
+    settled = set()
+    remaining = len(targets)
+    while frontier and remaining and len(settled) < max_settled:
+        cost, node = heapq.heappop(frontier)
+        if node in settled:
+            continue
+        if cost > max_cost:
+            break
+        settled.add(node)
+        if node in targets:
+            remaining -= 1
+        for target, (edge_cost, _) in out_edges[node].items():
+            if target == excluded:
+                continue
+            new_cost = cost + edge_cost
+            if new_cost < costs.get(target, math.inf):
+                costs[target] = new_cost
+                heapq.heappush(frontier, (new_cost, target))
+    return costs
+
+
+def shortcuts_for(out_edges, in_edges, node, max_settled):
+    """
+    Returns the shortcuts (source, target, cost) that contracting node
+    needs: one for every in/out neighbor pair whose path through node has no
+    witness path of at most the same cost avoiding it.
+    """
+    shortcuts = []
+    targets = out_edges[node]
+    for source, (in_cost, _) in in_edges[node].items():
+        max_cost = in_cost + max((cost for target, (cost, _) in targets.items() if target != source), default=0.0)
+        witness = local_search(out_edges, source, node, targets, max_cost, max_settled)
+        for target, (out_cost, _) in targets.items():
+            if target == source:
+                continue
+            via = in_cost + out_cost
+            if witness.get(target, math.inf) > via + 1e-9:
+                shortcuts.append((source, target, via))
+    return shortcuts
+
+
+def to_csr(rows, num_nodes):
+    """Packs per-node lists of (neighbor, cost, middle) into CSR arrays."""
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(row) for row in rows])
+    flat = [edge for row in rows for edge in row]
+    neighbors = np.array([edge[0] for edge in flat], dtype=np.int32)
+    costs = np.array([edge[1] for edge in flat], dtype=np.float64)
+    middles = np.array([edge[2] for edge in flat], dtype=np.int32)
+    return offsets, neighbors, costs, middles
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy over the move graph of a static grid, for fast
+    repeated shortest-path queries.
+
+    Preprocessing contracts the free cells one by one, cheapest first by
+    edge difference (shortcuts added minus edges removed) plus the number of
+    already contracted neighbors, re-evaluated lazily. Contracting a cell
+    adds a shortcut between two of its remaining neighbors unless a witness
+    search finds a path at most as cheap without it. Every edge is then kept
+    once, from its lower-ranked end: in the forward CSR arrays (edges up to
+    higher-ranked cells) or the backward ones (edges arriving from them),
+    with the contracted middle cell of each shortcut (-1 for a move).
+
+    A query runs Dijkstra upwards from the start over the forward edges and
+    from the goal over the backward edges until neither queue can improve
+    the best meeting cell, and unpacks the shortcuts of the path found into
+    grid moves. Costs are those of UCSAgentGrid (step length times the
+    weight of the entered cell).
+
+    Attributes:
+        rank (np.ndarray): contraction order of every node.
+        cells (np.ndarray): (n, 2) cell of every node.
+        build_seconds (float): preprocessing time (0.0 when loaded).
+        shortcuts (int): shortcuts added by the contraction.
+    """
+
+    def __init__(self, grid_shape, arrays, build_seconds=0.0, shortcuts=0):
+        self.grid_shape = tuple(grid_shape)
+        for name in index_arrays:
+            setattr(self, name, arrays[name])
+        self.build_seconds = build_seconds
+        self.shortcuts = shortcuts
+        self.cell_index = np.full(self.grid_shape, -1, dtype=np.int64)
+        self.cell_index[self.cells[:, 0], self.cells[:, 1]] = np.arange(len(self.cells))
+        # queries walk the arrays edge by edge, which is fastest on Python lists
+        self.forward = self.adjacency(self.forward_offsets, self.forward_targets, self.forward_costs, self.forward_middles)
+        self.backward = self.adjacency(self.backward_offsets, self.backward_sources, self.backward_costs,
+                                       self.backward_middles)
+        self.rank_list = self.rank.tolist()
+
+    @staticmethod
+    def adjacency(offsets, neighbors, costs, middles):
+        """Returns per-node lists of (neighbor, cost, middle) from CSR arrays."""
+        edges = list(zip(neighbors.tolist(), costs.tolist(), middles.tolist()))
+        offsets = offsets.tolist()
+        return [edges[offsets[node]:offsets[node + 1]] for node in range(len(offsets) - 1)]
+
+    @classmethod
+    def build(cls, grid, connectivity=8, corner_cutting="allow", max_settled=200, verbose=False):
+        """
+        Contracts the free cells of a grid.
+
+        Args:
+            grid (np.ndarray): The grid.
+            connectivity, corner_cutting: the move rules (see utils.neighbor_masks).
+            max_settled (int): node limit of each witness search; a smaller
+                               limit builds faster but adds more shortcuts.
+            verbose (bool): prints the progress.
+
+        Returns:
+            ContractionHierarchy: the hierarchy.
+        """
+        start = time.perf_counter()
+        graph, _ = cell_graph(grid, connectivity, corner_cutting)
+        n = graph.shape[0]
+        out_edges = [{} for _ in range(n)]  # node -> {target: (cost, middle)} among uncontracted nodes
+        in_edges = [{} for _ in range(n)]
+        indptr, indices, data = graph.indptr.tolist(), graph.indices.tolist(), graph.data.tolist()
+        for source in range(n):
+            for position in range(indptr[source], indptr[source + 1]):
+                target, cost = indices[position], data[position]
+                out_edges[source][target] = (cost, -1)
+                in_edges[target][source] = (cost, -1)
+
+        deleted_neighbors = [0] * n
+
+        def priority(node):
+            """Returns (contraction priority, shortcuts) of a node."""
+            added = shortcuts_for(out_edges, in_edges, node, max_settled)
+            edge_difference = len(added) - len(out_edges[node]) - len(in_edges[node])
+            return edge_difference + deleted_neighbors[node], added
+
+        queue = [(priority(node)[0], node) for node in range(n)]
+        heapq.heapify(queue)
+        rank = np.empty(n, dtype=np.int32)
+        forward_rows, backward_rows = [None] * n, [None] * n
+        contracted, shortcuts = 0, 0
+        while queue:
+            _, node = heapq.heappop(queue)
+            # lazy update: contract only if still no worse than the next candidate
+            current, added = priority(node)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, node))
+                continue
+
+            rank[node] = contracted
+            contracted += 1
+            # the remaining edges of a node all lead to higher-ranked nodes
+            forward_rows[node] = [(target, cost, middle) for target, (cost, middle) in out_edges[node].items()]
+            backward_rows[node] = [(source, cost, middle) for source, (cost, middle) in in_edges[node].items()]
+            for source, target, cost in added:
+                if cost < out_edges[source].get(target, (math.inf, -1))[0]:
+                    out_edges[source][target] = (cost, node)
+                    in_edges[target][source] = (cost, node)
+                    shortcuts += 1
+            for target in out_edges[node]:
+                del in_edges[target][node]
+                deleted_neighbors[target] += 1
+            for source in in_edges[node]:
+                del out_edges[source][node]
+                deleted_neighbors[source] += 1
+            out_edges[node], in_edges[node] = {}, {}
+            if verbose and contracted % 10000 == 0:
+                print(f"{contracted}/{n} nodes contracted, {shortcuts} shortcuts")
+
+        arrays = {"rank": rank, "cells": np.argwhere(grid != -1).astype(np.int32)}
+        for prefix, neighbor_name, rows in (("forward", "targets", forward_rows), ("backward", "sources", backward_rows)):
+            offsets, neighbors, costs, middles = to_csr(rows, n)
+            arrays.update({f"{prefix}_offsets": offsets, f"{prefix}_{neighbor_name}": neighbors,
+                           f"{prefix}_costs": costs, f"{prefix}_middles": middles})
+        return cls(grid.shape, arrays, time.perf_counter() - start, shortcuts)
+
+    @property
+    def nbytes(self):
+        """Size of the index arrays in bytes."""
+        return sum(getattr(self, name).nbytes for name in index_arrays)
+
+    def save(self, path):
+        """Writes the index arrays to an .npz file."""
+        np.savez(path, grid_shape=np.array(self.grid_shape), shortcuts=np.array(self.shortcuts),
+                 **{name: getattr(self, name) for name in index_arrays})
+
+    @classmethod
+    def load(cls, path):
+        """Reads a hierarchy written by save."""
+        with np.load(path) as bundle:
+            arrays = {name: bundle[name] for name in index_arrays}
+            return cls(bundle["grid_shape"].tolist(), arrays, shortcuts=int(bundle["shortcuts"]))
+
+    def query(self, initial_node, goal_node) -> tuple:
+        """
+        Finds a shortest path between two cells.
+
+        Returns:
+            tuple: (path as a list of (row, col) or None, nodes settled, cost or None),
+                   like the search agents
+        """
+        source, target = int(self.cell_index[initial_node]), int(self.cell_index[goal_node])
+        if source < 0 or target < 0:
+            return None, 0, None
+        costs = ({source: 0.0}, {target: 0.0})  # forward, backward
+        parents = ({source: None}, {target: None})  # node -> (previous node, middle)
+        queues = ([(0.0, source)], [(0.0, target)])
+        settled = (set(), set())
+        graphs = (self.forward, self.backward)
+        best, meeting = (0.0, source) if source == target else (math.inf, None)
+        nodes_settled = 0
+        while True:
+            tops = [queue[0][0] if queue else math.inf for queue in queues]
+            side = 0 if tops[0] <= tops[1] else 1
+            if tops[side] >= best:
+                break
+            cost, node = heapq.heappop(queues[side])
+            if node in settled[side]:
+                continue
+            settled[side].add(node)
+            nodes_settled += 1
+            other_cost = costs[1 - side].get(node)
+            if other_cost is not None and cost + other_cost < best:
+                best, meeting = cost + other_cost, node
+            side_costs, side_parents, side_queue = costs[side], parents[side], queues[side]
+            # stall-on-demand: a node reached more cheaply from above is not on a shortest up-down path
+            if any(side_costs.get(higher, math.inf) + edge_cost < cost for higher, edge_cost, _ in graphs[1 - side][node]):
+                continue
+            for neighbor, edge_cost, middle in graphs[side][node]:
+                new_cost = cost + edge_cost
+                if new_cost < side_costs.get(neighbor, math.inf):
+                    side_costs[neighbor] = new_cost
+                    side_parents[neighbor] = (node, middle)
+                    heapq.heappush(side_queue, (new_cost, neighbor))
+
+        if meeting is None:
+            return None, nodes_settled, None
+        # hierarchy edges (from, to, middle) from the start to the goal
+        edges = []
+        node = meeting
+        while parents[0][node] is not None:
+            previous, middle = parents[0][node]
+            edges.append((previous, node, middle))
+            node = previous
+        edges.reverse()
+        node = meeting
+        while parents[1][node] is not None:
+            following, middle = parents[1][node]
+            edges.append((node, following, middle))
+            node = following
+        nodes = [source]
+        for edge in edges:
+            nodes.extend(self.unpack(*edge))
+        path = [tuple(cell) for cell in self.cells[nodes].tolist()]
+        return path, nodes_settled, best
+
+    def middle_of(self, source, target):
+        """Returns the middle node of the hierarchy edge source -> target (-1 for a move)."""
+        if self.rank_list[source] < self.rank_list[target]:
+            edges = self.forward[source]
+            other = target
+        else:
+            edges = self.backward[target]
+            other = source
+        for neighbor, _, middle in edges:
+            if neighbor == other:
+                return middle
+        raise KeyError(f"no hierarchy edge {source} -> {target}")
+
+    def unpack(self, source, target, middle):
+        """Returns the nodes after source on the grid moves that an edge stands for."""
+        nodes = []
+        stack = [(source, target, middle)]
+        while stack:
+            source, target, middle = stack.pop()
+            if middle == -1:
+                nodes.append(target)
+            else:
+                # first half on top, so the moves come out in order
+                stack.append((middle, target, self.middle_of(middle, target)))
+                stack.append((source, middle, self.middle_of(source, middle)))
+        return nodes
+
+
+def compare_with_ucs(hierarchy, grid, pairs):
+    """
+    Answers (initial, goal) pairs with the hierarchy and with UCSAgentGrid
+    and reports the preprocessing cost, index size and query speedup.
+    """
+    from ucs import UCSAgentGrid
+
+    start = time.perf_counter()
+    hierarchy_costs = [hierarchy.query(initial_node, goal_node)[2] for initial_node, goal_node in pairs]
+    hierarchy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ucs_costs = [UCSAgentGrid().search(grid, initial_node, goal_node)[2] for initial_node, goal_node in pairs]
+    ucs_time = time.perf_counter() - start
+
+    return {
+        "nodes": len(hierarchy.cells),
+        "shortcuts": hierarchy.shortcuts,
+        "build_seconds": hierarchy.build_seconds,
+        "index_bytes": hierarchy.nbytes,
+        "queries": len(pairs),
+        "hierarchy_ms_per_query": hierarchy_time * 1e3 / len(pairs),
+        "ucs_ms_per_query": ucs_time * 1e3 / len(pairs),
+        "speedup": ucs_time / hierarchy_time,
+        "break_even_queries": math.ceil(hierarchy.build_seconds / max((ucs_time - hierarchy_time) / len(pairs), 1e-12)),
+        "costs_match": all((a is None and b is None) or (a is not None and b is not None and math.isclose(a, b))
+                           for a, b in zip(hierarchy_costs, ucs_costs)),
+    }
+
+
+if __name__ == "__main__":
+    from grid_corpus import generate_solvable_grid
+
+    parser = argparse.ArgumentParser(description="Build a contraction hierarchy and compare its queries with UCS.")
+    parser.add_argument("--grid_size", type=int, nargs=2, default=[128, 128])
+    parser.add_argument("--difficulty", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--save", type=str, help="Write the index to this .npz file")
+    parser.add_argument("--load", type=str, help="Read the index from this .npz file instead of building it")
+    args = parser.parse_args()
+
+    grid, _, _ = generate_solvable_grid(tuple(args.grid_size), args.difficulty, 0)
+    if args.load:
+        hierarchy = ContractionHierarchy.load(args.load)
+    else:
+        hierarchy = ContractionHierarchy.build(grid, verbose=True)
+    if args.save:
+        hierarchy.save(args.save)
+
+    rng = np.random.default_rng(0)
+    free_cells = hierarchy.cells
+    pairs = [(tuple(free_cells[i].tolist()), tuple(free_cells[j].tolist()))
+             for i, j in rng.integers(len(free_cells), size=(args.queries, 2))]
+    for key, value in compare_with_ucs(hierarchy, grid, pairs).items():
+        print(f"{key}: {value}")
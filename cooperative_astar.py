@@ -0,0 +1,204 @@
+import heapq
+import itertools
+import time
+import numpy as np
+from distance_field import distance_field
+from utils.neighbor_masks import NeighborTable
+
+
+def distance_to_goal(grid, goal_node):
+    """
+    True shortest-path cost from every free cell to the goal (the reverse
+    distance field of the goal).
+
+    Args:
+        grid (np.ndarray): The grid.
+        goal_node (tuple): The goal coordinates (row, col).
+
+    Returns:
+        np.ndarray: float array of costs, np.inf for cells that cannot reach the goal.
+    """
+    return distance_field(grid, goal_node, reverse=True)
+
+
+class CooperativeAStarPlanner:
+    """
+    Cooperative A* (hierarchical cooperative A*, HCA*) for many agents on one grid.
+
+    Agents are planned one after another in space-time (cell, t). Every
+    planned path is written into a shared reservation table keyed by
+    (cell, time), plus the traversed edges, so later agents plan around it
+    instead of colliding. The true distance to each goal, computed once per
+    goal and reused, is the heuristic of the space-time search.
+
+    Each timestep an agent either moves to one of its 8 neighbors (cost 1 or
+    sqrt(2)) or waits in place (cost 1). Once at its goal an agent stays
+    there, so the goal cell is reserved from its arrival time on.
+    """
+
+    wait_cost = 1.0
+
+    def __init__(self, grid, max_time=None):
+        """
+        Args:
+            grid (np.ndarray): The shared grid.
+            max_time (int): planning horizon in timesteps
+                            (default: 4 * (rows + cols)).
+        """
+        self.grid = grid
+        self.max_time = max_time if max_time is not None else 4 * (grid.shape[0] + grid.shape[1])
+        self.reservations = {}  # (cell, t) -> agent id
+        self.edge_reservations = set()  # (from cell, to cell, t) moves
+        self.parked = {}  # goal cell -> time from which an agent stays there
+        self.last_reserved = {}  # cell -> latest reserved time
+        self.heuristics = {}  # goal -> distance array, reused across agents
+        self.neighbors_of = NeighborTable(grid).neighbors
+        self.nodes_expanded = 0
+
+    def heuristic_for(self, goal_node):
+        """Returns the (cached) true-distance table of a goal."""
+        if goal_node not in self.heuristics:
+            self.heuristics[goal_node] = distance_to_goal(self.grid, goal_node)
+        return self.heuristics[goal_node]
+
+    def is_free(self, cell, t):
+        """Returns True if no agent occupies cell at time t."""
+        if (cell, t) in self.reservations:
+            return False
+        parked_since = self.parked.get(cell)
+        return parked_since is None or t < parked_since
+
+    def reserve(self, agent_id, path):
+        """Writes a path (one cell per timestep) into the reservation table."""
+        for t, cell in enumerate(path):
+            self.reservations[(cell, t)] = agent_id
+            self.last_reserved[cell] = max(self.last_reserved.get(cell, -1), t)
+            if t:
+                self.edge_reservations.add((path[t - 1], cell, t))
+        self.parked[path[-1]] = len(path) - 1
+
+    def plan_agent(self, agent_id, initial_node, goal_node):
+        """
+        Space-time A* for one agent against the current reservations.
+
+        Returns:
+            tuple: (path as one cell per timestep or None, cost or None)
+        """
+        distances = self.heuristic_for(goal_node)
+        if not np.isfinite(distances[initial_node]):
+            return None, None
+        counter = itertools.count()  # tie breaker for equal priorities
+        start = (initial_node, 0)
+        frontier = [(distances[initial_node], next(counter), 0.0, start)]
+        parents = {start: None}
+        best_cost = {start: 0.0}
+        closed = set()
+        while frontier:
+            _, _, cost, state = heapq.heappop(frontier)
+            if state in closed:
+                continue
+            closed.add(state)
+            self.nodes_expanded += 1
+            cell, t = state
+            # the agent stays at its goal, so nobody may need the cell later
+            if cell == goal_node and self.last_reserved.get(cell, -1) < t:
+                path = []
+                while state is not None:
+                    path.append(state[0])
+                    state = parents[state]
+                path.reverse()
+                return path, cost
+            if t >= self.max_time:
+                continue
+            moves = self.neighbors_of(cell) + [(cell, self.wait_cost)]
+            for neighbor, step_cost in moves:
+                if not self.is_free(neighbor, t + 1):
+                    continue
+                if (neighbor, cell, t + 1) in self.edge_reservations:
+                    continue  # would swap places with another agent
+                next_state = (neighbor, t + 1)
+                new_cost = cost + step_cost
+                if next_state in closed or new_cost >= best_cost.get(next_state, np.inf):
+                    continue
+                best_cost[next_state] = new_cost
+                parents[next_state] = state
+                heapq.heappush(frontier, (new_cost + distances[neighbor], next(counter),
+                                          new_cost, next_state))
+        return None, None
+
+    def plan_all(self, agents):
+        """
+        Plans all agents cooperatively, in the given (priority) order.
+
+        Args:
+            agents (list[tuple]): (initial node, goal node) per agent.
+
+        Returns:
+            tuple: (list of paths (None where planning failed), stats dict with
+                    planned/failed counts, elapsed time and agents planned per second)
+        """
+        started = time.perf_counter()
+        # every agent occupies its start cell at time 0
+        for agent_id, (initial_node, _) in enumerate(agents):
+            self.reservations[(initial_node, 0)] = agent_id
+            self.last_reserved[initial_node] = max(self.last_reserved.get(initial_node, -1), 0)
+        paths = []
+        costs = []
+        for agent_id, (initial_node, goal_node) in enumerate(agents):
+            path, cost = self.plan_agent(agent_id, initial_node, goal_node)
+            if path is not None:
+                self.reserve(agent_id, path)
+            else:
+                # an agent without a plan stays on its start cell
+                self.parked[initial_node] = 0
+                self.last_reserved[initial_node] = self.max_time
+            paths.append(path)
+            costs.append(cost)
+        elapsed = time.perf_counter() - started
+        planned = sum(path is not None for path in paths)
+        stats = {
+            "agents": len(agents),
+            "planned": planned,
+            "failed": len(agents) - planned,
+            "elapsed": elapsed,
+            "agents_per_second": len(agents) / elapsed if elapsed > 0 else float("inf"),
+            "nodes_expanded": self.nodes_expanded,
+            "total_cost": float(sum(cost for cost in costs if cost is not None)),
+        }
+        return paths, stats
+
+
+def find_conflicts(paths):
+    """
+    Lists vertex conflicts (two agents in one cell at the same time) and edge
+    conflicts (two agents swapping cells) between planned paths; agents stay
+    at their last cell after arriving.
+
+    Returns:
+        list[tuple]: ("vertex", t, cell, agent a, agent b) or ("edge", t, cell, agent a, agent b)
+    """
+    horizon = max((len(path) for path in paths if path), default=0)
+    conflicts = []
+    for t in range(horizon):
+        occupied = {}
+        for agent_id, path in enumerate(paths):
+            if not path:
+                continue  # the agent has no plan
+            cell = path[min(t, len(path) - 1)]
+            if cell in occupied:
+                conflicts.append(("vertex", t, cell, occupied[cell], agent_id))
+            occupied[cell] = agent_id
+        if t == 0:
+            continue
+        moves = {}
+        for agent_id, path in enumerate(paths):
+            if not path:
+                continue
+            before, after = path[min(t - 1, len(path) - 1)], path[min(t, len(path) - 1)]
+            if before != after:
+                moves[(before, after)] = agent_id
+        for (before, after), agent_id in moves.items():
+            other = moves.get((after, before))
+            if other is not None and agent_id < other:
+                conflicts.append(("edge", t, before, agent_id, other))
+    return conflicts
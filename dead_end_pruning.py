@@ -0,0 +1,231 @@
+import numpy as np
+from utils.neighbor_masks import NeighborTable
+
+
+def biconnected_blocks(table):
+    """
+    Splits the free cells of a grid into biconnected blocks (Tarjan's
+    algorithm, iterative). Cells in more than one block are the articulation
+    points; a free cell without neighbors forms a block of its own.
+
+    Args:
+        table (NeighborTable): legal moves of the grid.
+
+    Returns:
+        list[list[int]]: the flat cell ids (row * cols + col) of every block.
+    """
+    rows, cols = table.grid.shape
+    flat_masks = table.masks.ravel().tolist()
+    # mask -> flat id offsets of its moves
+    offsets = [[dx * cols + dy for dx, dy, _ in moves_of] for moves_of in table.move_lists]
+    free_cells = np.flatnonzero(table.grid.ravel() != -1).tolist()
+
+    discovered = [-1] * (rows * cols)
+    low = [0] * (rows * cols)
+    time = 0
+    blocks = []
+    for root in free_cells:
+        if discovered[root] != -1:
+            continue
+        discovered[root] = low[root] = time
+        time += 1
+        if not flat_masks[root]:
+            blocks.append([root])
+            continue
+        stack = [(root, -1, iter(offsets[flat_masks[root]]))]
+        visited_cells = [root]  # cells whose block is not complete yet
+        while stack:
+            cell, parent, remaining = stack[-1]
+            for offset in remaining:
+                neighbor = cell + offset
+                if discovered[neighbor] == -1:
+                    discovered[neighbor] = low[neighbor] = time
+                    time += 1
+                    visited_cells.append(neighbor)
+                    stack.append((neighbor, cell, iter(offsets[flat_masks[neighbor]])))
+                    break
+                if neighbor != parent and discovered[neighbor] < low[cell]:
+                    low[cell] = discovered[neighbor]
+            else:
+                stack.pop()
+                if not stack:
+                    continue
+                above = stack[-1][0]
+                if low[cell] < low[above]:
+                    low[above] = low[cell]
+                if low[cell] >= discovered[above]:
+                    # above separates the subtree of cell: it closes a block
+                    block = [above]
+                    while True:
+                        member = visited_cells.pop()
+                        block.append(member)
+                        if member == cell:
+                            break
+                    blocks.append(block)
+    return blocks
+
+
+class DeadEndPruner:
+    """
+    Per-map preprocessing that prunes the regions no path between two given
+    cells can use.
+
+    The free cells are split into biconnected blocks joined at articulation
+    points, forming the block-cut tree of every connected component. A
+    simple (in particular a shortest) path from start to goal only uses the
+    blocks on the tree path between the blocks of its endpoints; everything
+    else is a dead end hanging off that path, or lies in another component.
+    At query time only those blocks are kept: the legal-move masks are
+    restricted to them and the agents never enter the pruned cells.
+
+    The preprocessing is stored compactly: the cells of each block as CSR
+    arrays (block_ptr, block_cells), the tree node of every cell (home) and
+    the parent and depth of every tree node.
+    """
+
+    def __init__(self, grid, connectivity=8, corner_cutting="allow"):
+        """
+        Args:
+            grid (np.ndarray): The grid.
+            connectivity, corner_cutting: the move rules of the searches
+                                          (see utils.neighbor_masks).
+        """
+        self.grid = grid
+        self.table = NeighborTable(grid, connectivity, corner_cutting)
+        blocks = biconnected_blocks(self.table)
+        self.num_blocks = len(blocks)
+        self.block_ptr = np.zeros(len(blocks) + 1, dtype=np.int64)
+        self.block_ptr[1:] = np.cumsum([len(block) for block in blocks])
+        self.block_cells = np.array([cell for block in blocks for cell in block], dtype=np.int32)
+
+        # tree nodes: blocks 0..num_blocks-1, then one node per articulation point
+        memberships = np.bincount(self.block_cells, minlength=grid.size)
+        self.cut_cells = np.flatnonzero(memberships > 1)
+        cut_node = np.full(grid.size, -1, dtype=np.int64)
+        cut_node[self.cut_cells] = self.num_blocks + np.arange(len(self.cut_cells))
+        block_of_member = np.repeat(np.arange(self.num_blocks), np.diff(self.block_ptr))
+        self.home = np.full(grid.size, -1, dtype=np.int64)
+        self.home[self.block_cells] = block_of_member
+        self.home[self.cut_cells] = cut_node[self.cut_cells]
+
+        num_nodes = self.num_blocks + len(self.cut_cells)
+        adjacency = [[] for _ in range(num_nodes)]
+        is_cut = cut_node[self.block_cells] >= 0
+        for block, cell in zip(block_of_member[is_cut].tolist(), self.block_cells[is_cut].tolist()):
+            adjacency[block].append(int(cut_node[cell]))
+            adjacency[int(cut_node[cell])].append(block)
+
+        # root every tree of the forest (one per component) by BFS
+        self.parent = np.full(num_nodes, -1, dtype=np.int64)
+        self.depth = np.full(num_nodes, -1, dtype=np.int64)
+        self.tree = np.full(num_nodes, -1, dtype=np.int64)
+        parent, depth, tree = self.parent.tolist(), self.depth.tolist(), self.tree.tolist()
+        for root in range(num_nodes):
+            if depth[root] != -1:
+                continue
+            depth[root] = 0
+            tree[root] = root
+            queue = [root]
+            for node in queue:
+                for neighbor in adjacency[node]:
+                    if depth[neighbor] == -1:
+                        depth[neighbor] = depth[node] + 1
+                        parent[neighbor] = node
+                        tree[neighbor] = root
+                        queue.append(neighbor)
+        self.parent[:], self.depth[:], self.tree[:] = parent, depth, tree
+
+    def tree_path(self, start, goal):
+        """Returns the block-cut tree nodes between two cells, or None if unconnected."""
+        cols = self.grid.shape[1]
+        a = int(self.home[start[0] * cols + start[1]])
+        b = int(self.home[goal[0] * cols + goal[1]])
+        if a < 0 or b < 0 or self.tree[a] != self.tree[b]:
+            return None
+        path_a, path_b = [a], [b]
+        while a != b:
+            if self.depth[a] >= self.depth[b]:
+                a = int(self.parent[a])
+                path_a.append(a)
+            else:
+                b = int(self.parent[b])
+                path_b.append(b)
+        return path_a + path_b[-2::-1]
+
+    def relevant_mask(self, start, goal):
+        """
+        Returns a boolean mask of the cells a path from start to goal may use:
+        the cells of the blocks on the tree path between them.
+        """
+        mask = np.zeros(self.grid.size, dtype=bool)
+        nodes = self.tree_path(start, goal)
+        if nodes is None:
+            return mask.reshape(self.grid.shape)
+        for node in nodes:
+            if node < self.num_blocks:
+                mask[self.block_cells[self.block_ptr[node]:self.block_ptr[node + 1]]] = True
+        return mask.reshape(self.grid.shape)
+
+    def pruned_table(self, start, goal):
+        """
+        Returns a NeighborTable of the grid without the moves into cells that
+        cannot lie on a path from start to goal; pass it to an agent as its
+        neighbor_table.
+        """
+        return self.table.restricted_to(self.relevant_mask(start, goal))
+
+    def stats(self, start=None, goal=None):
+        """
+        Summarizes the preprocessing; with start and goal also the number of
+        free cells pruned for that query.
+        """
+        free = int(np.count_nonzero(self.grid != -1))
+        stats = {
+            "free_cells": free,
+            "blocks": self.num_blocks,
+            "articulation_points": len(self.cut_cells),
+            "components": int(np.count_nonzero(self.depth == 0)),
+        }
+        if start is not None and goal is not None:
+            stats["pruned_cells"] = free - int(np.count_nonzero(self.relevant_mask(start, goal)))
+        return stats
+
+
+def compare_expansions(pruner, agent_factory, start, goal):
+    """
+    Runs an agent with and without pruning and reports the expansions avoided.
+
+    Args:
+        pruner (DeadEndPruner): the preprocessed map.
+        agent_factory (callable): builds a fresh UCS or A* agent.
+
+    Returns:
+        dict: expansions and costs of both searches and the expansions avoided.
+    """
+    _, plain_expanded, plain_cost = agent_factory().search(pruner.grid, start, goal)
+    agent = agent_factory()
+    agent.neighbor_table = pruner.pruned_table(start, goal)
+    _, pruned_expanded, pruned_cost = agent.search(pruner.grid, start, goal)
+    return {
+        "nodes_expanded": plain_expanded,
+        "nodes_expanded_pruned": pruned_expanded,
+        "expansions_avoided": plain_expanded - pruned_expanded,
+        "cost": plain_cost,
+        "cost_pruned": pruned_cost,
+        **pruner.stats(start, goal),
+    }
+
+
+if __name__ == "__main__":
+    from grid_search import GridSearch
+    from ucs import UCSAgentGrid
+
+    # expansions avoided by UCS on random 32x32 maps
+    for difficulty in (50, 60, 70, 80, 90):
+        expanded = avoided = 0
+        for _ in range(20):
+            grid, initial_node, goal_node = GridSearch((32, 32), difficulty).get_state()
+            result = compare_expansions(DeadEndPruner(grid), UCSAgentGrid, initial_node, goal_node)
+            expanded += result["nodes_expanded"]
+            avoided += result["expansions_avoided"]
+        print(f"difficulty {difficulty}: {avoided} of {expanded} expansions avoided")
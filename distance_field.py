@@ -0,0 +1,127 @@
+import numpy as np
+from terrain import min_terrain_weight, terrain_weights
+
+SQRT2 = np.sqrt(2)
+
+
+def relax_to_convergence(distances, grid, reverse=False, delta=None, seeds=None):
+    """
+    Relaxes a distance array in place until it is a shortest-distance field.
+
+    Works on a flattened copy of the grid padded with a blocked border, so
+    the 8 neighbors of a cell are fixed index offsets and need no bounds
+    checks. Each iteration takes the active cells (those improved in the
+    previous iteration) whose distance lies within delta of the smallest
+    active distance, relaxes all their 8 neighbors at once with array
+    operations and makes the improved neighbors active (delta-stepping).
+    There is no Python loop per cell, only per wavefront step.
+
+    Args:
+        distances (np.ndarray): float array, finite at the sources (seeds),
+                                np.inf elsewhere.
+        grid (np.ndarray): The grid (-1 blocked, terrain weights elsewhere).
+        reverse (bool): False gives the cost from the sources (moving into a
+                        cell costs its weight); True gives the cost to reach
+                        the sources (the cost-to-go field).
+        delta (float): width of the distance band relaxed per iteration
+                       (default: two orthogonal steps on the cheapest terrain).
+        seeds (np.ndarray): boolean mask of the cells to start relaxing from
+                            (default: every finite cell). Cells that already
+                            form a consistent field need not be seeds.
+
+    Returns:
+        int: the number of iterations performed.
+    """
+    rows, cols = grid.shape
+    width = cols + 2
+    free = np.zeros((rows + 2, width), dtype=bool)
+    free[1:-1, 1:-1] = grid != -1
+    weights = np.zeros((rows + 2, width))
+    weights[1:-1, 1:-1] = terrain_weights(grid)
+    padded = np.full((rows + 2, width), np.inf)
+    padded[1:-1, 1:-1] = np.where(free[1:-1, 1:-1], distances, np.inf)
+    free, weights, flat = free.ravel(), weights.ravel(), padded.ravel()
+    if delta is None:
+        delta = 2.0 * min_terrain_weight(grid)
+
+    offsets = np.array([-width, width, -1, 1, -width - 1, -width + 1, width - 1, width + 1])
+    step_lengths = np.array([1, 1, 1, 1, SQRT2, SQRT2, SQRT2, SQRT2])
+    if seeds is None:
+        active = np.flatnonzero(np.isfinite(flat))
+    else:
+        padded_seeds = np.zeros((rows + 2, width), dtype=bool)
+        padded_seeds[1:-1, 1:-1] = seeds
+        active = np.flatnonzero(padded_seeds.ravel() & np.isfinite(flat))
+    iterations = 0
+    while active.size:
+        iterations += 1
+        active_distances = flat[active]
+        in_band = active_distances <= active_distances.min() + delta
+        current, later = active[in_band], active[~in_band]
+
+        targets = current[:, None] + offsets
+        if reverse:
+            # leaving a cell costs its weight
+            candidates = flat[current][:, None] + step_lengths * weights[current][:, None]
+        else:
+            # entering a cell costs its weight
+            candidates = flat[current][:, None] + step_lengths * weights[targets]
+        improved = free[targets] & (candidates < flat[targets])
+        targets, candidates = targets[improved], candidates[improved]
+        np.minimum.at(flat, targets, candidates)
+        active = np.unique(np.concatenate([later, targets]))
+
+    distances[...] = padded[1:-1, 1:-1]
+    return iterations
+
+
+def distance_field(grid, sources, reverse=False):
+    """
+    Shortest-path costs from the source cell(s) to every cell of the grid.
+
+    Returns the same costs UCSAgentGrid computes from a source (up to float
+    rounding of the summation order).
+
+    Args:
+        grid (np.ndarray): The grid.
+        sources (tuple or list[tuple]): one (row, col) or a list of them.
+        reverse (bool): True computes the cost from every cell to the sources.
+
+    Returns:
+        np.ndarray: float array of costs, np.inf where unreachable.
+    """
+    distances = np.full(grid.shape, np.inf)
+    if isinstance(sources, tuple):
+        sources = [sources]
+    for node in sources:
+        if grid[node] != -1:
+            distances[node] = 0.0
+    relax_to_convergence(distances, grid, reverse=reverse)
+    return distances
+
+
+def is_solvable(grid, initial_node, goal_node):
+    """Returns True if the goal can be reached from the initial node."""
+    return bool(np.isfinite(distance_field(grid, initial_node)[goal_node]))
+
+
+class DistanceFieldHeuristic:
+    """
+    Exact cost-to-go oracle usable as the heuristic_func of AStarAgentGrid.
+
+    The cost-to-go field of the goal is computed once; every heuristic call is
+    then an array lookup, and A* expands only the nodes of optimal paths.
+
+    The agents multiply every heuristic by min_terrain_weight(grid), so the
+    field is stored divided by that weight: the product is the exact
+    cost-to-go, which stays admissible on weighted terrain.
+    """
+
+    def __init__(self, grid, goal_node):
+        self.goal_node = goal_node
+        self.field = distance_field(grid, goal_node, reverse=True) / min_terrain_weight(grid)
+
+    def __call__(self, node, goal_node):
+        if goal_node != self.goal_node:
+            raise ValueError(f"Heuristic was built for goal {self.goal_node}, not {goal_node}")
+        return self.field[node]
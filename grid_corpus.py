@@ -0,0 +1,224 @@
+import argparse
+import json
+import os
+import random
+import numpy as np
+from scipy import ndimage
+from grid_search import GridSearch
+
+index_name = "index.json"
+
+
+def generate_solvable_grid(grid_size, difficulty, seed, max_attempts=1000):
+    """
+    Generates the solvable grid of one (size, difficulty, seed) key.
+
+    The random generator is seeded from the whole key, so every key yields
+    the same grid on every machine, independently of the other keys; the
+    global random state is restored afterwards.
+
+    Returns:
+        tuple: (grid, initial node, goal node), or (None, None, None) if no
+               solvable grid was found within max_attempts
+    """
+    state = random.getstate()
+    random.seed(f"{grid_size[0]}x{grid_size[1]}-{difficulty}-{seed}")
+    try:
+        for _ in range(max_attempts):
+            game = GridSearch(grid_size, difficulty=difficulty)
+            # solvable when start and goal share an 8-connected component of free cells
+            components, _ = ndimage.label(game.grid != -1, structure=np.ones((3, 3)))
+            if components[game.initial_node] == components[game.goal_node]:
+                return game.grid, game.initial_node, game.goal_node
+        return None, None, None
+    finally:
+        random.setstate(state)
+
+
+def build_corpus(directory, grid_sizes, difficulties, seeds, max_attempts=1000, compressed=False, verbose=True,
+                 max_failures=5):
+    """
+    Generates the solvable grids of every (size, difficulty, seed) once and
+    stores them under directory: one (N, rows, cols) int8 stack per grid
+    size, as a memory-mappable .npy file (or a compressed .npz with
+    compressed=True), and an index.json listing, for every grid, its key,
+    stack, position in the stack and start/goal nodes.
+
+    Args:
+        grid_sizes (list[tuple]): (rows, cols) sizes.
+        difficulties (list[int]): percentages of blocked cells.
+        seeds (int or list[int]): seeds per (size, difficulty); an int n means range(n).
+        max_failures (int): consecutive seeds without a solvable grid after
+                            which a (size, difficulty) is given up; the
+                            seed it stopped at is listed in index["gave_up"].
+
+    Returns:
+        GridCorpus: the corpus just written.
+    """
+    if isinstance(seeds, int):
+        seeds = range(seeds)
+    os.makedirs(directory, exist_ok=True)
+    index = {"compressed": compressed, "stacks": {}, "entries": [], "failures": [], "gave_up": []}
+    stacks = {}
+    for grid_size in grid_sizes:
+        rows, cols = grid_size
+        name = f"grids_{rows}x{cols}"
+        grids = []
+        for difficulty in difficulties:
+            consecutive_failures = 0
+            for seed in seeds:
+                grid, initial_node, goal_node = generate_solvable_grid(grid_size, difficulty, seed, max_attempts)
+                if grid is None:
+                    index["failures"].append({"grid_size": [rows, cols], "difficulty": difficulty, "seed": seed})
+                    consecutive_failures += 1
+                    if consecutive_failures >= max_failures:
+                        # the remaining seeds would almost surely fail too
+                        index["gave_up"].append({"grid_size": [rows, cols], "difficulty": difficulty, "seed": seed})
+                        if verbose:
+                            print(f"{rows}x{cols} difficulty {difficulty}: gave up after {consecutive_failures} "
+                                  f"failed seeds")
+                        break
+                    continue
+                consecutive_failures = 0
+                index["entries"].append({
+                    "grid_size": [rows, cols],
+                    "difficulty": difficulty,
+                    "seed": seed,
+                    "stack": name,
+                    "position": len(grids),
+                    "initial_node": list(initial_node),
+                    "goal_node": list(goal_node),
+                })
+                grids.append(grid)
+            if verbose:
+                print(f"{rows}x{cols} difficulty {difficulty}: {len(grids)} grids stored")
+        stacks[name] = np.stack(grids) if grids else np.zeros((0, rows, cols), dtype=np.int8)
+        index["stacks"][name] = name + (".npz" if compressed else ".npy")
+
+    if compressed:
+        for name, stack in stacks.items():
+            np.savez_compressed(os.path.join(directory, index["stacks"][name]), grids=stack)
+    else:
+        for name, stack in stacks.items():
+            np.save(os.path.join(directory, index["stacks"][name]), stack)
+    with open(os.path.join(directory, index_name), "w") as f:
+        json.dump(index, f, indent=4)
+    return GridCorpus(directory)
+
+
+class GridCorpus:
+    """
+    Read access to a corpus written by build_corpus.
+
+    .npy stacks are memory-mapped, so opening a large corpus reads only the
+    index; the grids returned are read-only views, identical byte for byte
+    for every runner and agent.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, index_name)) as f:
+            self.index = json.load(f)
+        self.stacks = {}  # stack name -> array, opened on first use
+        self.problems = {}  # (rows, cols, difficulty) -> entries in seed order
+        for entry in self.index["entries"]:
+            key = (*entry["grid_size"], entry["difficulty"])
+            self.problems.setdefault(key, []).append(entry)
+        self.failures = {}  # (rows, cols, difficulty) -> number of seeds without a solvable grid
+        for failure in self.index.get("failures", []):
+            key = (*failure["grid_size"], failure["difficulty"])
+            self.failures[key] = self.failures.get(key, 0) + 1
+        # (rows, cols, difficulty) keys whose generation stopped after repeated failures
+        self.gave_up = {(*entry["grid_size"], entry["difficulty"]) for entry in self.index.get("gave_up", [])}
+
+    def __len__(self):
+        return len(self.index["entries"])
+
+    def stack(self, name):
+        """Returns the (N, rows, cols) grid stack of a grid size."""
+        if name not in self.stacks:
+            path = os.path.join(self.directory, self.index["stacks"][name])
+            if path.endswith(".npz"):
+                with np.load(path) as bundle:
+                    self.stacks[name] = bundle["grids"]
+            else:
+                self.stacks[name] = np.load(path, mmap_mode="r")
+        return self.stacks[name]
+
+    def count(self, grid_size, difficulty):
+        """Returns the number of grids stored for a size and difficulty."""
+        return len(self.problems.get((*grid_size, difficulty), []))
+
+    def problem(self, grid_size, difficulty, number):
+        """
+        Returns the number-th grid of a size and difficulty (in seed order).
+
+        Returns:
+            tuple: (grid, initial node, goal node, seed)
+        """
+        entry = self.problems[(*grid_size, difficulty)][number]
+        grid = self.stack(entry["stack"])[entry["position"]]
+        return grid, tuple(entry["initial_node"]), tuple(entry["goal_node"]), entry["seed"]
+
+    def batch(self, grid_size, difficulty):
+        """
+        Returns all grids of a size and difficulty at once, for
+        batched_search.batched_search.
+
+        Returns:
+            tuple: ((N, rows, cols) grids, (N, 2) initial nodes, (N, 2) goal nodes, seeds)
+        """
+        entries = self.problems.get((*grid_size, difficulty), [])
+        if not entries:
+            return np.zeros((0, *grid_size), dtype=np.int8), np.zeros((0, 2), int), np.zeros((0, 2), int), []
+        grids = self.stack(entries[0]["stack"])[[entry["position"] for entry in entries]]
+        initial_nodes = np.array([entry["initial_node"] for entry in entries])
+        goal_nodes = np.array([entry["goal_node"] for entry in entries])
+        return grids, initial_nodes, goal_nodes, [entry["seed"] for entry in entries]
+
+    def attempted(self, grid_size, difficulty):
+        """Returns the number of seeds tried for a size and difficulty, solvable or not."""
+        return self.count(grid_size, difficulty) + self.failures.get((*grid_size, difficulty), 0)
+
+    def covers(self, grid_sizes, difficulties, runs):
+        """
+        Returns True if runs seeds were tried for every size and difficulty,
+        or its generation was given up.
+
+        Seeds without a solvable grid count too: at high difficulties most
+        of them fail, and generating them again would fail the same way.
+        """
+        return all((*grid_size, difficulty) in self.gave_up or self.attempted(tuple(grid_size), difficulty) >= runs
+                   for grid_size in grid_sizes for difficulty in difficulties)
+
+
+def load_or_build_corpus(directory, grid_sizes, difficulties, runs, max_attempts=1000, compressed=False,
+                         max_failures=5):
+    """
+    Opens the corpus in directory, building it first if it is missing or
+    tried fewer than runs seeds of some size and difficulty.
+    """
+    if os.path.exists(os.path.join(directory, index_name)):
+        corpus = GridCorpus(directory)
+        if corpus.covers(grid_sizes, difficulties, runs):
+            return corpus
+    return build_corpus(directory, grid_sizes, difficulties, runs, max_attempts, compressed,
+                        max_failures=max_failures)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate solvable grids shared by the experiment runners.")
+    parser.add_argument("directory", help="Directory of the corpus")
+    parser.add_argument("--grid_size", type=int, nargs=2, action="append", help="Grid size, repeatable (default 32 32)")
+    parser.add_argument("--difficulties", type=int, nargs="+", default=list(range(0, 91, 10)))
+    parser.add_argument("--seeds", type=int, default=100, help="Grids per size and difficulty")
+    parser.add_argument("--max_attempts", type=int, default=1000)
+    parser.add_argument("--max_failures", type=int, default=5,
+                        help="Consecutive failed seeds after which a size and difficulty is given up")
+    parser.add_argument("--compressed", action="store_true", help="Write compressed .npz stacks")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.directory, [tuple(size) for size in args.grid_size or [(32, 32)]],
+                          args.difficulties, args.seeds, args.max_attempts, args.compressed,
+                          max_failures=args.max_failures)
+    print(f"{len(corpus)} grids written to {args.directory}")
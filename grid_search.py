@@ -1,15 +1,29 @@
 import random
 import numpy as np
+from terrain import add_random_terrain
+from utils.neighbor_masks import NeighborTable
+from utils.path_cache import hash_for
+from utils.shared_grid import grid_array
 
 
 class GridSearch:
     """Class for the grid search problem."""
     def __init__(self, grid_size=(16,16), difficulty=0,
-                 preset_goal=None, preset_grid=None, preset_initial=None):
-        """Initializes the grid search problem."""
+                 preset_goal=None, preset_grid=None, preset_initial=None,
+                 max_terrain_weight=1):
+        """Initializes the grid search problem.
+
+        Cells hold -1 (blocked), 0 (free) or a terrain weight k > 1 that
+        multiplies the cost of moving into them. With max_terrain_weight > 1
+        half of the free cells get a random weight in 2..max_terrain_weight.
+        preset_grid may also be a SharedGrid or its spec; the problem then
+        works on the shared memory view without copying it.
+        """
         self.grid_size = grid_size
+        self.neighbor_table = None  # built by get_neighbor_table()
+        self.grid_hash = None  # built by get_grid_hash()
         if preset_grid is not None and preset_initial is not None and preset_goal is not None:
-            self.grid = preset_grid
+            self.grid = grid_array(preset_grid)
             self.initial_node = preset_initial
             self.current_node = preset_initial
             self.goal_node = preset_goal
@@ -26,16 +40,40 @@ class GridSearch:
             if difficulty>0:
                 total_cell_num = grid_size[0] * grid_size[1]
                 blocked_cell_num = int((difficulty / 100) * total_cell_num)
-                blocked_coords = []
+                blocked_count = 0
                 
-                while len(blocked_coords) < blocked_cell_num:
+                while blocked_count < blocked_cell_num:
                     x = random.randint(0, grid_size[0] - 1)
                     y = random.randint(0, grid_size[1] - 1)
                     node_coord = (x, y)
-                    if (node_coord!=self.initial_node) and (node_coord!=self.goal_node) and (node_coord not in blocked_coords):
-                        blocked_coords.append(node_coord)
+                    # the grid itself tells whether a cell is already blocked
+                    if (node_coord!=self.initial_node) and (node_coord!=self.goal_node) and (self.grid[node_coord] != -1):
+                        blocked_count += 1
                         self.grid[node_coord] = -1
+
+            if max_terrain_weight > 1:
+                add_random_terrain(self.grid, max_terrain_weight)
             
+    def get_neighbor_table(self):
+        """Returns the legal-move bitmasks of the grid (8-connected), built on first use."""
+        if self.neighbor_table is None:
+            self.neighbor_table = NeighborTable(self.grid)
+        return self.neighbor_table
+
+    def get_grid_hash(self):
+        """Returns the content hash of the grid (utils.path_cache), kept current by set_cell."""
+        if self.grid_hash is None:
+            self.grid_hash = hash_for(self.grid)
+        return self.grid_hash
+
+    def set_cell(self, node, value):
+        """
+        Edits a grid cell. Every edit goes through the neighbor table, which
+        also updates the content hash tracking the grid, so neither the
+        move masks nor cached search results go stale.
+        """
+        self.get_neighbor_table().set_cell(node, value)
+
     def is_goal_reached(self):
         """Returns True if the goal node is reached."""
         return self.current_node == self.goal_node
@@ -0,0 +1,126 @@
+import math
+import numpy as np
+from terrain import min_terrain_weight
+from utils.compact_path import format_path
+from utils.neighbor_masks import NeighborTable
+from utils.shared_grid import grid_array
+
+
+class IDAStarAgentGrid:
+    """
+    Agent that performs iterative-deepening A* (IDA*) on the grid search problem.
+
+    Each iteration is a depth-first search that prunes every node whose
+    f = g + h exceeds a threshold; the next threshold is the smallest pruned
+    f. Memory grows with the depth of the current path, not with the number
+    of expanded nodes as in AStarAgentGrid.
+
+    A transposition table remembers the best g at which a node was reached
+    in the current iteration, so the many equal-cost paths of a grid are not
+    re-explored. It is capped at max_table_entries: once full, new nodes are
+    simply not recorded, and the search does more re-expansions instead of
+    running out of memory.
+
+    A table far smaller than the region the search covers makes it thrash:
+    every iteration re-explores the many equal-cost grid paths and the
+    expansions grow exponentially with the path length. max_expansions caps
+    the work; past it the search gives up and returns no path, with capped
+    set.
+
+    Attributes:
+        nodes_expanded (int): expansions over all iterations.
+        re_expansions (int): expansions of nodes already expanded before.
+        iterations (int): number of threshold iterations.
+        peak_table_entries (int): largest size reached by the table.
+        capped (bool): True if the last search stopped at max_expansions.
+    """
+
+    def __init__(self, heuristic_func, max_table_entries=100000, path_format="list",
+                 connectivity=8, corner_cutting="allow", neighbor_table=None, max_expansions=None):
+        self.heuristic_func = heuristic_func
+        self.max_table_entries = max_table_entries  # memory budget of the transposition table
+        self.max_expansions = max_expansions  # work cap, None for no cap
+        self.path_format = path_format
+        self.connectivity = connectivity
+        self.corner_cutting = corner_cutting
+        self.neighbor_table = neighbor_table
+        self.nodes_expanded = 0
+        self.re_expansions = 0
+        self.iterations = 0
+        self.peak_table_entries = 0
+        self.capped = False
+
+    def search(self, grid, initial_node, goal_node):
+        """
+        Implements IDA* on grid_search to find the optimal path.
+
+        Args:
+            grid (np.ndarray): The grid representing the search space.
+            initial_node (tuple): The starting coordinates in the grid (row, col).
+            goal_node (tuple): The goal node coordinates in the grid (row, col).
+
+        Returns:
+            tuple: (path from initial node to goal node or None, number of nodes expanded, total cost)
+        """
+        grid = grid_array(grid)
+        max_expansions = math.inf if self.max_expansions is None else self.max_expansions
+        table = self.neighbor_table
+        if table is None:
+            table = NeighborTable(grid, self.connectivity, self.corner_cutting)
+        neighbors_of = table.neighbors
+        terrain_scale = min_terrain_weight(grid)  # keeps the heuristic admissible
+        heuristic = lambda node: self.heuristic_func(node, goal_node) * terrain_scale
+        # bit per cell telling whether it was expanded before, to count re-expansions
+        expanded_before = np.zeros(grid.shape, dtype=bool)
+
+        def expand(node):
+            self.nodes_expanded += 1
+            if expanded_before[node]:
+                self.re_expansions += 1
+            expanded_before[node] = True
+            return iter(neighbors_of(node))
+
+        if initial_node == goal_node:
+            self.nodes_expanded += 1
+            return format_path([initial_node], self.path_format), self.nodes_expanded, 0
+
+        threshold = heuristic(initial_node)
+        while True:
+            self.iterations += 1
+            best_g = {initial_node: 0}  # transposition table of this iteration
+            next_threshold = math.inf
+            # tolerance for f values summed in different orders
+            limit = threshold + 1e-9 * max(1.0, threshold)
+            path = [initial_node]
+            on_path = {initial_node}
+            stack = [(0, expand(initial_node))]
+            while stack:
+                if self.nodes_expanded >= max_expansions:
+                    self.capped = True
+                    self.peak_table_entries = max(self.peak_table_entries, len(best_g))
+                    return None, self.nodes_expanded, None  # gave up
+                g, successors = stack[-1]
+                for neighbor, step_cost in successors:
+                    new_g = g + step_cost
+                    f = new_g + heuristic(neighbor)
+                    if f > limit:
+                        next_threshold = min(next_threshold, f)
+                        continue
+                    if neighbor in on_path or best_g.get(neighbor, math.inf) <= new_g:
+                        continue
+                    if neighbor == goal_node:
+                        self.peak_table_entries = max(self.peak_table_entries, len(best_g))
+                        return format_path(path + [neighbor], self.path_format), self.nodes_expanded, new_g
+                    if len(best_g) < self.max_table_entries:
+                        best_g[neighbor] = new_g
+                    path.append(neighbor)
+                    on_path.add(neighbor)
+                    stack.append((new_g, expand(neighbor)))
+                    break
+                else:
+                    stack.pop()
+                    on_path.discard(path.pop())
+            self.peak_table_entries = max(self.peak_table_entries, len(best_g))
+            if next_threshold == math.inf:
+                return None, self.nodes_expanded, None  # No path found
+            threshold = next_threshold
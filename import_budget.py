@@ -0,0 +1,86 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# module -> import time budget in milliseconds, measured in a fresh interpreter
+budgets_ms = {
+    "main": 60,
+    "plots.plots": 60,
+    "results": 400,
+    "grid_search": 300,
+    "astar": 300,
+    "ucs": 300,
+}
+
+# heavy dependencies that importing a module must not load
+heavy_modules = ("cv2", "matplotlib", "scipy")
+forbidden_modules = {
+    "main": heavy_modules + ("astar", "ucs", "random_agent", "grid_search", "numpy"),
+    "plots.plots": heavy_modules,
+    "results": heavy_modules,
+    "grid_search": heavy_modules,
+    "astar": heavy_modules,
+    "ucs": heavy_modules,
+}
+
+probe = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [name for name in {forbidden!r} if name in sys.modules]}}))
+"""
+
+
+def measure_import(module, repeats=5):
+    """
+    Imports module in repeats fresh interpreters.
+
+    Returns:
+        tuple: (median import time in ms, forbidden modules it loaded)
+    """
+    times, loaded = [], set()
+    code = probe.format(module=module, forbidden=forbidden_modules.get(module, ()))
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["ms"])
+        loaded.update(result["loaded"])
+    return statistics.median(times), sorted(loaded)
+
+
+def check_budgets(modules=None, repeats=5, scale=1.0):
+    """
+    Measures every module against its budget (times scale, for slower
+    machines) and the modules it must not load.
+
+    Returns:
+        list[dict]: one record per module, with "ok" False for a violation
+    """
+    records = []
+    for module in modules or budgets_ms:
+        milliseconds, loaded = measure_import(module, repeats)
+        budget = budgets_ms[module] * scale
+        records.append({
+            "module": module,
+            "import_ms": round(milliseconds, 1),
+            "budget_ms": budget,
+            "heavy_modules_loaded": loaded,
+            "ok": milliseconds <= budget and not loaded,
+        })
+    return records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the import time of the entry points against their budgets.")
+    parser.add_argument("modules", nargs="*", help=f"Modules to check (default: {', '.join(budgets_ms)})")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters per module (median is used)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplies every budget")
+    args = parser.parse_args()
+
+    records = check_budgets(args.modules, args.repeats, args.scale)
+    for record in records:
+        print(json.dumps(record))  # one line per module, to track over time
+    sys.exit(0 if all(record["ok"] for record in records) else 1)
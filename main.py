@@ -1,129 +1,158 @@
 import argparse
+import json
+import random
+import sys
 import time
-import cv2
-from grid_search import GridSearch
-from random_agent import RandomAgent
-from utils.visualize import visualize_grid
-from utils.metrics import TrackMetrics
-from ucs import UCSAgentGrid
-from astar import AStarAgentGrid, octile_distance, euclidean_distance
+
+# cv2, the renderers and the agents are imported by the functions that use
+# them, so headless jobs and --help do not pay for loading them
+
+
+def start_display(renderer, window_name, writer=None, ms_wait_time=500):
+    """
+    Creates the render loop that shows (and records) the frames.
+
+    display.run(play) then runs play(display) on a worker thread while the
+    window is updated on the calling (main) thread, as HighGUI requires.
+    Each frame stays on screen for ms_wait_time on the main thread, so the
+    agent is never slowed down by the display.
+    """
+    import cv2
+    from utils.render_thread import RenderLoop
+
+    def setup():
+        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+
+    def show(frame):
+        cv2.imshow(window_name, frame)
+        if writer:
+            writer.write(frame)
+        cv2.waitKey(ms_wait_time)
+
+    def teardown():
+        cv2.waitKey(2000)  # keeps the final frame on screen
+        cv2.destroyAllWindows()
+        if writer:
+            writer.close()
+
+    return RenderLoop(renderer, show, setup=setup, teardown=teardown)
+
+
+def show_trace(display, trace, trace_path, frames=10):
+    """Saves a search trace and shows its expansions in a few frames."""
+    from utils.search_trace import EXPANSION, expansion_batches
+
+    saved_path = trace.save(trace_path)
+    print(f"Saved {len(trace.records(EXPANSION))} expansions to {saved_path}")
+    for batch in expansion_batches(trace, frames):
+        display.emit(batch[-1], batch)
 
 
 def play_grid_search(grid_size, agent=None, heuristic=None, difficulty=0,
-                     preset_goal=None, preset_grid=None, preset_initial=None):
-    """Play GridSearch with the specified agent."""
+                     preset_goal=None, preset_grid=None, preset_initial=None,
+                     record_path=None, trace_path=None):
+    """Play GridSearch with the specified agent.
+
+    The agent runs on a worker thread and only emits its state; drawing
+    happens on the main thread, so the measured times do not include any
+    GUI latency.
+    If record_path is given, every displayed frame is also written to that
+    video file (.mp4/.avi/.mkv) or image-sequence directory.
+    If trace_path is given, UCS and A* record their expansion order, save it
+    as .npz and show the explored nodes in that order before the path.
+    """
+    from grid_search import GridSearch
+    from utils.metrics import TrackMetrics
+    from utils.search_trace import SearchTrace
+    from utils.visualize import FrameWriter, GridRenderer
+
     # instantiate the game
     game = GridSearch(grid_size, difficulty=difficulty, preset_goal=preset_goal,
                       preset_grid=preset_grid, preset_initial=preset_initial)
     metrics = TrackMetrics()  # instantiate the metrics tracker
+    # the background is drawn once, each frame only repaints changed cells
+    renderer = GridRenderer(game.grid, game.initial_node, game.goal_node)
+    writer = FrameWriter(record_path) if record_path else None
+    trace = SearchTrace() if trace_path else None
     if agent == "random":
+        from random_agent import RandomAgent
         agent = RandomAgent()  # instantiate the random agent
         print("Using Random Agent")
+        window_name = "Grid Search"
 
-        cv2.namedWindow("Grid Search", cv2.WINDOW_NORMAL)
-        move_count = 0
-        metrics.timer_on()
-        visited_nodes = []
-        while not game.is_goal_reached():
-            if move_count <= 100:
-                grid, initial_node, goal_node = game.get_state()
-                current_node = game.current_node
-                visited_nodes.append(current_node)  # Tracks the visited nodes
-
-                # Visualizes the grid
-                img = visualize_grid(
-                    grid,
-                    current_node,
-                    initial_node,
-                    goal_node,
-                    visited_nodes=visited_nodes,
-                )
-                cv2.imshow("Grid Search", img)
-                ms_wait_time = 500
-                metrics.add_wait_time(ms_wait_time)
-                cv2.waitKey(ms_wait_time)
-                # the agent selects the action
-                game.current_node = agent.select_action_grid(
-                    grid, game.current_node
-                )
-                move_count += 1
-                metrics.increase_steps()
-                elapsed_time = time.time() - metrics.start_time - metrics.wait_time
-                print(
-                    f"Move {move_count}: {game.current_node} ({elapsed_time:.4f} seconds)"
-                )
-                # Checks if the goal node is reached ornot
-                if game.is_goal_reached():
-                    img = visualize_grid(
-                        grid,
-                        current_node,
-                        initial_node,
-                        goal_node,
-                        visited_nodes=visited_nodes,
+        def play(display):
+            move_count = 0
+            metrics.timer_on()
+            grid = game.grid
+            while not game.is_goal_reached():
+                if move_count <= 100:
+                    current_node = game.current_node
+                    display.emit(current_node, [current_node])  # Tracks the visited nodes
+
+                    # the agent selects the action
+                    game.current_node = agent.select_action_grid(
+                        grid, game.current_node, game.get_neighbor_table()
+                    )
+                    move_count += 1
+                    metrics.increase_steps()
+                    elapsed_time = time.time() - metrics.start_time
+                    print(
+                        f"Move {move_count}: {game.current_node} ({elapsed_time:.4f} seconds)"
                     )
-                    cv2.imshow("Grid Search", img)
-                    print("Goal node reached")
-                    cv2.waitKey(2000)
+                    # Checks if the goal node is reached ornot
+                    if game.is_goal_reached():
+                        display.emit(game.current_node)
+                        print("Goal node reached")
+                        break
+                elif move_count > 100:
+                    print("Maximum limit of moves = 100 reached")
                     break
-            elif move_count > 100:
-                print("Maximum limit of moves = 100 reached")
-                break
-        metrics.metric_logger("Random Agent")
-        time.sleep(2)
-        cv2.destroyAllWindows()
+            metrics.metric_logger("Random Agent")
 
     elif agent == "ucs":
         # instantiate the UCS agent for grid search
-        agent = UCSAgentGrid()
+        from ucs import UCSAgentGrid
+        agent = UCSAgentGrid(trace=trace)
         print("Using Uniform-Cost Search Agent")
+        window_name = "Grid Search"
 
-        cv2.namedWindow("Grid Search", cv2.WINDOW_NORMAL)
-        move_count = 0
-        visited_nodes = set()  # Uses set to track visited nodes efficiently
-        metrics.timer_on()
+        def play(display):
+            move_count = 0
+            metrics.timer_on()
 
-        # calling search() method of the UCS agent
-        path, nodes_expanded, total_cost = agent.search(
-            game.grid, game.initial_node, game.goal_node
-        )
-        # print(f"Nodes expanded: {nodes_expanded}")
-        metrics.increase_nodes_expanded(
-            nodes_expanded
-        )  # increments the number of nodes expanded
-
-        if path:
-            metrics.set_total_cost(total_cost)
-            print("Path found using UCS:")
-            print(path)
-            # Visualizing the path found by UCS
-            for move in path:
-                grid, initial_node, goal_node = game.get_state()
-                current_node = move
-                metrics.increase_steps()
-                visited_nodes.add(current_node)  # add visited nodes
-                img = visualize_grid(
-                    grid,
-                    current_node,
-                    initial_node,
-                    goal_node,
-                    visited_nodes=visited_nodes,
-                )
-                cv2.imshow("Grid Search", img)
-                ms_wait_time = 500
-                metrics.add_wait_time(ms_wait_time)
-                cv2.waitKey(ms_wait_time)
-                move_count += 1
-                elapsed_time = time.time() - metrics.start_time - metrics.wait_time
-                print(f"Move {move_count}: {current_node} ({elapsed_time:.4f} seconds)")
-        else:
-            print("No path found by UCS.")
+            # calling search() method of the UCS agent
+            path, nodes_expanded, total_cost = agent.search(
+                game.grid, game.initial_node, game.goal_node
+            )
+            # print(f"Nodes expanded: {nodes_expanded}")
+            metrics.increase_nodes_expanded(
+                nodes_expanded
+            )  # increments the number of nodes expanded
 
-        metrics.metric_logger("Uniform-Cost Search Agent")
-        print(len(path))
-        time.sleep(2)
-        cv2.destroyAllWindows()
+            if trace is not None:
+                show_trace(display, trace, trace_path)
+
+            if path:
+                metrics.set_total_cost(total_cost)
+                print("Path found using UCS:")
+                print(path)
+                # Visualizing the path found by UCS
+                for move in path:
+                    current_node = move
+                    metrics.increase_steps()
+                    display.emit(current_node, [current_node])  # add visited nodes
+                    move_count += 1
+                    elapsed_time = time.time() - metrics.start_time
+                    print(f"Move {move_count}: {current_node} ({elapsed_time:.4f} seconds)")
+            else:
+                print("No path found by UCS.")
+
+            metrics.metric_logger("Uniform-Cost Search Agent")
+            print(len(path))
 
     elif agent == "astar":
+        from astar import AStarAgentGrid, euclidean_distance, octile_distance
+
         # checks if heuristic is present or not
         if not heuristic:
             raise ValueError(
@@ -133,57 +162,46 @@ def play_grid_search(grid_size, agent=None, heuristic=None, difficulty=0,
         elif heuristic == "euclidean":
             heuristic = euclidean_distance
             print("Implementing A* with Euclidean Heuristic")
-            cv2.namedWindow("Grid Search - A* Euclidean", cv2.WINDOW_NORMAL)
+            window_name = "Grid Search - A* Euclidean"
         elif heuristic == "octile":
             heuristic = octile_distance
             print("Implementing A* with Octile Heuristic")
-            cv2.namedWindow("Grid Search - A* Octile", cv2.WINDOW_NORMAL)
-        agent = AStarAgentGrid(heuristic)
+            window_name = "Grid Search - A* Octile"
+        agent = AStarAgentGrid(heuristic, trace=trace)
 
-        move_count = 0
-        visited_nodes = set()  # tracks visited nodes efficiently
-        metrics.timer_on()
+        def play(display):
+            move_count = 0
+            metrics.timer_on()
 
-        # calling search() method of the A* agent
-        path, nodes_expanded, total_cost = agent.search(
-            game.grid, game.initial_node, game.goal_node
-        )
-        # print(f"Nodes expanded: {nodes_expanded}")
-        metrics.increase_nodes_expanded(
-            nodes_expanded
-        )  # increments the number of nodes expanded
-
-        if path:
-            metrics.set_total_cost(total_cost)
-            print("Path found using A*:")
-            print(path)
-            # Displaying the path found by A*
-            for move in path:
-                grid, initial_node, goal_node = game.get_state()
-                current_node = move
-                metrics.increase_steps()
-                visited_nodes.add(current_node)  # Adds visited nodes
-                img = visualize_grid(
-                    grid,
-                    current_node,
-                    initial_node,
-                    goal_node,
-                    visited_nodes=visited_nodes,
-                )
-                cv2.imshow("Grid Search - A*", img)
-                ms_wait_time = 500
-                metrics.add_wait_time(ms_wait_time)
-                cv2.waitKey(ms_wait_time)
-                move_count += 1
-                elapsed_time = time.time() - metrics.start_time - metrics.wait_time
-                print(f"Move {move_count}: {current_node} ({elapsed_time:.4f} seconds)")
-        else:
-            print("No path found by A*.")
+            # calling search() method of the A* agent
+            path, nodes_expanded, total_cost = agent.search(
+                game.grid, game.initial_node, game.goal_node
+            )
+            # print(f"Nodes expanded: {nodes_expanded}")
+            metrics.increase_nodes_expanded(
+                nodes_expanded
+            )  # increments the number of nodes expanded
 
-        metrics.metric_logger("A* Agent")
-        print(len(path))
-        time.sleep(2)
-        cv2.destroyAllWindows()
+            if trace is not None:
+                show_trace(display, trace, trace_path)
+
+            if path:
+                metrics.set_total_cost(total_cost)
+                print("Path found using A*:")
+                print(path)
+                # Displaying the path found by A*
+                for move in path:
+                    current_node = move
+                    metrics.increase_steps()
+                    display.emit(current_node, [current_node])  # Adds visited nodes
+                    move_count += 1
+                    elapsed_time = time.time() - metrics.start_time
+                    print(f"Move {move_count}: {current_node} ({elapsed_time:.4f} seconds)")
+            else:
+                print("No path found by A*.")
+
+            metrics.metric_logger("A* Agent")
+            print(len(path))
 
     else:
         print(
@@ -191,6 +209,81 @@ def play_grid_search(grid_size, agent=None, heuristic=None, difficulty=0,
         )
         return
 
+    display = start_display(renderer, window_name, writer)
+    display.run(play)
+
+
+def run_headless_job(job):
+    """
+    Runs one grid search job without any window or delay.
+
+    Args:
+        job (dict): {"grid_size": [rows, cols] or n, "difficulty": int,
+                     "agent": "random" | "ucs" | "astar",
+                     "heuristic": "euclidean" | "octile" (A* only),
+                     "seed": int (optional), "max_attempts": int (optional)}
+
+    Returns:
+        dict: the job fields followed by the metrics of the run, or an "error"
+    """
+    from results import find_solvable_grid, test_astar_agent, test_random_agent, test_ucs_agent
+
+    result = dict(job)
+    try:
+        grid_size = job.get("grid_size", (16, 16))
+        if isinstance(grid_size, int):
+            grid_size = (grid_size, grid_size)
+        grid_size = tuple(grid_size)
+        difficulty = int(job.get("difficulty", 0))
+        agent = job.get("agent")
+        heuristic = job.get("heuristic")
+        if not 0 <= difficulty <= 90:
+            raise ValueError("Please ensure difficulty should be between 0 and 90")
+        if agent not in ("random", "ucs", "astar"):
+            raise ValueError(f"Unknown agent type: {agent}. Please choose 'random' or 'ucs' or 'astar'.")
+        if agent == "astar" and heuristic not in ("euclidean", "octile"):
+            raise ValueError("A* requires a heuristic function (euclidean, octile)")
+
+        if job.get("seed") is not None:
+            random.seed(job["seed"])
+        grid, initial_node, goal_node = find_solvable_grid(
+            grid_size, difficulty, job.get("max_attempts", 500), verbose=False
+        )
+        if grid is None:
+            raise ValueError("Could not find a solvable grid")
+
+        if agent == "random":
+            result.update(test_random_agent(grid, initial_node, goal_node, grid_size))
+        elif agent == "ucs":
+            result.update(test_ucs_agent(grid, initial_node, goal_node, grid_size))
+        else:
+            result.update(test_astar_agent(grid, initial_node, goal_node, grid_size, heuristic))
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def run_headless_batch(job_lines, output=sys.stdout):
+    """
+    Runs one job per non-empty input line (JSON objects, see run_headless_job)
+    and writes one JSON result line per job.
+    """
+    for line in job_lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as e:
+            result = {"job": line, "error": f"Invalid job line: {e}"}
+        else:
+            if not isinstance(job, dict):
+                result = {"job": line, "error": "Invalid job line: expected a JSON object"}
+            else:
+                result = run_headless_job(job)
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+
 
 def main(
     game_name,
@@ -201,9 +294,14 @@ def main(
     grid_size=None,
     heuristic=None,
     difficulty=0,
+    record_path=None,
+    trace_path=None,
 ):
     
     if game_name == "grid_search":
+        from astar import AStarAgentGrid, euclidean_distance
+        from grid_search import GridSearch
+
         max_attempts = 500
         attempt = 0
         solvable_initial = None
@@ -232,6 +330,8 @@ def main(
                 preset_goal=solvable_goal,
                 preset_grid=solvable_grid,
                 preset_initial=solvable_initial,
+                record_path=record_path,
+                trace_path=trace_path,
             )
         else:
             print(f"Could not find a solvable grid in {max_attempts} attempts")
@@ -241,9 +341,9 @@ def main(
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Play games with different agents.")
-    parser.add_argument("--game", type=str, required=True, help="Game to play ('2048')")
+    parser.add_argument("--game", type=str, help="Game to play ('grid_search')")
     parser.add_argument(
-        "--agent", type=str, required=True, help="Agent to use ('random')"
+        "--agent", type=str, help="Agent to use ('random', 'ucs', 'astar')"
     )
     parser.add_argument(
         "--grid_size", type=int, nargs=2, help="Grid size for GridSearch(eg: 16 16)"
@@ -260,8 +360,49 @@ if __name__ == "__main__":
     parser.add_argument(
         "--difficulty", type=int, default=0, help="Difficulty level(0-90) for GridSearch"
     )
+    parser.add_argument(
+        "--record", type=str,
+        help="Also write the frames to a video (.mp4/.avi/.mkv) or an image directory"
+    )
+    parser.add_argument(
+        "--trace", type=str,
+        help="Save the UCS/A* expansion order to this .npz file (.npy is replaced) and show it"
+    )
+    parser.add_argument(
+        "--headless", action="store_true",
+        help="Run without windows or delays and print one JSON result line"
+    )
+    parser.add_argument(
+        "--jobs", type=str,
+        help="Headless batch: file with one JSON job per line ('-' for stdin)"
+    )
+    parser.add_argument("--seed", type=int, help="Random seed for the grid generation")
 
     args = parser.parse_args()
+
+    if args.jobs:
+        if args.jobs == "-":
+            run_headless_batch(sys.stdin)
+        else:
+            with open(args.jobs) as job_file:
+                run_headless_batch(job_file)
+        sys.exit(0)
+    if not args.game or not args.agent:
+        parser.error("--game and --agent are required unless --jobs is given")
+    if args.headless:
+        if args.game != "grid_search":
+            parser.error("--headless only supports --game grid_search")
+        job = {
+            "grid_size": args.grid_size or [16, 16],
+            "difficulty": args.difficulty,
+            "agent": args.agent,
+            "heuristic": args.heuristic,
+            "seed": args.seed,
+        }
+        print(json.dumps(run_headless_job(job)))
+        sys.exit(0)
+    if args.seed is not None:
+        random.seed(args.seed)
     
     if not 0 <= args.difficulty <= 90:
         raise ValueError("Please ensure difficulty should be between 0 and 90")
@@ -289,4 +430,6 @@ if __name__ == "__main__":
         grid_size=grid_size,
         heuristic=args.heuristic,
         difficulty=args.difficulty,
+        record_path=args.record,
+        trace_path=args.trace,
     )
@@ -0,0 +1,308 @@
+import argparse
+import heapq
+import math
+import multiprocessing
+import os
+import queue
+import time
+import numpy as np
+from astar import octile_distance
+from terrain import min_terrain_weight
+from utils.compact_path import format_path
+from utils.neighbor_masks import NeighborTable
+from utils.path_cache import splitmix64
+from utils.shared_grid import SharedGrid, attach_grid, detach_grid, grid_array
+
+
+def owner_table(shape, workers, block_size=1):
+    """
+    Assigns every cell to a worker by hashing its block of block_size x
+    block_size cells (splitmix64 of the block index). block_size 1 hashes
+    single cells, which balances the load best; larger blocks keep more
+    neighbors on the same worker and send fewer messages.
+
+    Returns:
+        np.ndarray: int16 worker of every cell.
+    """
+    rows, cols = np.indices(shape)
+    blocks = (rows // block_size) * (-(-shape[1] // block_size)) + cols // block_size
+    return (splitmix64(blocks) % np.uint64(workers)).astype(np.int16)
+
+
+def hda_worker(worker, spec, initial_node, goal_node, inboxes, control, heuristic_func,
+               batch_size, connectivity, corner_cutting):
+    """
+    Runs one worker of ParallelAStarAgentGrid.search.
+
+    The worker keeps the open list and costs of the cells it owns. It
+    expands its best node, keeps neighbors it owns and batches the others
+    per owner, and merges the batches it receives. Nodes whose f value is
+    not below the best goal cost found (the incumbent) are dropped. Every
+    batch sent or received is counted under the shared lock; a worker with
+    nothing left to expand flushes its batches and marks itself idle, and a
+    batch received clears the mark in the same step.
+
+    Returns (through control["results"]):
+        dict: worker statistics
+    """
+    views = attach_grid(spec)
+    grid, owners, parents = views["grid"], views["owners"], views["parents"].reshape(-1)
+    cols = grid.shape[1]
+    neighbors_of = NeighborTable(grid, connectivity, corner_cutting).neighbors
+    terrain_scale = min_terrain_weight(grid)
+    lock, sent, received, idle = control["lock"], control["sent"], control["received"], control["idle"]
+    incumbent, done = control["incumbent"], control["done"]
+    inbox = inboxes[worker]
+    workers = len(inboxes)
+
+    frontier = []  # (f, g, cell)
+    costs = {}
+    outboxes = [[] for _ in range(workers)]
+    stats = {"worker": worker, "nodes_expanded": 0, "nodes_received": 0, "batches_sent": 0}
+
+    def heuristic(node):
+        return heuristic_func(node, goal_node) * terrain_scale
+
+    def send(target):
+        with lock:
+            sent[worker] += 1
+        inboxes[target].put(outboxes[target])
+        outboxes[target] = []
+        stats["batches_sent"] += 1
+
+    def receive(batch):
+        for node, cost, parent in batch:
+            if cost < costs.get(node, math.inf):
+                costs[node] = cost
+                parents[node[0] * cols + node[1]] = parent
+                heapq.heappush(frontier, (cost + heuristic(node), cost, node))
+        stats["nodes_received"] += len(batch)
+
+    if owners[initial_node] == worker:
+        costs[initial_node] = 0
+        frontier.append((heuristic(initial_node), 0, initial_node))
+
+    while not done.is_set():
+        # merge whatever arrived, without waiting
+        batches = []
+        while True:
+            try:
+                batches.append(inbox.get_nowait())
+            except queue.Empty:
+                break
+        if batches:
+            with lock:
+                received[worker] += len(batches)
+                idle[worker] = 0
+            for batch in batches:
+                receive(batch)
+
+        for _ in range(batch_size):
+            if not frontier:
+                break
+            f, cost, node = heapq.heappop(frontier)
+            if cost > costs[node]:
+                continue  # stale entry
+            if f >= incumbent.value:
+                frontier.clear()  # the incumbent only decreases, so none of them can improve it
+                break
+            stats["nodes_expanded"] += 1
+            if node == goal_node:
+                incumbent.value = cost  # only the owner of the goal writes the incumbent
+                continue
+            parent = node[0] * cols + node[1]
+            for neighbor, step_cost in neighbors_of(node):
+                new_cost = cost + step_cost
+                target = owners[neighbor]
+                if target == worker:
+                    if new_cost < costs.get(neighbor, math.inf):
+                        costs[neighbor] = new_cost
+                        parents[neighbor[0] * cols + neighbor[1]] = parent
+                        heapq.heappush(frontier, (new_cost + heuristic(neighbor), new_cost, neighbor))
+                else:
+                    outboxes[target].append((neighbor, new_cost, parent))
+                    if len(outboxes[target]) >= batch_size:
+                        send(target)
+
+        if not frontier:
+            for target in range(workers):
+                if outboxes[target]:
+                    send(target)
+            with lock:
+                idle[worker] = 1
+            try:
+                batch = inbox.get(timeout=0.005)
+            except queue.Empty:
+                continue
+            with lock:
+                received[worker] += 1
+                idle[worker] = 0
+            receive(batch)
+
+    detach_grid(spec)
+    control["results"].put(stats)
+
+
+class ParallelAStarAgentGrid:
+    """
+    Hash-distributed parallel A* (HDA*) for single long queries.
+
+    Every cell is owned by one worker process (see owner_table); a worker
+    runs A* on the cells it owns and sends the neighbors it generates for
+    other workers to their owners in batches. The grid, the owner table and
+    the parent of every cell live in shared memory (utils.shared_grid), so
+    the path is read back from the parent table after the search.
+
+    Workers expand nodes out of global f order, so the first goal cost is
+    not final: the owner of the goal keeps the best cost found as the
+    incumbent, and the search ends when every worker has no node with f
+    below it and every batch sent has been received. The coordinator checks
+    this condition under the lock that guards the counters, so no batch
+    can be in flight when it holds.
+
+    Attributes:
+        worker_stats (list[dict]): per-worker expansions, nodes received and
+                                   batches sent of the last search.
+        search_seconds (float): wall time of the last search, worker start included.
+    """
+
+    def __init__(self, heuristic_func=octile_distance, workers=None, batch_size=64, block_size=1,
+                 path_format="list", connectivity=8, corner_cutting="allow"):
+        """
+        Args:
+            heuristic_func (callable): admissible heuristic (a module-level
+                                       function, so it can reach the workers).
+            workers (int): worker processes (default: all cores).
+            batch_size (int): nodes per message, and expansions between inbox checks.
+            block_size (int): side of the cell blocks hashed to workers.
+            path_format (str): "list", "array" or "packed" (see utils.compact_path).
+            connectivity, corner_cutting: the move rules (see utils.neighbor_masks).
+        """
+        self.heuristic_func = heuristic_func
+        self.workers = workers or os.cpu_count()
+        self.batch_size = batch_size
+        self.block_size = block_size
+        self.path_format = path_format
+        self.connectivity = connectivity
+        self.corner_cutting = corner_cutting
+        self.worker_stats = []
+        self.search_seconds = 0.0
+
+    def search(self, grid, initial_node, goal_node) -> tuple:
+        """
+        Finds an optimal path with the worker processes.
+
+        Returns:
+            tuple: (path or None, nodes expanded by all workers, cost or None)
+        """
+        start = time.perf_counter()
+        grid = grid_array(grid)
+        initial_node, goal_node = tuple(initial_node), tuple(goal_node)
+        if grid[initial_node] == -1 or grid[goal_node] == -1:
+            return (None, 0, None)
+        workers = self.workers
+        context = multiprocessing.get_context()
+        control = {
+            "lock": context.Lock(),
+            "sent": context.RawArray("q", workers),
+            "received": context.RawArray("q", workers),
+            "idle": context.RawArray("b", workers),
+            "incumbent": context.RawValue("d", math.inf),
+            "done": context.Event(),
+            "results": context.Queue(),
+        }
+        inboxes = [context.Queue() for _ in range(workers)]
+        owners = owner_table(grid.shape, workers, self.block_size)
+        parents = np.full(grid.shape, -1, dtype=np.int64)
+
+        with SharedGrid(grid, owners=owners, parents=parents) as shared:
+            processes = [
+                context.Process(target=hda_worker, args=(
+                    worker, shared.spec, initial_node, goal_node, inboxes, control, self.heuristic_func,
+                    self.batch_size, self.connectivity, self.corner_cutting))
+                for worker in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            while not control["done"].is_set():
+                time.sleep(0.001)
+                with control["lock"]:
+                    if all(control["idle"]) and sum(control["sent"]) == sum(control["received"]):
+                        control["done"].set()
+            self.worker_stats = sorted((control["results"].get() for _ in processes), key=lambda s: s["worker"])
+            for process in processes:
+                process.join()
+            parent_table = shared.tables["parents"].reshape(-1).copy()
+
+        self.search_seconds = time.perf_counter() - start
+        nodes_expanded = sum(stats["nodes_expanded"] for stats in self.worker_stats)
+        cost = control["incumbent"].value
+        if math.isinf(cost):
+            return (None, nodes_expanded, None)
+        cols = grid.shape[1]
+        path = [goal_node]
+        cell = goal_node[0] * cols + goal_node[1]
+        initial = initial_node[0] * cols + initial_node[1]
+        while cell != initial:
+            cell = int(parent_table[cell])
+            path.append(divmod(cell, cols))
+        path.reverse()
+        return (format_path(path, self.path_format), nodes_expanded, cost)
+
+
+def parallel_efficiency(grid, initial_node, goal_node, worker_counts, heuristic_func=octile_distance,
+                        batch_size=64, block_size=1):
+    """
+    Times AStarAgentGrid and ParallelAStarAgentGrid with each worker count on
+    one query.
+
+    Returns:
+        list[dict]: per worker count the time, speedup over sequential A*,
+                    parallel efficiency (speedup / workers), search overhead
+                    (expansions relative to A*) and whether the cost matches
+    """
+    from astar import AStarAgentGrid
+
+    start = time.perf_counter()
+    _, sequential_expanded, sequential_cost = AStarAgentGrid(heuristic_func).search(grid, initial_node, goal_node)
+    sequential_time = time.perf_counter() - start
+
+    records = [{"workers": 0, "seconds": sequential_time, "nodes_expanded": sequential_expanded}]
+    for workers in worker_counts:
+        agent = ParallelAStarAgentGrid(heuristic_func, workers, batch_size, block_size)
+        _, nodes_expanded, cost = agent.search(grid, initial_node, goal_node)
+        speedup = sequential_time / agent.search_seconds
+        records.append({
+            "workers": workers,
+            "seconds": agent.search_seconds,
+            "nodes_expanded": nodes_expanded,
+            "speedup": speedup,
+            "efficiency": speedup / workers,
+            "search_overhead": nodes_expanded / sequential_expanded,
+            "batches_sent": sum(stats["batches_sent"] for stats in agent.worker_stats),
+            "cost_match": (cost is None and sequential_cost is None)
+                          or (cost is not None and sequential_cost is not None and math.isclose(cost, sequential_cost)),
+        })
+    return records
+
+
+if __name__ == "__main__":
+    from grid_corpus import generate_solvable_grid
+
+    parser = argparse.ArgumentParser(description="Measure the parallel efficiency of hash-distributed A*.")
+    parser.add_argument("--grid_size", type=int, nargs=2, default=[512, 512])
+    parser.add_argument("--difficulty", type=int, default=30)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch_size", type=int, default=64)
+    parser.add_argument("--block_size", type=int, default=1)
+    args = parser.parse_args()
+
+    grid, _, _ = generate_solvable_grid(tuple(args.grid_size), args.difficulty, 0)
+    # a long query: opposite corners, moved to the nearest free cells
+    free_cells = np.argwhere(grid != -1)
+    initial_node = tuple(free_cells[np.argmin(free_cells.sum(axis=1))].tolist())
+    goal_node = tuple(free_cells[np.argmax(free_cells.sum(axis=1))].tolist())
+    print(f"{os.cpu_count()} cores, query {initial_node} -> {goal_node}")
+    for record in parallel_efficiency(grid, initial_node, goal_node, args.workers,
+                                      batch_size=args.batch_size, block_size=args.block_size):
+        print(record)
@@ -0,0 +1,456 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from scipy import ndimage
+from astar import AStarAgentGrid, euclidean_distance, octile_distance
+from ucs import UCSAgentGrid
+from utils.path_cache import GridHash, PathCache
+from utils.shared_grid import SharedGrid
+
+heuristics = {"euclidean": euclidean_distance, "octile": octile_distance}
+agents = ("astar", "ucs")
+
+
+def solve_batch(grid, queries):
+    """
+    Solves a batch of queries against one grid; runs inside a worker process.
+
+    Args:
+        grid (np.ndarray or dict): The grid shared by all queries of the
+                                   batch, or the spec of a SharedGrid, which
+                                   the worker attaches once and keeps.
+        queries (list[dict]): {"start": (row, col), "goal": (row, col),
+                               "agent": "astar" | "ucs", "heuristic": name}
+
+    Returns:
+        list: {"path", "cost", "nodes_expanded"} for every query, or the
+              exception raised by a failed query, so one bad query does not
+              fail the rest of its batch.
+    """
+    results = []
+    for query in queries:
+        try:
+            if query.get("agent", "astar") == "ucs":
+                agent = UCSAgentGrid()
+            else:
+                agent = AStarAgentGrid(heuristics[query.get("heuristic", "octile")])
+            path, nodes_expanded, cost = agent.search(grid, tuple(query["start"]), tuple(query["goal"]))
+        except Exception as e:
+            results.append(e)
+            continue
+        results.append({"path": path, "cost": cost, "nodes_expanded": nodes_expanded})
+    return results
+
+
+class LatencyHistogram:
+    """
+    Log-scale histogram of request latencies.
+
+    Bucket i counts latencies in [2**(i-1), 2**i) microseconds, so a few dozen
+    integers cover everything from microseconds to minutes.
+    """
+
+    def __init__(self, num_buckets=40):
+        self.counts = [0] * num_buckets
+        self.total = 0
+        self.sum_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def add(self, seconds):
+        """Records one latency in seconds."""
+        micros = max(seconds * 1e6, 1.0)
+        bucket = min(int(math.log2(micros)) + 1, len(self.counts) - 1)
+        self.counts[bucket] += 1
+        self.total += 1
+        self.sum_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def quantile(self, q):
+        """Returns the upper bound (seconds) of the bucket holding quantile q."""
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(2 ** bucket / 1e6, self.max_seconds)
+        return self.max_seconds
+
+    def summary(self):
+        """Returns the histogram as a JSON-friendly dict."""
+        return {
+            "count": self.total,
+            "mean": self.sum_seconds / self.total if self.total else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max_seconds,
+            "buckets_us": {f"<{2 ** i}": c for i, c in enumerate(self.counts) if c},
+        }
+
+
+class LoadedMap:
+    """A grid kept resident by the service, with its preprocessing."""
+
+    def __init__(self, name, grid, shared=False):
+        self.name = name
+        self.grid = np.ascontiguousarray(grid, dtype=np.int8)
+        # with worker processes the grid is published once in shared memory
+        # and batches carry only its spec instead of a pickled copy
+        self.shared = SharedGrid(self.grid) if shared else None
+        self.task_grid = self.shared.spec if shared else self.grid
+        # 8-connected components of the free cells: unreachable goals are
+        # answered without a search
+        self.components, _ = ndimage.label(self.grid != -1, structure=np.ones((3, 3)))
+        self.grid_hash = GridHash(self.grid).value  # identifies the content in the result cache
+        self.pending = []  # (query, future) waiting for the next batch
+        self.flush_handle = None
+
+    def check_query(self, start, goal):
+        """Raises ValueError for queries outside the grid or on blocked cells."""
+        rows, cols = self.grid.shape
+        for node in (start, goal):
+            if not (0 <= node[0] < rows and 0 <= node[1] < cols):
+                raise ValueError(f"Node {node} is outside the grid")
+            if self.grid[node] == -1:
+                raise ValueError(f"Node {node} is blocked")
+
+    def connected(self, start, goal):
+        """Returns True if start and goal lie in the same component."""
+        return self.components[start] == self.components[goal]
+
+    def close(self):
+        """Releases the shared memory of the map, if any."""
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
+
+
+class PathService:
+    """
+    Long-running path query service.
+
+    Maps are loaded once and stay resident with their preprocessing. Path and
+    distance queries against the same map that arrive within batch_window
+    seconds are coalesced into one batch, solved in a worker pool so the event
+    loop stays responsive. Results are memoized by grid content hash, so a
+    repeated query costs a lookup. Latencies are kept per operation.
+
+    The wire protocol is one JSON object per line in each direction; every
+    request carries an "id" that is echoed in its response.
+    """
+
+    def __init__(self, workers=None, batch_window=0.002, max_batch=64, use_processes=True,
+                 cache=None):
+        self.maps = {}
+        # repeated queries are answered from the LRU result cache
+        self.cache = cache if cache is not None else PathCache()
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.use_processes = use_processes
+        if use_processes:
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.latencies = {}
+        self.batches = 0
+        self.batched_queries = 0
+        self.server = None
+
+    # map management
+    def load_map(self, name, grid):
+        """Loads (or replaces) a map under the given name."""
+        if name in self.maps:
+            self.maps[name].close()
+        self.maps[name] = LoadedMap(name, np.asarray(grid), shared=self.use_processes)
+        return {"map": name, "shape": list(self.maps[name].grid.shape)}
+
+    def unload_map(self, name):
+        """Removes a map."""
+        self.maps.pop(name).close()
+        return {"map": name}
+
+    # queries
+    async def query(self, map_name, start, goal, agent="astar", heuristic="octile"):
+        """
+        Answers a path query, coalescing it with concurrent queries on the same map.
+
+        Returns:
+            dict: {"path", "cost", "nodes_expanded"}
+        """
+        if agent not in agents:
+            raise ValueError(f"Unknown agent: {agent}. Please choose one of {', '.join(agents)}")
+        if agent == "astar" and heuristic not in heuristics:
+            raise ValueError(f"Unknown heuristic: {heuristic}. Please choose one of {', '.join(heuristics)}")
+        loaded = self.maps[map_name]
+        start, goal = tuple(start), tuple(goal)
+        loaded.check_query(start, goal)
+        if not loaded.connected(start, goal):
+            return {"path": None, "cost": None, "nodes_expanded": 0}
+        key = (agent if agent == "ucs" else f"astar_{heuristic}", loaded.grid_hash, start, goal)
+        cached = self.cache.get(key)
+        if cached is not None:
+            path_array, nodes_expanded, cost = cached
+            path = None if path_array is None else list(map(tuple, path_array.tolist()))
+            return {"path": path, "cost": cost, "nodes_expanded": nodes_expanded}
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda done: self.store(key, done))
+        loaded.pending.append(({"start": start, "goal": goal, "agent": agent,
+                                "heuristic": heuristic}, future))
+        if len(loaded.pending) >= self.max_batch:
+            self.flush(loaded)
+        elif loaded.flush_handle is None:
+            loaded.flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_window, self.flush, loaded
+            )
+        return await future
+
+    def store(self, key, future):
+        """Caches the result of a solved query."""
+        if not future.cancelled() and future.exception() is None:
+            result = future.result()
+            self.cache.put(key, result["path"], result["nodes_expanded"], result["cost"])
+
+    def flush(self, loaded):
+        """Sends the pending queries of a map to the worker pool as one batch."""
+        if loaded.flush_handle is not None:
+            loaded.flush_handle.cancel()
+            loaded.flush_handle = None
+        batch, loaded.pending = loaded.pending, []
+        if not batch:
+            return
+        self.batches += 1
+        self.batched_queries += len(batch)
+        queries = [query for query, _ in batch]
+        futures = [future for _, future in batch]
+        work = asyncio.get_running_loop().run_in_executor(
+            self.executor, solve_batch, loaded.task_grid, queries
+        )
+        asyncio.ensure_future(self.deliver(work, futures))
+
+    async def deliver(self, work, futures):
+        """Resolves the futures of a batch once the worker is done."""
+        try:
+            results = await work
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)  # only this query failed
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        """Returns latency histograms and batching statistics."""
+        return {
+            "maps": sorted(self.maps),
+            "batches": self.batches,
+            "average_batch_size": self.batched_queries / self.batches if self.batches else 0.0,
+            "cache": self.cache.stats(),
+            "latency": {op: hist.summary() for op, hist in self.latencies.items()},
+        }
+
+    # protocol
+    async def handle_request(self, request):
+        """Dispatches one decoded request and returns the response dict."""
+        op = request.get("op")
+        if op == "load_map":
+            if "grid_file" in request:
+                grid = np.load(request["grid_file"])
+            else:
+                grid = np.array(request["grid"], dtype=np.int8)
+            return self.load_map(request["map"], grid)
+        if op == "unload_map":
+            return self.unload_map(request["map"])
+        if op in ("path", "distance"):
+            result = await self.query(
+                request["map"], request["start"], request["goal"],
+                request.get("agent", "astar"), request.get("heuristic", "octile"),
+            )
+            if op == "distance":
+                return {"cost": result["cost"], "nodes_expanded": result["nodes_expanded"]}
+            path = result["path"]
+            return {
+                "path": [list(node) for node in path] if path else None,
+                "cost": result["cost"],
+                "nodes_expanded": result["nodes_expanded"],
+            }
+        if op == "stats":
+            return self.stats()
+        raise ValueError(f"Unknown op: {op}")
+
+    async def respond(self, line, writer):
+        """Handles one request line and writes its response line."""
+        started = time.perf_counter()
+        request = {}
+        try:
+            request = json.loads(line)
+            response = await self.handle_request(request)
+            response["ok"] = True
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        response["id"] = request.get("id") if isinstance(request, dict) else None
+        op = request.get("op", "invalid") if isinstance(request, dict) else "invalid"
+        self.latencies.setdefault(op, LatencyHistogram()).add(time.perf_counter() - started)
+        writer.write((json.dumps(response) + "\n").encode())
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        """Serves one client connection; requests are handled concurrently."""
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self.respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def start(self, unix_path=None, host="127.0.0.1", port=0):
+        """
+        Starts listening on a Unix socket (unix_path) or on host:port.
+
+        Returns:
+            the address clients connect to: the socket path or (host, port).
+        """
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+            return unix_path
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """Stops the server and the worker pool."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+        for loaded in self.maps.values():
+            loaded.close()
+
+
+class PathServiceClient:
+    """
+    Async client for PathService; several requests may be in flight on one
+    connection at a time.
+    """
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.next_id = 0
+        self.waiting = {}
+        self.listener = None
+
+    async def connect(self, unix_path=None, host="127.0.0.1", port=None):
+        """Connects to a Unix socket path or to host:port."""
+        if unix_path:
+            self.reader, self.writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.listener = asyncio.ensure_future(self.listen())
+        return self
+
+    async def listen(self):
+        """Routes response lines to the futures of their requests."""
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.waiting.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self.waiting.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Path service closed the connection"))
+
+    async def request(self, op, **fields):
+        """Sends one request and returns its response; raises on errors."""
+        self.next_id += 1
+        request_id = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        self.writer.write((json.dumps({"id": request_id, "op": op, **fields}) + "\n").encode())
+        await self.writer.drain()
+        response = await future
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error"))
+        return response
+
+    async def load_map(self, name, grid):
+        """Uploads a grid under a map name."""
+        return await self.request("load_map", map=name, grid=np.asarray(grid).tolist())
+
+    async def path(self, name, start, goal, agent="astar", heuristic="octile"):
+        """Returns (path as a list of tuples or None, cost)."""
+        response = await self.request("path", map=name, start=list(start), goal=list(goal),
+                                      agent=agent, heuristic=heuristic)
+        path = [tuple(node) for node in response["path"]] if response["path"] else None
+        return path, response["cost"]
+
+    async def distance(self, name, start, goal, agent="astar", heuristic="octile"):
+        """Returns the path cost, None if the goal is unreachable."""
+        response = await self.request("distance", map=name, start=list(start), goal=list(goal),
+                                      agent=agent, heuristic=heuristic)
+        return response["cost"]
+
+    async def stats(self):
+        """Returns the service statistics."""
+        return await self.request("stats")
+
+    async def close(self):
+        """Closes the connection."""
+        self.writer.close()
+        if self.listener is not None:
+            await self.listener
+
+
+async def serve(args):
+    """Runs the service until interrupted."""
+    service = PathService(workers=args.workers, batch_window=args.batch_window / 1000,
+                          max_batch=args.max_batch)
+    for map_file in args.map or []:
+        service.load_map(os.path.splitext(os.path.basename(map_file))[0], np.load(map_file))
+    address = await service.start(unix_path=args.unix, host=args.host, port=args.port)
+    print(f"Path service listening on {address}")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local path query service.")
+    parser.add_argument("--unix", type=str, help="Unix socket path to listen on")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host when not using --unix")
+    parser.add_argument("--port", type=int, default=8765, help="Port when not using --unix")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--batch_window", type=float, default=2.0,
+                        help="Milliseconds to wait for queries to coalesce into a batch")
+    parser.add_argument("--max_batch", type=int, default=64, help="Maximum queries per batch")
+    parser.add_argument("--map", type=str, nargs="*", help=".npy grids to preload (named by file name)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
@@ -1,8 +1,4 @@
 import json
-import matplotlib.pyplot as plt
-import os
-
-print(os.getcwd())
 
 def load_results(difficulty, algorithm):
     """
@@ -73,6 +69,8 @@ def cost_comparison_plot(algorithms, markers, colors):
     """
     Create cost comparison plot for the ucs, astar-euclidean and astar-octile algorithms
     """
+    import matplotlib.pyplot as plt
+
     difficulties = list(range(0, 91, 10))
     plt.figure(figsize=(12, 8))
     
@@ -116,6 +114,8 @@ def nodes_comparison_plot(algorithms, markers, colors):
     """
     Create nodes expanded comparison plot for ucs, astar-euclidean and astar-octile algorithms
     """
+    import matplotlib.pyplot as plt
+
     difficulties = list(range(0, 91, 10))
     plt.figure(figsize=(12, 8))
     
@@ -166,6 +166,8 @@ def pathfound_comparison_plot(algorithms, markers, colors):
     """
     Create comparison plot for random, ucs, astar-euclidean and astar-octile algorithms
     """
+    import matplotlib.pyplot as plt
+
     difficulties = list(range(0, 91, 10))
     plt.figure(figsize=(12, 8))
 
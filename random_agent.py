@@ -1,28 +1,34 @@
 import random
 
 class RandomAgent:
-    
+    # the 8 moves the agent chooses from uniformly
+    moves = [(-1, 0), (1, 0), (0, -1), (0, 1),
+             (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
     @classmethod
-    def select_action_grid(cls, grid, current_position):
+    def select_action_grid(cls, grid, current_position, neighbor_table=None):
         """Returns a random valid action for the grid search problem.
         Args:
             grid (numpy.ndarray): numpy array(2d) representing the grid
             current_position (tuple): a tuple of node coordinates
+            neighbor_table (NeighborTable): precomputed legal moves of the grid
+                (utils.neighbor_masks); also applies its connectivity and
+                corner-cutting rules
         Returns:
             a new position (tuple): a tuple representing the new node coordinates
         """
-        moves = [(-1, 0), (1, 0), (0, -1), (0, 1),  
-                 (-1, -1), (-1, 1), (1, -1), (1, 1)]  
-        
-        valid_moves = []
-        rows, cols = grid.shape
-        # checks for valid moves in the grid with inactive nodes
-        for i,j in moves:
-            new_i = current_position[0] + i
-            new_j = current_position[1] + j
-            
-            if (0 <= new_i < rows) and (0 <= new_j < cols) and grid[new_i, new_j] != -1:
-                valid_moves.append((new_i, new_j))
+        if neighbor_table is not None:
+            valid_moves = neighbor_table.neighbor_cells(current_position)
+        else:
+            valid_moves = []
+            rows, cols = grid.shape
+            # checks for valid moves in the grid with inactive nodes
+            for i,j in cls.moves:
+                new_i = current_position[0] + i
+                new_j = current_position[1] + j
+
+                if (0 <= new_i < rows) and (0 <= new_j < cols) and grid[new_i, new_j] != -1:
+                    valid_moves.append((new_i, new_j))
         
         if valid_moves:
             return random.choice(valid_moves)# randomly select a valid move
@@ -0,0 +1,167 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from scipy.sparse.linalg import spsolve
+from random_agent import RandomAgent
+from utils.neighbor_masks import neighbor_masks
+
+
+def build_transition_matrix(grid, masks=None):
+    """
+    Builds the sparse transition matrix of RandomAgent.select_action_grid
+    over the free cells of the grid.
+
+    From every free cell the agent moves uniformly to one of its valid
+    neighbors; a cell without valid neighbors keeps the agent in place.
+
+    Args:
+        grid (np.ndarray): The grid (-1 marks a blocked cell).
+        masks (np.ndarray): legal-move bitmasks of the grid (see
+                            utils.neighbor_masks); 8-connected moves by default.
+
+    Returns:
+        tuple: (transition matrix as scipy.sparse.csr_matrix,
+                cell index array mapping (row, col) to the state index or -1)
+    """
+    rows, cols = grid.shape
+    free = grid != -1
+    cell_index = np.full(grid.shape, -1, dtype=np.int64)
+    cell_index[free] = np.arange(np.count_nonzero(free))
+
+    if masks is None:
+        masks = neighbor_masks(grid)
+
+    sources = []
+    targets = []
+    for code, (dx, dy) in enumerate(RandomAgent.moves):
+        # pairs of cells (source, source + (dx, dy)) that both lie inside the grid
+        src_rows, dst_rows = slice(max(0, -dx), rows - max(0, dx)), slice(max(0, dx), rows - max(0, -dx))
+        src_cols, dst_cols = slice(max(0, -dy), cols - max(0, dy)), slice(max(0, dy), cols - max(0, -dy))
+        valid = (masks[src_rows, src_cols] >> code & 1).astype(bool)
+        sources.append(cell_index[src_rows, src_cols][valid])
+        targets.append(cell_index[dst_rows, dst_cols][valid])
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+
+    num_states = int(np.count_nonzero(free))
+    degree = np.bincount(sources, minlength=num_states)
+    # isolated cells keep the agent where it is
+    stuck = np.flatnonzero(degree == 0)
+    sources = np.concatenate([sources, stuck])
+    targets = np.concatenate([targets, stuck])
+    probs = 1.0 / np.maximum(degree, 1)[sources]
+
+    transition = sparse.csr_matrix(
+        (probs, (sources, targets)), shape=(num_states, num_states)
+    )
+    return transition, cell_index
+
+
+def transient_states(transition, cell_index, goal_node):
+    """
+    Finds the states that reach the goal with probability one.
+
+    The random walk moves along undirected edges, so these are the states of
+    the goal's connected component, excluding the goal itself.
+
+    Returns:
+        tuple: (goal state index, array of transient state indices)
+    """
+    goal_state = cell_index[goal_node]
+    _, labels = csgraph.connected_components(transition, directed=False)
+    component = np.flatnonzero(labels == labels[goal_state])
+    return goal_state, component[component != goal_state]
+
+
+def expected_hitting_time(grid, initial_node, goal_node, chain=None):
+    """
+    Computes the exact expected number of random-agent steps from the
+    initial node to the goal node.
+
+    Solves (I - Q) h = 1, where Q is the transition matrix restricted to the
+    states that can still reach the goal.
+
+    Args:
+        grid (np.ndarray): The grid.
+        initial_node (tuple): The starting coordinates (row, col).
+        goal_node (tuple): The goal coordinates (row, col).
+        chain (tuple): (transition matrix, cell index) from
+                       build_transition_matrix, built here if None.
+
+    Returns:
+        float: The expected hitting time, np.inf if the goal is unreachable.
+    """
+    if initial_node == goal_node:
+        return 0.0
+    transition, cell_index = chain if chain is not None else build_transition_matrix(grid)
+    goal_state, states = transient_states(transition, cell_index, goal_node)
+    position = np.searchsorted(states, cell_index[initial_node])
+    if position == len(states) or states[position] != cell_index[initial_node]:
+        return np.inf
+
+    q = transition[states][:, states]
+    identity = sparse.identity(len(states), format="csr")
+    hitting_times = spsolve((identity - q).tocsc(), np.ones(len(states)))
+    return float(np.atleast_1d(hitting_times)[position])
+
+
+def hitting_time_cdf(grid, initial_node, goal_node, max_steps, chain=None):
+    """
+    Computes the probability that the random agent reaches the goal within
+    k steps, for every k from 0 to max_steps.
+
+    Propagates the distribution of the walk over the transient states with
+    sparse matrix-vector products; the mass missing from it is absorbed.
+
+    Args:
+        grid (np.ndarray): The grid.
+        initial_node (tuple): The starting coordinates (row, col).
+        goal_node (tuple): The goal coordinates (row, col).
+        max_steps (int): The step cap K.
+        chain (tuple): (transition matrix, cell index) from
+                       build_transition_matrix, built here if None.
+
+    Returns:
+        np.ndarray: cdf[k] = P(goal reached within k steps), length max_steps + 1.
+    """
+    cdf = np.zeros(max_steps + 1)
+    if initial_node == goal_node:
+        cdf[:] = 1.0
+        return cdf
+    transition, cell_index = chain if chain is not None else build_transition_matrix(grid)
+    goal_state, states = transient_states(transition, cell_index, goal_node)
+    position = np.searchsorted(states, cell_index[initial_node])
+    if position == len(states) or states[position] != cell_index[initial_node]:
+        return cdf
+
+    q_transposed = transition[states][:, states].T.tocsr()
+    distribution = np.zeros(len(states))
+    distribution[position] = 1.0
+    for step in range(1, max_steps + 1):
+        distribution = q_transposed @ distribution
+        cdf[step] = 1.0 - distribution.sum()
+    return np.clip(cdf, 0.0, 1.0)
+
+
+def analyze_random_agent(grid, initial_node, goal_node, max_steps):
+    """
+    Exact counterpart of a batch of simulated random-agent runs.
+
+    Returns:
+        dict: expected steps, success probability within max_steps and the
+              expected steps of the walks that succeed within the cap.
+    """
+    chain = build_transition_matrix(grid)  # shared by both solves
+    cdf = hitting_time_cdf(grid, initial_node, goal_node, max_steps, chain)
+    hit_probs = np.diff(cdf, prepend=0.0)
+    success_prob = cdf[-1]
+    if success_prob > 0:
+        capped_steps = float(np.dot(np.arange(max_steps + 1), hit_probs) / success_prob)
+    else:
+        capped_steps = None
+    return {
+        "expected_steps": expected_hitting_time(grid, initial_node, goal_node, chain),
+        "success_probability": float(success_prob),
+        "expected_steps_when_successful": capped_steps,
+        "max_steps": max_steps,
+    }
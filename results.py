@@ -1,17 +1,27 @@
 import json
 import time
-import numpy as np
 from grid_search import GridSearch
 from random_agent import RandomAgent
 from astar import AStarAgentGrid, euclidean_distance, octile_distance
 from ucs import UCSAgentGrid
 from utils.metrics import TrackMetrics
+from utils.neighbor_masks import NeighborTable
+from utils.sequential_sampling import SequentialStopper
+from utils.streaming_stats import MetricAggregator
 import os
 
-def find_solvable_grid(grid_size, difficulty, max_attempts=500):
+# metrics whose confidence intervals decide when an adaptive sweep stops
+search_metrics = ["steps", "runtime", "total_cost", "nodes_expanded"]
+random_metrics = ["steps", "runtime"]
+# metrics aggregated for the summaries (path_found gives the success rate)
+search_summary_metrics = search_metrics + ["path_found"]
+random_summary_metrics = random_metrics + ["path_found", "success_probability", "expected_steps"]
+
+def find_solvable_grid(grid_size, difficulty, max_attempts=500, verbose=True):
     """
     Generate a solvable grid using A* verification
     Returns None if no solvable grid is found within max_attempts
+    verbose=False silences the progress messages (e.g. for machine-readable output)
     """
     attempt = 0
     while attempt < max_attempts:
@@ -21,14 +31,26 @@ def find_solvable_grid(grid_size, difficulty, max_attempts=500):
         path, _, _ = astar_agent.search(game.grid, game.initial_node, game.goal_node)
 
         if path is not None:
-            print(f"Solvable grid found in {attempt} attempts")
+            if verbose:
+                print(f"Solvable grid found in {attempt} attempts")
             return game.grid, game.initial_node, game.goal_node
 
-        if attempt % 100 == 0:
+        if verbose and attempt % 100 == 0:
             print(f"Attempt {attempt}: Still searching for solvable grid...")
 
     return None, None, None
 
+def solvable_grid(corpus, grid_size, difficulty, run_index, max_attempts=500):
+    """
+    Return the grid of a run as (grid, initial_node, goal_node, seed): the
+    run_index-th corpus grid of the size and difficulty if a corpus is given,
+    else a freshly generated solvable grid (seed None)
+    """
+    if corpus is not None:
+        return corpus.problem(grid_size, difficulty, run_index)
+    grid, initial_node, goal_node = find_solvable_grid(grid_size, difficulty, max_attempts)
+    return grid, initial_node, goal_node, None
+
 def test_ucs_agent(grid, initial_node, goal_node, grid_size):
     """
     Test UCS agent on a given grid and return metrics
@@ -42,7 +64,7 @@ def test_ucs_agent(grid, initial_node, goal_node, grid_size):
     runtime = metrics.timer_off()
 
     return {
-        "steps": len(path) if path else 0,
+        "steps": len(path) if path is not None else 0,
         "runtime": runtime,
         "path_found": path is not None,
         "max_steps_reached": False,  # is not applicable for UCS Agent
@@ -50,11 +72,31 @@ def test_ucs_agent(grid, initial_node, goal_node, grid_size):
         "nodes_expanded": nodes_expanded
     }
 
-def run_experiments_ucs():
+def run_experiments_ucs(adaptive=False, target_relative_width=0.05, min_runs=10, corpus=None, grid_size=(32, 32), keep_runs=True):
+    """
+    Run experiments for the UCS agent
+
+    Args:
+        adaptive (bool): stops a difficulty once the confidence interval of
+                         every metric is narrower than target_relative_width
+                         (half width / mean) instead of always making
+                         runs_per_difficulty runs, which becomes the cap; the
+                         achieved precision is stored in the summary
+        target_relative_width (float): precision target of the adaptive mode
+        min_runs (int): runs made before the adaptive mode may stop
+        corpus (GridCorpus): reads the grids from a pre-generated corpus
+                             (see grid_corpus.py) instead of generating
+                             them, so every agent and sweep sees the same inputs
+        grid_size (tuple): (rows, cols) of the grids
+        keep_runs (bool): store every run in the results; the summaries are
+                          aggregated while running and do not need them
+    """
     # problem settings
-    grid_size = (32, 32)
     difficulties = range(0, 91, 10)
     runs_per_difficulty = 100
+    # in adaptive mode runs_per_difficulty is only the cap
+    stopper = SequentialStopper(search_metrics, target_relative_width, min_runs=min_runs,
+                                max_runs=runs_per_difficulty) if adaptive else None
     results = {}
     
     # creating the required directories
@@ -68,19 +110,24 @@ def run_experiments_ucs():
         print(f"{'='*50}")
         
         difficulty_results = []
+        aggregator = MetricAggregator(search_summary_metrics)
         successful_runs = 0
         grid_generation_failures = 0
         
         while successful_runs < runs_per_difficulty:
+            if stopper is not None and stopper.should_stop(aggregator):
+                print(f"Target precision reached after {successful_runs} runs")
+                break
+            if corpus is not None and successful_runs >= corpus.count(grid_size, difficulty):
+                print(f"Corpus holds only {successful_runs} grids for difficulty {difficulty}")
+                break
             try:
                 # setting max_attempts based on difficulty level to find a solution
                 max_attempts = 1000 if difficulty >= 70 else 500
                 
                 # getting the solvable grid setting
-                grid, initial_node, goal_node = find_solvable_grid(
-                    grid_size, 
-                    difficulty,
-                    max_attempts
+                grid, initial_node, goal_node, seed = solvable_grid(
+                    corpus, grid_size, difficulty, successful_runs, max_attempts
                 )
                 
                 if grid is None:
@@ -97,10 +144,13 @@ def run_experiments_ucs():
                 # adding additional information for metrics and plots
                 run_results.update({
                     "run_number": successful_runs + 1,
-                    "difficulty": difficulty
+                    "difficulty": difficulty,
+                    "seed": seed
                 })
                 
-                difficulty_results.append(run_results)
+                aggregator.add(run_results)
+                if keep_runs:
+                    difficulty_results.append(run_results)
                 successful_runs += 1
                 
                 if successful_runs % 10 == 0:
@@ -115,14 +165,17 @@ def run_experiments_ucs():
             "summary": {
                 "total_successful_runs": successful_runs,
                 "grid_generation_failures": grid_generation_failures,
-                "average_steps": np.mean([r["steps"] for r in difficulty_results]) if difficulty_results else 0,
-                "average_runtime": np.mean([r["runtime"] for r in difficulty_results]) if difficulty_results else 0,
-                "average_total_cost": np.mean([r["total_cost"] for r in difficulty_results]) if difficulty_results else 0,
-                "average_nodes_expanded": np.mean([r["nodes_expanded"] for r in difficulty_results]) if difficulty_results else 0,
-                "success_rate": np.mean([r["path_found"] for r in difficulty_results]) if difficulty_results else 0
+                "average_steps": aggregator.mean("steps"),
+                "average_runtime": aggregator.mean("runtime"),
+                "average_total_cost": aggregator.mean("total_cost"),
+                "average_nodes_expanded": aggregator.mean("nodes_expanded"),
+                "success_rate": aggregator.mean("path_found"),
+                "distributions": aggregator.summary(search_metrics)
             }
         }
-        
+        if stopper is not None:
+            results[f"difficulty_{difficulty}"]["summary"]["precision"] = stopper.precision(aggregator)
+
         # saving intermediate results
         with open(os.path.join(results_dir, f'ucs_agent_results_difficulty_{difficulty}.json'), 'w') as f:
             json.dump({f"difficulty_{difficulty}": results[f"difficulty_{difficulty}"]}, f, indent=4)
@@ -150,7 +203,7 @@ def test_astar_agent(grid, initial_node, goal_node, grid_size, heuristic):
     runtime = metrics.timer_off()
     
     return {
-        "steps": len(path) if path else 0,
+        "steps": len(path) if path is not None else 0,
         "runtime": runtime,
         "path_found": path is not None,
         "max_steps_reached": False,  # is not applicable for A* Agent
@@ -159,14 +212,69 @@ def test_astar_agent(grid, initial_node, goal_node, grid_size, heuristic):
         "heuristic": heuristic
     }
     
-def run_experiments_astar():
+def test_memory_bounded_agent(grid, initial_node, goal_node, grid_size, algorithm, budget, max_overhead=1000):
+    """
+    Test IDA* ("ida") or SMA* ("sma") with the octile heuristic under a
+    memory budget (transposition-table entries or stored nodes) and return
+    metrics, including the re-expansions compared with A*. Tight budgets
+    make both thrash, so the work is capped at max_overhead times the
+    expansions of A*; "capped" tells whether the search gave up.
+    """
+    from ida_star import IDAStarAgentGrid
+    from sma_star import SMAStarAgentGrid
+
+    _, astar_expanded, _ = AStarAgentGrid(octile_distance).search(grid, initial_node, goal_node)
+    max_expansions = max_overhead * max(astar_expanded, 1)
+
+    metrics = TrackMetrics()
+    metrics.timer_on()
+
+    if algorithm == "ida":
+        agent = IDAStarAgentGrid(octile_distance, max_table_entries=budget, max_expansions=max_expansions)
+    else:
+        agent = SMAStarAgentGrid(octile_distance, max_nodes=budget, max_expansions=max_expansions)
+    path, nodes_expanded, total_cost = agent.search(grid, initial_node, goal_node)
+    runtime = metrics.timer_off()
+
+    return {
+        "steps": len(path) if path is not None else 0,
+        "runtime": runtime,
+        "path_found": path is not None,
+        "max_steps_reached": False,  # is not applicable for search agents
+        "total_cost": total_cost,
+        "nodes_expanded": nodes_expanded,
+        "re_expansions": agent.re_expansions,
+        "capped": agent.capped,
+        "expansion_overhead": nodes_expanded / astar_expanded if astar_expanded else None,
+        "algorithm": algorithm,
+        "budget": budget
+    }
+
+def run_experiments_astar(adaptive=False, target_relative_width=0.05, min_runs=10, corpus=None, grid_size=(32, 32), keep_runs=True):
     """
     Run experiments for A* agent with both the heuristics
+
+    Args:
+        adaptive (bool): stops a difficulty once the confidence interval of
+                         every metric is narrower than target_relative_width
+                         (half width / mean) instead of always making
+                         runs_per_difficulty runs, which becomes the cap; the
+                         achieved precision is stored in the summary
+        target_relative_width (float): precision target of the adaptive mode
+        min_runs (int): runs made before the adaptive mode may stop
+        corpus (GridCorpus): reads the grids from a pre-generated corpus
+                             (see grid_corpus.py) instead of generating
+                             them, so every agent and sweep sees the same inputs
+        grid_size (tuple): (rows, cols) of the grids
+        keep_runs (bool): store every run in the results; the summaries are
+                          aggregated while running and do not need them
     """
     # grid settings
-    grid_size = (32, 32)
     difficulties = range(0, 91, 10)
     runs_per_difficulty = 100
+    # in adaptive mode runs_per_difficulty is only the cap
+    stopper = SequentialStopper(search_metrics, target_relative_width, min_runs=min_runs,
+                                max_runs=runs_per_difficulty) if adaptive else None
     results = {
         "euclidean": {},
         "octile": {}
@@ -184,19 +292,24 @@ def run_experiments_astar():
         
         difficulty_results_euclidean = []
         difficulty_results_octile = []
+        aggregators = {heuristic: MetricAggregator(search_summary_metrics) for heuristic in ("euclidean", "octile")}
         successful_runs = 0
         grid_generation_failures = 0
         
         while successful_runs < runs_per_difficulty:
+            if stopper is not None and stopper.should_stop(*aggregators.values()):
+                print(f"Target precision reached after {successful_runs} runs")
+                break
+            if corpus is not None and successful_runs >= corpus.count(grid_size, difficulty):
+                print(f"Corpus holds only {successful_runs} grids for difficulty {difficulty}")
+                break
             try:
                 # setting max_attempts based on difficulty level to find a solution
                 max_attempts = 1000 if difficulty >= 70 else 500
                 
                 # getting the solvable grid setting
-                grid, initial_node, goal_node = find_solvable_grid(
-                    grid_size, 
-                    difficulty,
-                    max_attempts
+                grid, initial_node, goal_node, seed = solvable_grid(
+                    corpus, grid_size, difficulty, successful_runs, max_attempts
                 )
                 
                 if grid is None:
@@ -211,17 +324,23 @@ def run_experiments_astar():
                 run_results_euclidean = test_astar_agent(grid, initial_node, goal_node, grid_size, "euclidean")
                 run_results_euclidean.update({
                     "run_number": successful_runs + 1,
-                    "difficulty": difficulty
+                    "difficulty": difficulty,
+                    "seed": seed
                 })
-                difficulty_results_euclidean.append(run_results_euclidean)
+                aggregators["euclidean"].add(run_results_euclidean)
+                if keep_runs:
+                    difficulty_results_euclidean.append(run_results_euclidean)
                 
                 # testing A* agent with Octile distance heuristic
                 run_results_octile = test_astar_agent(grid, initial_node, goal_node, grid_size, "octile")
                 run_results_octile.update({
                     "run_number": successful_runs + 1,
-                    "difficulty": difficulty
+                    "difficulty": difficulty,
+                    "seed": seed
                 })
-                difficulty_results_octile.append(run_results_octile)
+                aggregators["octile"].add(run_results_octile)
+                if keep_runs:
+                    difficulty_results_octile.append(run_results_octile)
                 
                 successful_runs += 1
                 
@@ -242,14 +361,17 @@ def run_experiments_astar():
                 "summary": {
                     "total_successful_runs": successful_runs,
                     "grid_generation_failures": grid_generation_failures,
-                    "average_steps": np.mean([r["steps"] for r in difficulty_results]) if difficulty_results else 0,
-                    "average_runtime": np.mean([r["runtime"] for r in difficulty_results]) if difficulty_results else 0,
-                    "average_total_cost": np.mean([r["total_cost"] for r in difficulty_results]) if difficulty_results else 0,
-                    "average_nodes_expanded": np.mean([r["nodes_expanded"] for r in difficulty_results]) if difficulty_results else 0,
-                    "success_rate": np.mean([r["path_found"] for r in difficulty_results]) if difficulty_results else 0
+                    "average_steps": aggregators[heuristic].mean("steps"),
+                    "average_runtime": aggregators[heuristic].mean("runtime"),
+                    "average_total_cost": aggregators[heuristic].mean("total_cost"),
+                    "average_nodes_expanded": aggregators[heuristic].mean("nodes_expanded"),
+                    "success_rate": aggregators[heuristic].mean("path_found"),
+                    "distributions": aggregators[heuristic].summary(search_metrics)
                 }
             }
-            
+            if stopper is not None:
+                results[heuristic][f"difficulty_{difficulty}"]["summary"]["precision"] = stopper.precision(aggregators[heuristic])
+
             # saving intermediate results
             with open(os.path.join(results_dir, f'astar_{heuristic}_results_difficulty_{difficulty}.json'), 'w') as f:
                 json.dump({f"difficulty_{difficulty}": results[heuristic][f"difficulty_{difficulty}"]}, f, indent=4)
@@ -270,9 +392,10 @@ def test_random_agent(grid, initial_node, goal_node, grid_size):
     current_node = initial_node
     path_found = False
     max_steps = grid_size[0] * grid_size[1] * 2  # setting an empirical limit
+    neighbor_table = NeighborTable(grid)  # legal moves looked up per step
 
     while metrics.steps < max_steps:
-        next_node = RandomAgent.select_action_grid(grid, current_node)
+        next_node = RandomAgent.select_action_grid(grid, current_node, neighbor_table)
         metrics.increase_steps()
 
         if next_node == goal_node:
@@ -292,11 +415,59 @@ def test_random_agent(grid, initial_node, goal_node, grid_size):
         "nodes_expanded": None  # Not applicable for Random Agent
     }
 
-def run_experiments_random():
+def test_random_agent_exact(grid, initial_node, goal_node, grid_size):
+    """
+    Analyze the random agent on a given grid with the exact Markov-chain
+    solve instead of simulating a walk, and return metrics
+    """
+    from random_agent_analysis import analyze_random_agent  # loads scipy.sparse
+
+    metrics = TrackMetrics()
+    metrics.timer_on()
+
+    max_steps = grid_size[0] * grid_size[1] * 2  # same limit as the simulation
+    analysis = analyze_random_agent(grid, initial_node, goal_node, max_steps)
+
+    runtime = metrics.timer_off()
+
+    return {
+        "steps": analysis["expected_steps_when_successful"] or 0,
+        "runtime": runtime,
+        "path_found": analysis["success_probability"] > 0,
+        "success_probability": analysis["success_probability"],
+        "expected_steps": analysis["expected_steps"],
+        "max_steps_reached": False,  # is not applicable for the exact analysis
+        "total_cost": None,  # Not applicable for Random Agent
+        "nodes_expanded": None  # Not applicable for Random Agent
+    }
+
+def run_experiments_random(exact=False, adaptive=False, target_relative_width=0.05, min_runs=10, corpus=None, grid_size=(32, 32), keep_runs=True):
+    """
+    Run experiments for the random agent
+
+    Args:
+        exact (bool): replaces the simulated walks by the exact Markov-chain
+                      analysis, so success_rate no longer depends on sampling noise
+        adaptive (bool): stops a difficulty once the confidence interval of
+                         every metric is narrower than target_relative_width
+                         (half width / mean) instead of always making
+                         runs_per_difficulty runs, which becomes the cap; the
+                         achieved precision is stored in the summary
+        target_relative_width (float): precision target of the adaptive mode
+        min_runs (int): runs made before the adaptive mode may stop
+        corpus (GridCorpus): reads the grids from a pre-generated corpus
+                             (see grid_corpus.py) instead of generating
+                             them, so every agent and sweep sees the same inputs
+        grid_size (tuple): (rows, cols) of the grids
+        keep_runs (bool): store every run in the results; the summaries are
+                          aggregated while running and do not need them
+    """
     # problem settings
-    grid_size = (32, 32)
     difficulties = range(0, 91, 10)
     runs_per_difficulty = 100
+    # in adaptive mode runs_per_difficulty is only the cap
+    stopper = SequentialStopper(random_metrics, target_relative_width, min_runs=min_runs,
+                                max_runs=runs_per_difficulty) if adaptive else None
     results = {}
 
     # creating results directory if it doesn't exist
@@ -310,19 +481,24 @@ def run_experiments_random():
         print(f"{'='*50}")
 
         difficulty_results = []
+        aggregator = MetricAggregator(random_summary_metrics)
         successful_runs = 0
         grid_generation_failures = 0
 
         while successful_runs < runs_per_difficulty:
+            if stopper is not None and stopper.should_stop(aggregator):
+                print(f"Target precision reached after {successful_runs} runs")
+                break
+            if corpus is not None and successful_runs >= corpus.count(grid_size, difficulty):
+                print(f"Corpus holds only {successful_runs} grids for difficulty {difficulty}")
+                break
             try:
                 # setting max_attempts based on difficulty level to find a solution
                 max_attempts = 1000 if difficulty >= 70 else 500
 
                 # finding a solvable grid
-                grid, initial_node, goal_node = find_solvable_grid(
-                    grid_size, 
-                    difficulty,
-                    max_attempts
+                grid, initial_node, goal_node, seed = solvable_grid(
+                    corpus, grid_size, difficulty, successful_runs, max_attempts
                 )
 
                 if grid is None:
@@ -334,15 +510,21 @@ def run_experiments_random():
                     continue
 
                 # testing with random agent
-                run_results = test_random_agent(grid, initial_node, goal_node, grid_size)
+                if exact:
+                    run_results = test_random_agent_exact(grid, initial_node, goal_node, grid_size)
+                else:
+                    run_results = test_random_agent(grid, initial_node, goal_node, grid_size)
 
                 # Adding additional information for metrics and plots
                 run_results.update({
                     "run_number": successful_runs + 1,
-                    "difficulty": difficulty
+                    "difficulty": difficulty,
+                    "seed": seed
                 })
 
-                difficulty_results.append(run_results)
+                aggregator.add(run_results)
+                if keep_runs:
+                    difficulty_results.append(run_results)
                 successful_runs += 1
 
                 if successful_runs % 10 == 0:
@@ -357,11 +539,18 @@ def run_experiments_random():
             "summary": {
                 "total_successful_runs": successful_runs,
                 "grid_generation_failures": grid_generation_failures,
-                "average_steps": np.mean([r["steps"] for r in difficulty_results]) if difficulty_results else 0,
-                "average_runtime": np.mean([r["runtime"] for r in difficulty_results]) if difficulty_results else 0,
-                "success_rate": np.mean([r["path_found"] for r in difficulty_results]) if difficulty_results else 0
+                "average_steps": aggregator.mean("steps"),
+                "average_runtime": aggregator.mean("runtime"),
+                "success_rate": aggregator.mean("success_probability" if exact else "path_found"),
+                "distributions": aggregator.summary(random_metrics)
             }
         }
+        if exact:
+            results[f"difficulty_{difficulty}"]["summary"]["average_expected_steps"] = (
+                aggregator.mean("expected_steps")
+            )
+        if stopper is not None:
+            results[f"difficulty_{difficulty}"]["summary"]["precision"] = stopper.precision(aggregator)
 
         # Saving intermediate results in results folder
         with open(os.path.join(results_dir, f'random_agent_results_difficulty_{difficulty}.json'), 'w') as f:
@@ -373,15 +562,32 @@ def run_experiments_random():
 
     return results
 
-def run_experiments_all():
+def run_experiments_all(adaptive=False, target_relative_width=0.05, min_runs=10, corpus=None, grid_size=(32, 32), keep_runs=True):
     """
     Run experiments for all agents (A* with both heuristics, UCS, and Random) 
     using the same grid configurations
+
+    Args:
+        adaptive (bool): stops a difficulty once the confidence interval of
+                         every metric of every agent is narrower than target_relative_width
+                         (half width / mean) instead of always making
+                         runs_per_difficulty runs, which becomes the cap; the
+                         achieved precision is stored in the summary
+        target_relative_width (float): precision target of the adaptive mode
+        min_runs (int): runs made before the adaptive mode may stop
+        corpus (GridCorpus): reads the grids from a pre-generated corpus
+                             (see grid_corpus.py) instead of generating
+                             them, so every agent and sweep sees the same inputs
+        grid_size (tuple): (rows, cols) of the grids
+        keep_runs (bool): store every run in the results; the summaries are
+                          aggregated while running and do not need them
     """
     # grid problem settings
-    grid_size = (32, 32)
     difficulties = range(0, 91, 10)
     runs_per_difficulty = 100
+    # in adaptive mode runs_per_difficulty is only the cap
+    stopper = SequentialStopper(search_metrics, target_relative_width, min_runs=min_runs,
+                                max_runs=runs_per_difficulty) if adaptive else None
     results = {
         "astar_euclidean": {},
         "astar_octile": {},
@@ -406,19 +612,27 @@ def run_experiments_all():
             "ucs": [],
             "random": []
         }
+        aggregators = {
+            agent_type: MetricAggregator(random_summary_metrics if agent_type == "random" else search_summary_metrics)
+            for agent_type in difficulty_results
+        }
         successful_runs = 0
         grid_generation_failures = 0
 
         while successful_runs < runs_per_difficulty:
+            if stopper is not None and stopper.should_stop(*aggregators.values()):
+                print(f"Target precision reached after {successful_runs} runs")
+                break
+            if corpus is not None and successful_runs >= corpus.count(grid_size, difficulty):
+                print(f"Corpus holds only {successful_runs} grids for difficulty {difficulty}")
+                break
             try:
                 # setting max_attempts based on difficulty level to find a solution
                 max_attempts = 1000 if difficulty >= 70 else 500
 
                 # getting a solvable grid - to be be used for all the agents
-                grid, initial_node, goal_node = find_solvable_grid(
-                    grid_size, 
-                    difficulty,
-                    max_attempts
+                grid, initial_node, goal_node, seed = solvable_grid(
+                    corpus, grid_size, difficulty, successful_runs, max_attempts
                 )
 
                 if grid is None:
@@ -434,33 +648,45 @@ def run_experiments_all():
                 run_results_euclidean = test_astar_agent(grid, initial_node, goal_node, grid_size, "euclidean")
                 run_results_euclidean.update({
                     "run_number": successful_runs + 1,
-                    "difficulty": difficulty
+                    "difficulty": difficulty,
+                    "seed": seed
                 })
-                difficulty_results["astar_euclidean"].append(run_results_euclidean)
+                aggregators["astar_euclidean"].add(run_results_euclidean)
+                if keep_runs:
+                    difficulty_results["astar_euclidean"].append(run_results_euclidean)
 
                 # A* with Octile distance
                 run_results_octile = test_astar_agent(grid, initial_node, goal_node, grid_size, "octile")
                 run_results_octile.update({
                     "run_number": successful_runs + 1,
-                    "difficulty": difficulty
+                    "difficulty": difficulty,
+                    "seed": seed
                 })
-                difficulty_results["astar_octile"].append(run_results_octile)
+                aggregators["astar_octile"].add(run_results_octile)
+                if keep_runs:
+                    difficulty_results["astar_octile"].append(run_results_octile)
 
                 # UCS agent
                 run_results_ucs = test_ucs_agent(grid, initial_node, goal_node, grid_size)
                 run_results_ucs.update({
                     "run_number": successful_runs + 1,
-                    "difficulty": difficulty
+                    "difficulty": difficulty,
+                    "seed": seed
                 })
-                difficulty_results["ucs"].append(run_results_ucs)
+                aggregators["ucs"].add(run_results_ucs)
+                if keep_runs:
+                    difficulty_results["ucs"].append(run_results_ucs)
 
                 # Random agent
                 run_results_random = test_random_agent(grid, initial_node, goal_node, grid_size)
                 run_results_random.update({
                     "run_number": successful_runs + 1,
-                    "difficulty": difficulty
+                    "difficulty": difficulty,
+                    "seed": seed
                 })
-                difficulty_results["random"].append(run_results_random)
+                aggregators["random"].add(run_results_random)
+                if keep_runs:
+                    difficulty_results["random"].append(run_results_random)
 
                 successful_runs += 1
 
@@ -479,18 +705,21 @@ def run_experiments_all():
                 "summary": {
                     "total_successful_runs": successful_runs,
                     "grid_generation_failures": grid_generation_failures,
-                    "average_steps": np.mean([r["steps"] for r in agent_results]) if agent_results else 0,
-                    "average_runtime": np.mean([r["runtime"] for r in agent_results]) if agent_results else 0,
-                    "success_rate": np.mean([r["path_found"] for r in agent_results]) if agent_results else 0
+                    "average_steps": aggregators[agent_type].mean("steps"),
+                    "average_runtime": aggregators[agent_type].mean("runtime"),
+                    "success_rate": aggregators[agent_type].mean("path_found"),
+                    "distributions": aggregators[agent_type].summary(search_metrics)
                 }
             }
 
             # Add additional metrics for A* and UCS
             if agent_type.startswith('astar') or agent_type == 'ucs':
                 results[agent_type][f"difficulty_{difficulty}"]["summary"].update({
-                    "average_total_cost": np.mean([r["total_cost"] for r in agent_results]) if agent_results else 0,
-                    "average_nodes_expanded": np.mean([r["nodes_expanded"] for r in agent_results]) if agent_results else 0
+                    "average_total_cost": aggregators[agent_type].mean("total_cost"),
+                    "average_nodes_expanded": aggregators[agent_type].mean("nodes_expanded")
                 })
+            if stopper is not None:
+                results[agent_type][f"difficulty_{difficulty}"]["summary"]["precision"] = stopper.precision(aggregators[agent_type])
 
             # Saving intermediate results
             results_dir = f"./results/{base_agent}"
@@ -509,9 +738,13 @@ def run_experiments_all():
     return results
 
 if __name__ == "__main__":
+    from grid_corpus import load_or_build_corpus
+
     try:
+        # every agent runs on the same stored grids; built on the first run
+        corpus = load_or_build_corpus("./results/corpus", [(32, 32)], range(0, 91, 10), 100)
         print("Starting experiments for all agents...")
-        results = run_experiments_all()
+        results = run_experiments_all(corpus=corpus)
         print("\nExperiments completed successfully!")
         print("Results have been saved to the 'results' folder")
     except Exception as e:
@@ -0,0 +1,278 @@
+import argparse
+import json
+import os
+import tomllib
+import tracemalloc
+import numpy as np
+from astar import AStarAgentGrid, euclidean_distance, octile_distance
+from grid_corpus import GridCorpus, generate_solvable_grid
+from ucs import UCSAgentGrid
+from utils.metrics import TrackMetrics
+
+agent_factories = {
+    "ucs": UCSAgentGrid,
+    "astar_euclidean": lambda: AStarAgentGrid(euclidean_distance),
+    "astar_octile": lambda: AStarAgentGrid(octile_distance),
+}
+
+scaling_metrics = ("runtime", "nodes_expanded", "peak_memory")
+
+default_config = {
+    "grid_sizes": [16, 32, 64, 128, 256, 512, 1024, 2048, 4096],
+    "difficulties": [0, 20],
+    "agents": ["ucs", "astar_octile"],
+    "seeds": 3,  # grids per size and difficulty
+    "max_attempts": 50,  # generation attempts per solvable grid
+    "measure_memory": True,  # peak traced memory, in a second untimed run
+    "time_limit": 60.0,  # an agent whose median runtime exceeds it skips the larger sizes
+    "latency_budget": 0.1,  # seconds per query
+    "corpus": None,  # read the grids from a grid_corpus directory instead of generating them
+    "output": "./results/scaling",
+}
+
+
+def load_config(path=None, **overrides):
+    """
+    Reads a sweep configuration from a .toml or .json file and applies the
+    overrides (None values are ignored) on top of it and of default_config.
+    """
+    config = dict(default_config)
+    if path is not None:
+        if path.endswith(".toml"):
+            with open(path, "rb") as f:
+                config.update(tomllib.load(f))
+        else:
+            with open(path) as f:
+                config.update(json.load(f))
+    config.update({key: value for key, value in overrides.items() if value is not None})
+    unknown = set(config["agents"]) - set(agent_factories)
+    if unknown:
+        raise ValueError(f"Unknown agents {sorted(unknown)}; choose from {sorted(agent_factories)}")
+    return config
+
+
+def measure_agent(agent_name, grid, initial_node, goal_node, measure_memory=True):
+    """
+    Runs one agent on one grid and returns its runtime, expansions, cost and
+    (with measure_memory) the peak memory traced during a second run, kept
+    apart because tracing slows the search down.
+    """
+    metrics = TrackMetrics()
+    metrics.timer_on()
+    path, nodes_expanded, total_cost = agent_factories[agent_name]().search(grid, initial_node, goal_node)
+    runtime = metrics.timer_off()
+
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            agent_factories[agent_name]().search(grid, initial_node, goal_node)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        "runtime": runtime,
+        "nodes_expanded": nodes_expanded,
+        "total_cost": total_cost,
+        "path_found": path is not None,
+        "peak_memory": peak_memory,
+    }
+
+
+def fit_power_law(cells, values):
+    """
+    Least-squares fit of values = coefficient * cells ** exponent in log-log
+    space.
+
+    Returns:
+        dict: exponent, coefficient and r_squared, or None with fewer than
+              two distinct sizes of positive values
+    """
+    cells, values = np.asarray(cells, dtype=float), np.asarray(values, dtype=float)
+    keep = (cells > 0) & (values > 0)
+    if len(np.unique(cells[keep])) < 2:
+        return None
+    x, y = np.log(cells[keep]), np.log(values[keep])
+    exponent, intercept = np.polyfit(x, y, 1)
+    residual = y - (exponent * x + intercept)
+    spread = np.sum((y - y.mean()) ** 2)
+    return {
+        "exponent": float(exponent),
+        "coefficient": float(np.exp(intercept)),
+        "r_squared": float(1 - np.sum(residual ** 2) / spread) if spread > 0 else 1.0,
+    }
+
+
+def run_sweep(config):
+    """
+    Runs every configured agent on seeds grids per size and difficulty, from
+    the smallest size up, and fits how runtime, expansions and peak memory
+    grow with the number of cells.
+
+    Returns:
+        dict: the configuration, all runs, per-size medians ("points"), the
+              fits per agent and difficulty and the latency budget report
+    """
+    corpus = GridCorpus(config["corpus"]) if config.get("corpus") else None
+    seeds = range(config["seeds"]) if isinstance(config["seeds"], int) else config["seeds"]
+    active = list(config["agents"])
+    runs, failures, retired = [], [], {}
+
+    for size in sorted(config["grid_sizes"]):
+        grid_size = (size, size)
+        if not active:
+            break
+        for difficulty in config["difficulties"]:
+            for number, seed in enumerate(seeds):
+                if corpus is not None:
+                    if number >= corpus.count(grid_size, difficulty):
+                        break
+                    grid, initial_node, goal_node, seed = corpus.problem(grid_size, difficulty, number)
+                else:
+                    grid, initial_node, goal_node = generate_solvable_grid(
+                        grid_size, difficulty, seed, config["max_attempts"])
+                if grid is None:
+                    failures.append({"grid_size": size, "difficulty": difficulty, "seed": seed})
+                    continue
+                for agent_name in active:
+                    run = measure_agent(agent_name, grid, initial_node, goal_node, config["measure_memory"])
+                    run.update({"agent": agent_name, "grid_size": size, "cells": size * size,
+                                "difficulty": difficulty, "seed": seed})
+                    runs.append(run)
+                    print(f"{agent_name} {size}x{size} difficulty {difficulty} seed {seed}: "
+                          f"{run['runtime']:.4f} s, {run['nodes_expanded']} expansions")
+
+        # agents over the time limit at this size would only get slower
+        for agent_name in list(active):
+            times = [run["runtime"] for run in runs if run["agent"] == agent_name and run["grid_size"] == size]
+            if times and np.median(times) > config["time_limit"]:
+                active.remove(agent_name)
+                retired[agent_name] = size
+
+    points = summarize_points(runs)
+    fits = {}
+    for (agent_name, difficulty), by_size in points.items():
+        cells = [point["cells"] for point in by_size]
+        fits.setdefault(agent_name, {})[str(difficulty)] = {
+            metric: fit_power_law(cells, [point[metric] for point in by_size])
+            for metric in scaling_metrics
+        }
+    return {
+        "config": config,
+        "runs": runs,
+        "failures": failures,
+        "retired_after_size": retired,
+        "points": {f"{agent_name}/{difficulty}": by_size for (agent_name, difficulty), by_size in points.items()},
+        "fits": fits,
+        "latency_budget": budget_report(points, fits, config["latency_budget"]),
+    }
+
+
+def summarize_points(runs):
+    """Groups runs by (agent, difficulty) into per-size medians, smallest size first."""
+    groups = {}
+    for run in runs:
+        groups.setdefault((run["agent"], run["difficulty"]), {}).setdefault(run["grid_size"], []).append(run)
+    points = {}
+    for key, by_size in groups.items():
+        points[key] = []
+        for size in sorted(by_size):
+            point = {"grid_size": size, "cells": size * size, "runs": len(by_size[size])}
+            for metric in scaling_metrics:
+                values = [run[metric] for run in by_size[size] if run[metric] is not None]
+                point[metric] = float(np.median(values)) if values else None
+            points[key].append(point)
+    return points
+
+
+def budget_report(points, fits, latency_budget):
+    """
+    For every agent and difficulty: the largest measured size whose median
+    runtime fits the latency budget, and the side length at which the
+    runtime fit reaches the budget.
+    """
+    report = {}
+    for (agent_name, difficulty), by_size in points.items():
+        within = [point["grid_size"] for point in by_size if point["runtime"] <= latency_budget]
+        fit = fits[agent_name][str(difficulty)]["runtime"]
+        predicted = None
+        if fit is not None and fit["exponent"] > 0:
+            predicted = float(np.sqrt((latency_budget / fit["coefficient"]) ** (1 / fit["exponent"])))
+        report[f"{agent_name}/{difficulty}"] = {
+            "largest_measured_size_within_budget": max(within) if within else None,
+            "predicted_size_at_budget": predicted,
+        }
+    return report
+
+
+def plot_scaling(sweep, output_dir):
+    """Saves one log-log plot per metric, with the measured medians and fitted lines."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    labels = {"runtime": "median runtime (s)", "nodes_expanded": "median nodes expanded",
+              "peak_memory": "median peak memory (bytes)"}
+    for metric in scaling_metrics:
+        plt.figure(figsize=(8, 6))
+        for key, by_size in sweep["points"].items():
+            measured = [(point["cells"], point[metric]) for point in by_size if point[metric]]
+            if not measured:
+                continue
+            cells, values = zip(*measured)
+            agent_name, difficulty = key.split("/")
+            fit = sweep["fits"][agent_name][difficulty][metric]
+            label = key if fit is None else f"{key} (~N^{fit['exponent']:.2f})"
+            line, = plt.loglog(cells, values, "o", label=label)
+            if fit is not None:
+                span = np.array([min(cells), max(cells)], dtype=float)
+                plt.loglog(span, fit["coefficient"] * span ** fit["exponent"], "--", color=line.get_color())
+        if metric == "runtime":
+            plt.axhline(sweep["config"]["latency_budget"], color="grey", linestyle=":", label="latency budget")
+        plt.xlabel("cells (N)")
+        plt.ylabel(labels[metric])
+        plt.title(f"Scaling of {metric} with grid size")
+        plt.legend()
+        plt.grid(True, which="both", alpha=0.3)
+        plt.savefig(os.path.join(output_dir, f"scaling_{metric}.png"))
+        plt.close()
+
+
+def print_report(sweep):
+    """Prints the fitted exponents and the latency budget report."""
+    for agent_name, by_difficulty in sweep["fits"].items():
+        for difficulty, fits in by_difficulty.items():
+            parts = [f"{metric} ~ N^{fit['exponent']:.2f} (R2 {fit['r_squared']:.2f})"
+                     for metric, fit in fits.items() if fit is not None]
+            print(f"{agent_name}, difficulty {difficulty}: " + (", ".join(parts) or "not enough sizes to fit"))
+    budget = sweep["config"]["latency_budget"]
+    for key, entry in sweep["latency_budget"].items():
+        predicted = entry["predicted_size_at_budget"]
+        print(f"{key}: within {budget} s up to {entry['largest_measured_size_within_budget']} measured"
+              + (f", about {predicted:.0f}x{predicted:.0f} predicted" if predicted else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep grid sizes and fit how the agents scale.")
+    parser.add_argument("--config", type=str, help="TOML or JSON sweep configuration")
+    parser.add_argument("--grid_sizes", type=int, nargs="+", help="Side lengths of the square grids")
+    parser.add_argument("--difficulties", type=int, nargs="+")
+    parser.add_argument("--agents", type=str, nargs="+", help=f"Any of {', '.join(agent_factories)}")
+    parser.add_argument("--seeds", type=int, help="Grids per size and difficulty")
+    parser.add_argument("--time_limit", type=float)
+    parser.add_argument("--latency_budget", type=float)
+    parser.add_argument("--corpus", type=str)
+    parser.add_argument("--output", type=str)
+    parser.add_argument("--no_memory", action="store_true", help="Skip the peak memory runs")
+    args = parser.parse_args()
+
+    config = load_config(args.config, grid_sizes=args.grid_sizes, difficulties=args.difficulties,
+                         agents=args.agents, seeds=args.seeds, time_limit=args.time_limit,
+                         latency_budget=args.latency_budget, corpus=args.corpus, output=args.output,
+                         measure_memory=False if args.no_memory else None)
+    sweep = run_sweep(config)
+    os.makedirs(config["output"], exist_ok=True)
+    with open(os.path.join(config["output"], "scaling_results.json"), "w") as f:
+        json.dump(sweep, f, indent=4)
+    plot_scaling(sweep, config["output"])
+    print_report(sweep)
@@ -0,0 +1,233 @@
+import heapq
+import itertools
+import math
+import numpy as np
+from terrain import min_terrain_weight
+from utils.compact_path import format_path
+from utils.neighbor_masks import NeighborTable
+from utils.shared_grid import grid_array
+
+
+def min_moves(table, initial_node, goal_node):
+    """
+    Returns the fewest moves from the initial node to the goal, or None if
+    the goal cannot be reached, by a breadth-first search over the moves of
+    a NeighborTable (one bit per cell).
+    """
+    seen = np.zeros(table.masks.shape, dtype=bool)
+    seen[initial_node] = True
+    layer, moves = [initial_node], 0
+    while layer:
+        next_layer = []
+        for node in layer:
+            if node == goal_node:
+                return moves
+            for neighbor in table.neighbor_cells(node):
+                if not seen[neighbor]:
+                    seen[neighbor] = True
+                    next_layer.append(neighbor)
+        layer, moves = next_layer, moves + 1
+    return None
+
+
+class SMARecord:
+    """One path to a cell held in memory by SMAStarAgentGrid."""
+
+    __slots__ = ("cell", "g", "f", "depth", "parent", "moves", "next_move", "children", "forgotten", "version")
+
+    def __init__(self, cell, g, f, depth, parent):
+        self.cell = cell
+        self.g = g
+        self.f = f  # lower bound on a solution through this path (pathmax)
+        self.depth = depth
+        self.parent = parent
+        self.moves = None  # (neighbor, step cost) list, filled on the first expansion
+        self.next_move = 0  # moves[:next_move] have been generated
+        self.children = 0  # child records in memory
+        self.forgotten = {}  # cell -> backed-up f of a forgotten child
+        self.version = 0  # bumped on every change, invalidates older heap entries
+
+    def pending_f(self):
+        """Best f among the successors still to (re)generate, inf if none."""
+        best = min(self.forgotten.values(), default=math.inf)
+        if self.moves is None or self.next_move < len(self.moves):
+            best = min(best, self.f)
+        return best
+
+
+class SMAStarAgentGrid:
+    """
+    Agent that performs simplified memory-bounded A* (SMA*) on the grid search problem.
+
+    Works like A* while at most max_nodes paths are held in memory, and
+    generates one successor per step. The record to extend is the deepest
+    one with the lowest f among its successors not yet in memory. When the
+    budget is exceeded the worst leaf (highest f, shallowest) is dropped and
+    its f is backed up into its parent, which regenerates that child when
+    the backed-up f becomes the lowest again. A path is not extended to a
+    cell already held by a path at most as costly and as deep, nor when it
+    could not reach the goal within the budget.
+
+    A path deeper than max_nodes - 2 moves cannot be held, so with a budget
+    above the optimal path's depth plus one the result is optimal; with a
+    smaller one the search fails instead of exhausting memory.
+
+    Budgets only a little above that depth make the search thrash: with
+    few spare records, the same paths are forgotten and regenerated over
+    and over, and the expansions grow exponentially with the path length.
+    max_expansions caps the work; past it the search gives up and returns
+    no path, with capped set.
+    Goals that are unreachable, or further in moves than the budget can
+    hold, are detected first with a breadth-first search.
+
+    Attributes:
+        nodes_expanded (int): expansions, including regenerations.
+        re_expansions (int): expansions of cells already expanded before.
+        forgotten (int): paths dropped to stay within the budget.
+        peak_nodes (int): largest number of paths held in memory.
+        capped (bool): True if the last search stopped at max_expansions.
+    """
+
+    def __init__(self, heuristic_func, max_nodes=10000, path_format="list",
+                 connectivity=8, corner_cutting="allow", neighbor_table=None, max_expansions=None):
+        self.heuristic_func = heuristic_func
+        self.max_nodes = max_nodes  # memory budget in stored paths
+        self.max_expansions = max_expansions  # work cap, None for no cap
+        self.path_format = path_format
+        self.connectivity = connectivity
+        self.corner_cutting = corner_cutting
+        self.neighbor_table = neighbor_table
+        self.nodes_expanded = 0
+        self.re_expansions = 0
+        self.forgotten = 0
+        self.peak_nodes = 0
+        self.capped = False
+
+    def search(self, grid, initial_node, goal_node):
+        """
+        Implements SMA* on grid_search to find the optimal path within the node budget.
+
+        Args:
+            grid (np.ndarray): The grid representing the search space.
+            initial_node (tuple): The starting coordinates in the grid (row, col).
+            goal_node (tuple): The goal node coordinates in the grid (row, col).
+
+        Returns:
+            tuple: (path from initial node to goal node or None, number of nodes expanded, total cost)
+        """
+        grid = grid_array(grid)
+        max_expansions = math.inf if self.max_expansions is None else self.max_expansions
+        table = self.neighbor_table
+        if table is None:
+            table = NeighborTable(grid, self.connectivity, self.corner_cutting)
+        neighbors_of = table.neighbors
+        terrain_scale = min_terrain_weight(grid)  # keeps the heuristic admissible
+        heuristic = lambda node: self.heuristic_func(node, goal_node) * terrain_scale
+        fewest_moves = None if grid[initial_node] == -1 else min_moves(table, initial_node, goal_node)
+        if fewest_moves is None or fewest_moves >= self.max_nodes:
+            # unreachable, or no path fits in the budget: a bounded search
+            # would try every path within the budget before failing
+            return None, 0, None
+        expanded_before = np.zeros(grid.shape, dtype=bool)
+
+        root = SMARecord(initial_node, 0, heuristic(initial_node), 0, None)
+        records_at = {initial_node: [root]}  # cell -> its records in memory
+        stored = 1
+        counter = itertools.count()  # tie breaker of equal heap keys
+        frontier = []  # (pending f, -depth, tie, version, record): best record first
+        worst = []  # (-f, depth, tie, version, record): worst leaf first
+
+        def update(record):
+            # re-files a changed record in the heaps; older entries become outdated
+            record.version += 1
+            pending = record.pending_f()
+            if pending < math.inf:
+                heapq.heappush(frontier, (pending, -record.depth, next(counter), record.version, record))
+            if record.children == 0 and record.parent is not None:
+                heapq.heappush(worst, (-pending, record.depth, next(counter), record.version, record))
+
+        def remove(record, backed_up_f):
+            # drops a leaf and backs its f up into its parent; a parent left
+            # with nothing to search below it is dropped in turn
+            nonlocal stored
+            while True:
+                record.version += 1
+                records_at[record.cell].remove(record)
+                stored -= 1
+                parent = record.parent
+                parent.children -= 1
+                if backed_up_f < math.inf:
+                    parent.forgotten[record.cell] = min(parent.forgotten.get(record.cell, math.inf), backed_up_f)
+                if parent.children or parent.pending_f() < math.inf or parent.parent is None:
+                    update(parent)
+                    return
+                record, backed_up_f = parent, math.inf
+
+        def dominated(cell, g, depth):
+            # a path at most as costly and as deep has every completion of this one
+            return any(other.g <= g and other.depth <= depth for other in records_at.get(cell, ()))
+
+        def next_successor(record):
+            # the next move not generated yet, then the best forgotten child
+            if record.next_move < len(record.moves):
+                cell, step_cost = record.moves[record.next_move]
+                record.next_move += 1
+                return cell, step_cost, -math.inf
+            cell = min(record.forgotten, key=record.forgotten.get)
+            backed_up_f = record.forgotten.pop(cell)
+            step_cost = next(cost for neighbor, cost in record.moves if neighbor == cell)
+            return cell, step_cost, backed_up_f
+
+        update(root)
+        while frontier:
+            pending, _, _, version, record = heapq.heappop(frontier)
+            if version != record.version:
+                continue  # outdated entry
+            if pending == math.inf:
+                break  # everything left needs more memory than the budget
+            if record.cell == goal_node:
+                total_cost = record.g
+                path = []
+                while record is not None:
+                    path.append(record.cell)
+                    record = record.parent
+                path.reverse()  # path from start to goal
+                return format_path(path, self.path_format), self.nodes_expanded, total_cost
+
+            if record.moves is None or record.next_move == 0:
+                if self.nodes_expanded >= max_expansions:
+                    self.capped = True
+                    return None, self.nodes_expanded, None  # gave up
+                record.moves = neighbors_of(record.cell)
+                self.nodes_expanded += 1
+                if expanded_before[record.cell]:
+                    self.re_expansions += 1
+                expanded_before[record.cell] = True
+
+            if record.moves or record.forgotten:
+                cell, step_cost, backed_up_f = next_successor(record)
+                g, depth = record.g + step_cost, record.depth + 1
+                if not dominated(cell, g, depth):
+                    if depth >= self.max_nodes - 1 and cell != goal_node:
+                        f = math.inf  # its path cannot be completed within the budget
+                    else:
+                        f = max(g + heuristic(cell), record.f, backed_up_f)  # pathmax
+                    child = SMARecord(cell, g, f, depth, record)
+                    records_at.setdefault(cell, []).append(child)
+                    stored += 1
+                    record.children += 1
+                    update(child)
+
+            if record.children == 0 and record.pending_f() == math.inf and record.parent is not None:
+                remove(record, math.inf)  # nothing left to search below this path
+            else:
+                update(record)
+            while stored > self.max_nodes and worst:
+                _, _, _, version, leaf = heapq.heappop(worst)
+                if version != leaf.version or leaf.children:
+                    continue  # outdated entry or no longer a leaf
+                remove(leaf, leaf.pending_f())
+                self.forgotten += 1
+            self.peak_nodes = max(self.peak_nodes, stored)
+
+        return None, self.nodes_expanded, None  # No path found within the budget
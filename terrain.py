@@ -0,0 +1,61 @@
+import math
+import random
+import numpy as np
+
+# Grid cell values: -1 is blocked, 0 is free ground with weight 1 and a
+# value k in 1..127 is terrain whose traversal weight is k. Moving into a
+# cell costs the step length (1 or sqrt(2)) times the weight of that cell.
+
+# fixed-point step costs for exact integer arithmetic: the orthogonal step
+# is COST_SCALE units and the diagonal step is sqrt(2) rounded down, so the
+# scaled heuristics below stay admissible and consistent
+COST_SCALE = 1000
+ORTHOGONAL_COST = COST_SCALE
+DIAGONAL_COST = math.isqrt(2 * COST_SCALE * COST_SCALE)  # floor(sqrt(2) * COST_SCALE)
+
+
+def terrain_weight(value):
+    """Returns the traversal weight of a free cell value."""
+    return value if value > 1 else 1
+
+
+def terrain_weights(grid):
+    """Returns the traversal weight of every cell (0 for blocked cells)."""
+    weights = np.maximum(grid.astype(np.int64), 1)
+    weights[grid == -1] = 0
+    return weights
+
+
+def min_terrain_weight(grid):
+    """
+    Returns the smallest traversal weight of the free cells; heuristics are
+    multiplied by it to stay admissible on weighted maps.
+    """
+    free_values = grid[grid != -1]
+    if free_values.size == 0:
+        return 1
+    return max(int(free_values.min()), 1)
+
+
+def integer_heuristic_scale(grid):
+    """
+    Factor turning a heuristic measured in unit steps into integer cost units.
+
+    DIAGONAL_COST / sqrt(2) <= ORTHOGONAL_COST, so a heuristic consistent for
+    steps of 1 and sqrt(2) stays consistent (after rounding down) for the
+    integer steps ORTHOGONAL_COST and DIAGONAL_COST times the cell weights.
+    """
+    return min_terrain_weight(grid) * DIAGONAL_COST / math.sqrt(2)
+
+
+def add_random_terrain(grid, max_weight, fraction=0.5):
+    """
+    Assigns random weights in 2..max_weight to a fraction of the free cells
+    (in place) and returns the grid.
+    """
+    free_cells = list(zip(*np.nonzero(grid == 0)))
+    if max_weight < 2 or not free_cells:
+        return grid
+    for node in random.sample(free_cells, int(fraction * len(free_cells))):
+        grid[node] = random.randint(2, max_weight)
+    return grid
@@ -0,0 +1,25 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# the modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def random_grid(rng, size, blocked=0.3, max_weight=1):
+    """A random grid with free corners; free cells get weights 1..max_weight."""
+    grid = np.where(rng.random(size) < blocked, -1, 0).astype(np.int8)
+    if max_weight > 1:
+        weights = rng.integers(1, max_weight + 1, size)
+        grid = np.where(grid == -1, -1, np.where(weights > 1, weights, 0)).astype(np.int8)
+    grid[0, 0] = 0
+    grid[-1, -1] = 0
+    return grid
+
+
+@pytest.fixture
+def grids():
+    """Twelve seeded grids (some weighted, some unsolvable) with corner start and goal."""
+    rng = np.random.default_rng(7)
+    return [random_grid(rng, (12, 15), blocked=0.3, max_weight=1 + i % 3) for i in range(12)]
@@ -0,0 +1,17 @@
+import numpy as np
+from batched_search import batched_search
+from ucs import UCSAgentGrid
+
+
+def test_costs_match_ucs(grids):
+    stack = np.stack(grids)
+    starts = np.zeros((len(grids), 2), dtype=int)
+    goals = np.tile([grids[0].shape[0] - 1, grids[0].shape[1] - 1], (len(grids), 1))
+    result = batched_search(stack, starts, goals, return_paths=True)
+    for grid, cost, path in zip(grids, result["cost"], result["paths"]):
+        ucs_path, _, ucs_cost = UCSAgentGrid().search(grid, (0, 0), tuple(goals[0]))
+        if ucs_cost is None:
+            assert np.isinf(cost) and path is None
+        else:
+            assert np.isclose(cost, ucs_cost)
+            assert path[0] == (0, 0) and path[-1] == tuple(goals[0])
@@ -0,0 +1,36 @@
+import pickle
+
+import numpy as np
+import pytest
+from ucs import UCSAgentGrid
+from utils.compact_path import PackedPath, decode_path, encode_path, path_cost, path_length
+
+
+def test_encode_decode_round_trip_on_agent_paths(grids):
+    for grid in grids:
+        path, _, cost = UCSAgentGrid().search(grid, (0, 0), (grid.shape[0] - 1, grid.shape[1] - 1))
+        if path is None:
+            continue
+        packed = UCSAgentGrid(path_format="packed").search(grid, (0, 0), (grid.shape[0] - 1, grid.shape[1] - 1))[0]
+        assert isinstance(packed, PackedPath)
+        assert decode_path(packed).tolist() == [list(node) for node in path]
+        assert len(packed) == len(path)
+        assert list(packed) == path
+        assert list(pickle.loads(pickle.dumps(packed))) == path
+        assert np.isclose(path_cost(packed, grid), cost)
+        assert np.isclose(path_length(packed), path_length(path))
+
+
+def test_every_move_survives_packing():
+    path = [(5, 5), (4, 5), (5, 5), (5, 4), (5, 5), (4, 4), (5, 5), (4, 6), (5, 5), (6, 4), (5, 5), (6, 6)]
+    packed = encode_path(path)
+    assert packed.num_moves == 11
+    assert list(packed) == path
+    assert np.isclose(path_length(path), 4 + 7 * np.sqrt(2))
+
+
+def test_rejects_cells_that_are_not_neighbors():
+    with pytest.raises(ValueError):
+        encode_path([(0, 0), (0, 2)])
+    with pytest.raises(ValueError):
+        encode_path([(0, 0), (0, 0)])
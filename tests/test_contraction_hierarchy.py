@@ -0,0 +1,21 @@
+import numpy as np
+from contraction_hierarchy import ContractionHierarchy
+from ucs import UCSAgentGrid
+from utils.compact_path import path_cost
+
+
+def test_queries_match_ucs(grids):
+    rng = np.random.default_rng(1)
+    for grid in grids[:6]:
+        hierarchy = ContractionHierarchy.build(grid)
+        free = np.argwhere(grid != -1)
+        for initial_node, goal_node in free[rng.integers(len(free), size=(5, 2))]:
+            initial_node, goal_node = tuple(initial_node.tolist()), tuple(goal_node.tolist())
+            _, _, ucs_cost = UCSAgentGrid().search(grid, initial_node, goal_node)
+            path, _, cost = hierarchy.query(initial_node, goal_node)
+            if ucs_cost is None:
+                assert path is None and cost is None
+            else:
+                assert np.isclose(cost, ucs_cost)
+                assert path[0] == initial_node and path[-1] == goal_node
+                assert np.isclose(path_cost(path, grid), ucs_cost)
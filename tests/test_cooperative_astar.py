@@ -0,0 +1,32 @@
+import numpy as np
+from cooperative_astar import CooperativeAStarPlanner, find_conflicts
+
+
+def test_plans_are_conflict_free():
+    # the planner once called NeighborTable.neighbors with the grid as well
+    grid = np.zeros((6, 6), dtype=np.int8)
+    grid[2, 1:5] = -1
+    agents = [((0, 0), (5, 5)), ((5, 5), (0, 0)), ((0, 5), (5, 0)), ((5, 0), (0, 5))]
+    paths, stats = CooperativeAStarPlanner(grid).plan_all(agents)
+    assert stats["planned"] == len(agents)
+    for path, (initial_node, goal_node) in zip(paths, agents):
+        assert path[0] == initial_node and path[-1] == goal_node
+    assert find_conflicts(paths) == []
+
+
+def test_conflicts_keep_agent_ids_after_a_failed_agent():
+    paths = [None, [(0, 0), (0, 1)], [(0, 1), (0, 0)]]
+    assert find_conflicts(paths) == [("edge", 1, (0, 0), 1, 2)]
+
+
+def test_failed_agent_blocks_its_start_cell():
+    grid = np.zeros((3, 5), dtype=np.int8)
+    grid[0, :] = -1
+    grid[2, :] = -1
+    grid[1, 0] = -1
+    # agent 0 cannot reach its blocked goal and stays on (1, 2), the only way through
+    planner = CooperativeAStarPlanner(grid, max_time=20)
+    paths, stats = planner.plan_all([((1, 2), (0, 0)), ((1, 1), (1, 4))])
+    assert paths[0] is None
+    assert paths[1] is None  # may not pass through the parked agent
+    assert stats["failed"] == 2
@@ -0,0 +1,39 @@
+import numpy as np
+from astar import AStarAgentGrid, octile_distance
+from dead_end_pruning import DeadEndPruner, compare_expansions
+from ucs import UCSAgentGrid
+
+
+def free_cell(rng, grid):
+    free = np.argwhere(grid != -1)
+    return tuple(int(v) for v in free[rng.integers(len(free))])
+
+
+def test_pruning_keeps_optimal_costs(grids):
+    rng = np.random.default_rng(4)
+    factories = [UCSAgentGrid, lambda: AStarAgentGrid(octile_distance)]
+    for grid in grids:
+        pruner = DeadEndPruner(grid)
+        for _ in range(5):
+            start, goal = free_cell(rng, grid), free_cell(rng, grid)
+            for factory in factories:
+                result = compare_expansions(pruner, factory, start, goal)
+                if result["cost"] is None:
+                    assert result["cost_pruned"] is None
+                else:
+                    assert np.isclose(result["cost_pruned"], result["cost"])
+                    assert result["nodes_expanded_pruned"] <= result["nodes_expanded"]
+
+
+def test_dead_end_pocket_is_pruned():
+    # a 4-connected corridor along row 1 with dead ends above and below it
+    grid = np.full((4, 7), -1, dtype=np.int8)
+    grid[1, :] = 0
+    grid[0, 2] = 0
+    grid[2:, 5] = 0
+    pruner = DeadEndPruner(grid, connectivity=4)
+    mask = pruner.relevant_mask((1, 0), (1, 6))
+    assert mask[1].all()
+    assert not mask[0, 2] and not mask[3, 5]
+    assert pruner.stats((1, 0), (1, 6))["pruned_cells"] == 3
+    assert not pruner.relevant_mask((1, 0), (0, 0)).any()
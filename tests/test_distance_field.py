@@ -0,0 +1,35 @@
+import numpy as np
+from astar import AStarAgentGrid
+from distance_field import DistanceFieldHeuristic, distance_field
+from ucs import UCSAgentGrid
+
+
+def ucs_cost(grid, initial_node, goal_node):
+    _, _, cost = UCSAgentGrid().search(grid, initial_node, goal_node)
+    return np.inf if cost is None else cost
+
+
+def test_field_equals_ucs_costs(grids):
+    rng = np.random.default_rng(3)
+    for grid in grids:
+        source = (0, 0)
+        forward = distance_field(grid, source)
+        reverse = distance_field(grid, source, reverse=True)
+        for _ in range(8):
+            node = (int(rng.integers(grid.shape[0])), int(rng.integers(grid.shape[1])))
+            if grid[node] == -1:
+                continue
+            assert np.isclose(forward[node], ucs_cost(grid, source, node))
+            assert np.isclose(reverse[node], ucs_cost(grid, node, source))
+
+
+def test_heuristic_is_exact_and_admissible_on_weighted_terrain(grids):
+    for grid in grids:
+        goal_node = (grid.shape[0] - 1, grid.shape[1] - 1)
+        heuristic = DistanceFieldHeuristic(grid, goal_node)
+        _, _, expected = UCSAgentGrid().search(grid, (0, 0), goal_node)
+        path, _, cost = AStarAgentGrid(heuristic).search(grid, (0, 0), goal_node)
+        if expected is None:
+            assert path is None
+        else:
+            assert np.isclose(cost, expected)
@@ -0,0 +1,20 @@
+import numpy as np
+from astar import AStarAgentGrid, octile_distance
+from distance_oracle import DistanceOracle
+from utils.compact_path import path_cost
+
+
+def test_distances_and_paths_match_astar(grids):
+    rng = np.random.default_rng(0)
+    for grid in grids:
+        oracle = DistanceOracle(grid)
+        free = np.argwhere(grid != -1)
+        for initial_node, goal_node in free[rng.integers(len(free), size=(5, 2))]:
+            initial_node, goal_node = tuple(initial_node.tolist()), tuple(goal_node.tolist())
+            _, _, cost = AStarAgentGrid(octile_distance).search(grid, initial_node, goal_node)
+            path = oracle.path(initial_node, goal_node)
+            if cost is None:
+                assert np.isinf(oracle.distance(initial_node, goal_node)) and path is None
+            else:
+                assert np.isclose(oracle.distance(initial_node, goal_node), cost, rtol=1e-5)
+                assert np.isclose(path_cost(path, grid), cost)
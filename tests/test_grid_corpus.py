@@ -0,0 +1,40 @@
+import numpy as np
+from distance_field import is_solvable
+from grid_corpus import build_corpus, load_or_build_corpus
+
+
+def test_build_and_load_round_trip(tmp_path):
+    corpus = build_corpus(tmp_path / "plain", [(8, 8), (6, 10)], [0, 30], 4, verbose=False)
+    compressed = build_corpus(tmp_path / "compressed", [(8, 8), (6, 10)], [0, 30], 4, compressed=True,
+                              verbose=False)
+    assert len(corpus) == len(compressed) == 16
+    for grid_size in [(8, 8), (6, 10)]:
+        for difficulty in [0, 30]:
+            grids, initial_nodes, goal_nodes, seeds = corpus.batch(grid_size, difficulty)
+            assert grids.shape == (4, *grid_size) and seeds == [0, 1, 2, 3]
+            for number in range(4):
+                grid, initial_node, goal_node, _ = corpus.problem(grid_size, difficulty, number)
+                assert is_solvable(grid, initial_node, goal_node)
+                assert np.array_equal(grid, grids[number])
+                assert np.array_equal(grid, compressed.problem(grid_size, difficulty, number)[0])
+
+
+def test_every_key_yields_the_same_grid(tmp_path):
+    first = build_corpus(tmp_path / "first", [(8, 8)], [20, 40], 3, verbose=False)
+    # a different seed list does not change the grid of a shared key
+    second = build_corpus(tmp_path / "second", [(8, 8)], [40], [2, 1], verbose=False)
+    assert np.array_equal(first.problem((8, 8), 40, 1)[0], second.problem((8, 8), 40, 1)[0])
+    assert np.array_equal(first.problem((8, 8), 40, 2)[0], second.problem((8, 8), 40, 0)[0])
+
+
+def test_gives_up_after_consecutive_failures(tmp_path):
+    corpus = build_corpus(tmp_path, [(8, 8)], [0, 90], 50, max_attempts=5, max_failures=3, verbose=False)
+    assert corpus.count((8, 8), 0) == 50
+    assert corpus.count((8, 8), 90) == 0 and corpus.attempted((8, 8), 90) == 3
+    assert corpus.index["gave_up"] == [{"grid_size": [8, 8], "difficulty": 90, "seed": 2}]
+    assert corpus.covers([(8, 8)], [0, 90], 50)
+    assert not corpus.covers([(8, 8)], [0, 90], 51)
+    # the given-up difficulty is not generated again
+    modified = (tmp_path / "index.json").stat().st_mtime_ns
+    load_or_build_corpus(tmp_path, [(8, 8)], [0, 90], 50)
+    assert (tmp_path / "index.json").stat().st_mtime_ns == modified
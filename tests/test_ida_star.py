@@ -0,0 +1,25 @@
+import numpy as np
+from astar import AStarAgentGrid, octile_distance
+from ida_star import IDAStarAgentGrid
+from utils.compact_path import path_cost
+
+
+def test_costs_match_astar(grids):
+    for grid in grids:
+        goal_node = (grid.shape[0] - 1, grid.shape[1] - 1)
+        _, _, expected = AStarAgentGrid(octile_distance).search(grid, (0, 0), goal_node)
+        path, _, cost = IDAStarAgentGrid(octile_distance).search(grid, (0, 0), goal_node)
+        if expected is None:
+            assert path is None and cost is None
+        else:
+            assert np.isclose(cost, expected)
+            assert np.isclose(path_cost(path, grid), cost)
+
+
+def test_gives_up_at_the_expansion_cap():
+    grid = np.zeros((16, 16), dtype=np.int8)
+    grid[8, 1:] = -1
+    agent = IDAStarAgentGrid(octile_distance, max_table_entries=8, max_expansions=500)
+    path, nodes_expanded, cost = agent.search(grid, (0, 15), (15, 15))
+    assert path is None and cost is None and agent.capped
+    assert nodes_expanded == 500
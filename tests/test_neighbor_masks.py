@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from utils.neighbor_masks import NeighborTable, neighbor_masks
+
+
+def neighbors_by_bounds_checks(grid, node, connectivity=8, corner_cutting="allow"):
+    rows, cols = grid.shape
+
+    def free(x, y):
+        return 0 <= x < rows and 0 <= y < cols and grid[x, y] != -1
+
+    x, y = node
+    cells = []
+    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]:
+        if not free(x + dx, y + dy):
+            continue
+        if dx and dy:
+            if connectivity == 4:
+                continue
+            if corner_cutting == "no_squeeze" and not (free(x + dx, y) or free(x, y + dy)):
+                continue
+            if corner_cutting == "forbid" and not (free(x + dx, y) and free(x, y + dy)):
+                continue
+        cells.append((x + dx, y + dy))
+    return cells
+
+
+@pytest.mark.parametrize("connectivity, corner_cutting",
+                         [(8, "allow"), (8, "no_squeeze"), (8, "forbid"), (4, "allow")])
+def test_masks_match_bounds_checks(grids, connectivity, corner_cutting):
+    for grid in grids:
+        table = NeighborTable(grid, connectivity, corner_cutting)
+        for node in zip(*np.nonzero(grid != -1)):
+            node = (int(node[0]), int(node[1]))
+            assert table.neighbor_cells(node) == neighbors_by_bounds_checks(grid, node, connectivity, corner_cutting)
+
+
+def test_squeeze_between_blocked_corners():
+    grid = np.array([[0, -1], [-1, 0]], dtype=np.int8)
+    assert NeighborTable(grid, corner_cutting="allow").neighbor_cells((0, 0)) == [(1, 1)]
+    assert NeighborTable(grid, corner_cutting="no_squeeze").neighbor_cells((0, 0)) == []
+    grid[0, 1] = 0
+    assert (1, 1) in NeighborTable(grid, corner_cutting="no_squeeze").neighbor_cells((0, 0))
+    assert (1, 1) not in NeighborTable(grid, corner_cutting="forbid").neighbor_cells((0, 0))
+
+
+@pytest.mark.parametrize("corner_cutting", ["allow", "no_squeeze", "forbid"])
+def test_set_cell_matches_a_full_rebuild(grids, corner_cutting):
+    rng = np.random.default_rng(5)
+    grid = grids[0].copy()
+    table = NeighborTable(grid, corner_cutting=corner_cutting)
+    for _ in range(100):
+        node = (int(rng.integers(grid.shape[0])), int(rng.integers(grid.shape[1])))
+        table.set_cell(node, -1 if grid[node] != -1 else 0)
+        assert np.array_equal(table.masks, neighbor_masks(grid, corner_cutting=corner_cutting))
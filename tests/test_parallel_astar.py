@@ -0,0 +1,43 @@
+import numpy as np
+from astar import AStarAgentGrid, octile_distance
+from parallel_astar import ParallelAStarAgentGrid, parallel_efficiency
+from utils.compact_path import path_cost
+
+
+def test_costs_match_astar(grids):
+    for grid in grids[:4]:
+        goal_node = (grid.shape[0] - 1, grid.shape[1] - 1)
+        _, _, expected = AStarAgentGrid(octile_distance).search(grid, (0, 0), goal_node)
+        path, _, cost = ParallelAStarAgentGrid(octile_distance, workers=2).search(grid, (0, 0), goal_node)
+        if expected is None:
+            assert path is None and cost is None
+        else:
+            assert np.isclose(cost, expected)
+            assert np.isclose(path_cost(path, grid), expected)
+
+
+def test_small_batches_and_blocks_keep_costs_optimal(grids):
+    # many tiny messages make the workers expand far out of global f order
+    grid = grids[1]
+    goal_node = (grid.shape[0] - 1, grid.shape[1] - 1)
+    _, _, expected = AStarAgentGrid(octile_distance).search(grid, (0, 0), goal_node)
+    agent = ParallelAStarAgentGrid(octile_distance, workers=3, batch_size=1, block_size=2, path_format="packed")
+    path, _, cost = agent.search(grid, (0, 0), goal_node)
+    assert len(agent.worker_stats) == 3
+    if expected is None:
+        assert path is None and cost is None
+    else:
+        assert np.isclose(cost, expected)
+        assert np.isclose(path_cost(path, grid), expected)
+
+
+def test_blocked_endpoints_return_no_path():
+    grid = np.zeros((4, 4), dtype=np.int8)
+    grid[3, 3] = -1
+    assert ParallelAStarAgentGrid(octile_distance, workers=2).search(grid, (0, 0), (3, 3)) == (None, 0, None)
+
+
+def test_efficiency_report_matches_sequential_costs(grids):
+    records = parallel_efficiency(grids[0], (0, 0), (grids[0].shape[0] - 1, grids[0].shape[1] - 1), [1, 2])
+    assert [record["workers"] for record in records] == [0, 1, 2]
+    assert all(record["cost_match"] for record in records[1:])
@@ -0,0 +1,63 @@
+import numpy as np
+from astar import AStarAgentGrid, euclidean_distance, octile_distance
+from grid_search import GridSearch
+from utils.path_cache import CachedAgent, GridHash, PathCache, grid_content_hash
+
+
+def open_grid():
+    return np.zeros((8, 8), dtype=np.int8)
+
+
+def test_repeated_query_is_a_hit():
+    cache = PathCache()
+    agent = CachedAgent(lambda: AStarAgentGrid(octile_distance), cache)
+    grid = open_grid()
+    first = agent.search(grid, (0, 0), (7, 7))
+    second = agent.search(grid, (0, 0), (7, 7))
+    assert second == first
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_lambda_factories_do_not_share_entries():
+    cache = PathCache()
+    octile = CachedAgent(lambda: AStarAgentGrid(octile_distance), cache)
+    euclidean = CachedAgent(lambda: AStarAgentGrid(euclidean_distance), cache)
+    grid = open_grid()
+    grid[4, 1:] = -1
+    octile.search(grid, (0, 7), (7, 7))
+    euclidean.search(grid, (0, 7), (7, 7))
+    assert cache.misses == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PathCache(max_entries=2)
+    grid = open_grid()
+    for goal in ((7, 7), (7, 0), (0, 7)):
+        cache.put(("astar", 0, (0, 0), goal), [(0, 0), (1, 1)], 1, 1.0)
+    assert cache.evictions == 1
+    assert cache.get(("astar", 0, (0, 0), (7, 7))) is None
+    assert cache.get(("astar", 0, (0, 0), (0, 7))) is not None
+    assert cache.stats()["entries"] == 2
+
+
+def test_incremental_hash_matches_a_full_hash():
+    grid = open_grid()
+    grid_hash = GridHash(grid)
+    grid_hash.set_cell((3, 3), -1)
+    grid_hash.set_cell((4, 4), 5)
+    grid_hash.set_cell((3, 3), 0)
+    assert grid_hash.content == grid_content_hash(grid)
+
+
+def test_edits_through_set_cell_invalidate_cached_paths():
+    game = GridSearch((6, 6))
+    agent = CachedAgent(lambda: AStarAgentGrid(octile_distance))
+    path, _, _ = agent.search(game.grid, (0, 0), (5, 5))
+    assert (2, 2) in path
+    game.set_cell((2, 2), -1)
+    path, _, _ = agent.search(game.grid, (0, 0), (5, 5))
+    assert (2, 2) not in path
+    game.get_neighbor_table().set_cell((3, 3), -1)
+    path, _, _ = agent.search(game.grid, (0, 0), (5, 5))
+    assert (3, 3) not in path
+    assert game.get_grid_hash().content == grid_content_hash(game.grid)
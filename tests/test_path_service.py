@@ -0,0 +1,69 @@
+import asyncio
+import numpy as np
+import pytest
+from astar import AStarAgentGrid, octile_distance
+from path_service import PathService, PathServiceClient, solve_batch
+
+
+def wall_grid():
+    grid = np.zeros((10, 10), dtype=np.int8)
+    grid[5, :8] = -1
+    return grid
+
+
+def test_client_round_trip():
+    grid = wall_grid()
+    _, _, expected = AStarAgentGrid(octile_distance).search(grid, (0, 0), (9, 0))
+
+    async def session():
+        service = PathService(workers=2)
+        host, port = await service.start(port=0)
+        client = await PathServiceClient().connect(host=host, port=port)
+        try:
+            await client.load_map("wall", grid)
+            path, cost = await client.path("wall", (0, 0), (9, 0))
+            distance = await client.distance("wall", (0, 0), (9, 0), agent="ucs")
+            repeated = await client.path("wall", (0, 0), (9, 0))
+            with pytest.raises(RuntimeError, match="Unknown heuristic"):
+                await client.path("wall", (0, 0), (9, 0), heuristic="bogus")
+            stats = await client.stats()
+        finally:
+            await client.close()
+            await service.close()
+        return path, cost, distance, repeated, stats
+
+    path, cost, distance, repeated, stats = asyncio.run(session())
+    assert path[0] == (0, 0) and path[-1] == (9, 0)
+    assert np.isclose(cost, expected) and np.isclose(distance, expected)
+    assert repeated == (path, cost)
+    assert stats["cache"]["hits"] >= 1
+
+
+def test_bad_query_does_not_fail_its_batch():
+    results = solve_batch(wall_grid(), [
+        {"start": (0, 0), "goal": (9, 0), "heuristic": "octile"},
+        {"start": (0, 0), "goal": (9, 0), "heuristic": "bogus"},
+        {"start": (0, 0), "goal": (9, 0), "agent": "ucs"},
+    ])
+    assert isinstance(results[1], KeyError)
+    assert np.isclose(results[0]["cost"], results[2]["cost"])
+
+
+def test_unknown_names_are_rejected_before_batching():
+    async def session():
+        service = PathService(use_processes=False, batch_window=0.05)
+        service.load_map("wall", wall_grid())
+        try:
+            return await asyncio.gather(
+                service.query("wall", (0, 0), (9, 0), heuristic="octile"),
+                service.query("wall", (0, 0), (9, 0), heuristic="bogus"),
+                service.query("wall", (0, 0), (9, 0), agent="bfs"),
+                service.query("wall", (0, 0), (9, 0), heuristic="euclidean"),
+                return_exceptions=True,
+            )
+        finally:
+            await service.close()
+
+    octile, bogus, bfs, euclidean = asyncio.run(session())
+    assert isinstance(bogus, ValueError) and isinstance(bfs, ValueError)
+    assert np.isclose(octile["cost"], euclidean["cost"])
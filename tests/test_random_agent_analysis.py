@@ -0,0 +1,45 @@
+import random
+import numpy as np
+from random_agent import RandomAgent
+from random_agent_analysis import analyze_random_agent, expected_hitting_time, hitting_time_cdf
+
+
+def simulate(grid, initial_node, goal_node, runs, max_steps):
+    steps = []
+    for _ in range(runs):
+        node, count = initial_node, 0
+        while node != goal_node and count < max_steps:
+            node = RandomAgent.select_action_grid(grid, node)
+            count += 1
+        steps.append(count if node == goal_node else None)
+    return steps
+
+
+def test_expected_hitting_time_matches_simulation():
+    random.seed(0)
+    grid = np.zeros((4, 5), dtype=np.int8)
+    grid[1, 1:4] = -1
+    steps = simulate(grid, (0, 0), (3, 4), runs=4000, max_steps=10 ** 6)
+    expected = expected_hitting_time(grid, (0, 0), (3, 4))
+    # the standard error of the mean is about 1% here
+    assert abs(np.mean(steps) - expected) < 0.05 * expected
+
+
+def test_cdf_matches_simulated_success_rate():
+    random.seed(1)
+    grid = np.zeros((5, 5), dtype=np.int8)
+    grid[2, :4] = -1
+    steps = simulate(grid, (0, 0), (4, 0), runs=4000, max_steps=60)
+    cdf = hitting_time_cdf(grid, (0, 0), (4, 0), 60)
+    success = np.mean([s is not None for s in steps])
+    assert abs(success - cdf[-1]) < 0.03
+    assert np.all(np.diff(cdf) >= -1e-12)
+
+
+def test_unreachable_goal():
+    grid = np.zeros((3, 3), dtype=np.int8)
+    grid[:, 1] = -1
+    result = analyze_random_agent(grid, (0, 0), (0, 2), 50)
+    assert result["expected_steps"] == np.inf
+    assert result["success_probability"] == 0.0
+    assert result["expected_steps_when_successful"] is None
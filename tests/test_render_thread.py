@@ -0,0 +1,44 @@
+import threading
+import pytest
+from utils.render_thread import RenderLoop
+
+
+class EchoRenderer:
+    def update(self, current_node, new_visited=()):
+        return current_node, list(new_visited)
+
+
+def test_events_are_rendered_on_the_calling_thread():
+    frames, threads = [], []
+
+    def sink(frame):
+        frames.append(frame)
+        threads.append(threading.current_thread())
+
+    loop = RenderLoop(EchoRenderer(), sink)
+    loop.run(lambda display: [display.emit((0, i), [(0, i)]) for i in range(10)])
+    assert frames == [((0, i), [(0, i)]) for i in range(10)]
+    assert set(threads) == {threading.current_thread()}
+
+
+def test_dropped_events_keep_their_visited_cells():
+    visited = []
+    loop = RenderLoop(EchoRenderer(), lambda frame: visited.extend(frame[1]), maxsize=2)
+    # emit everything before rendering starts, so most events are dropped
+    for i in range(50):
+        loop.emit((0, i), [(0, i)])
+    loop.run(lambda display: None)
+    assert loop.frames_dropped > 0
+    assert sorted(visited) == [(0, i) for i in range(50)]
+
+
+def test_teardown_runs_when_the_sink_raises():
+    torn_down = []
+
+    def sink(frame):
+        raise RuntimeError("display failed")
+
+    loop = RenderLoop(EchoRenderer(), sink, maxsize=2, teardown=lambda: torn_down.append(True))
+    with pytest.raises(RuntimeError):
+        loop.run(lambda display: [display.emit((0, i)) for i in range(100)])
+    assert torn_down == [True]
@@ -0,0 +1,32 @@
+import numpy as np
+from astar import AStarAgentGrid, octile_distance
+from utils.search_trace import EXPANSION, PUSH, SearchTrace, expansion_batches
+
+
+def traced_search(record_pushes=False):
+    grid = np.zeros((12, 9), dtype=np.int8)
+    grid[5, 1:8] = -1
+    trace = SearchTrace(record_pushes=record_pushes, capacity=4)
+    _, nodes_expanded, _ = AStarAgentGrid(octile_distance, trace=trace).search(grid, (0, 0), (11, 8))
+    return trace, nodes_expanded
+
+
+def test_expansions_are_recorded_in_order():
+    trace, nodes_expanded = traced_search(record_pushes=True)
+    expanded = trace.expanded_nodes()
+    assert len(expanded) == nodes_expanded
+    assert expanded[0] == (0, 0) and expanded[-1] == (11, 8)
+    assert len(trace.records(PUSH)) > 0
+    assert sum(len(batch) for batch in expansion_batches(trace, 5)) == nodes_expanded
+
+
+def test_save_load_round_trip(tmp_path):
+    trace, _ = traced_search(record_pushes=True)
+    saved = trace.save(tmp_path / "trace.npy")
+    assert saved == str(tmp_path / "trace.npz")
+    loaded = SearchTrace.load(saved)
+    assert loaded.grid_shape == (12, 9)
+    assert loaded.record_pushes
+    assert loaded.expanded_nodes() == trace.expanded_nodes()
+    assert np.array_equal(loaded.records(), trace.records())
+    assert len(loaded.records(EXPANSION)) == len(trace.records(EXPANSION))
@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+from scipy import stats
+from utils.sequential_sampling import SequentialStopper, confidence_interval
+from utils.streaming_stats import MetricAggregator
+
+
+def test_confidence_interval_matches_scipy():
+    values = np.random.default_rng(0).normal(10, 2, size=30)
+    mean, width = confidence_interval(values)
+    low, high = stats.t.interval(0.95, len(values) - 1, loc=values.mean(), scale=stats.sem(values))
+    assert np.isclose(mean, values.mean())
+    assert np.isclose(width, (high - low) / 2)
+    assert confidence_interval([1.0]) == (1.0, math.inf)
+
+
+def test_identical_runs_stop_at_min_runs():
+    stopper = SequentialStopper(["cost"], min_runs=5, max_runs=50)
+    aggregator = MetricAggregator(["cost"])
+    runs = 0
+    while not stopper.should_stop(aggregator):
+        aggregator.add({"cost": 3.0})
+        runs += 1
+    assert runs == 5
+
+
+def test_noisy_runs_stop_once_the_interval_is_narrow():
+    rng = np.random.default_rng(1)
+    stopper = SequentialStopper(["cost", "time"], target_relative_width=0.05, max_runs=1000)
+    aggregator = MetricAggregator(["cost", "time"])
+    while not stopper.should_stop(aggregator):
+        aggregator.add({"cost": rng.normal(10, 2), "time": None})
+    assert 10 < aggregator.runs < 1000
+    precision = stopper.precision(aggregator)
+    assert set(precision) == {"cost"}  # time was never measured
+    assert precision["cost"]["relative_half_width"] <= 0.05
+
+
+def test_max_runs_caps_a_metric_that_never_converges():
+    stopper = SequentialStopper(["cost"], target_relative_width=1e-9, min_runs=2, max_runs=20)
+    first, second = MetricAggregator(["cost"]), MetricAggregator(["cost"])
+    rng = np.random.default_rng(2)
+    while not stopper.should_stop(first, second):
+        first.add({"cost": rng.normal(10, 2)})
+        second.add({"cost": rng.normal(10, 2)})
+    assert first.runs == second.runs == 20
@@ -0,0 +1,42 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from utils import shared_grid
+from utils.shared_grid import SharedGrid, attach_grid, block_exists, detach_grid, grid_array
+
+
+def attached_blocks(spec):
+    attach_grid(spec)
+    return len(shared_grid.attached)
+
+
+def test_attach_returns_the_published_arrays():
+    grid = np.arange(12, dtype=np.int8).reshape(3, 4)
+    with SharedGrid(grid, distances=grid * 0.5) as shared:
+        views = attach_grid(shared.spec)
+        assert np.array_equal(views["grid"], grid)
+        assert np.array_equal(views["distances"], grid * 0.5)
+        assert np.array_equal(grid_array(shared.spec), grid)
+        assert grid_array(shared) is shared.grid
+        detach_grid(shared.spec)
+        assert not any(name in shared_grid.attached for name, _, _ in shared.spec.values())
+    assert not block_exists(shared.spec["grid"][0])
+
+
+def test_unlinked_blocks_are_dropped_on_the_next_attach():
+    first = SharedGrid(np.zeros((4, 4), dtype=np.int8))
+    attach_grid(first.spec)
+    first.close()
+    with SharedGrid(np.ones((4, 4), dtype=np.int8)) as second:
+        attach_grid(second.spec)
+        assert first.spec["grid"][0] not in shared_grid.attached
+        detach_grid(second.spec)
+
+
+def test_workers_keep_only_live_blocks():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        counts = []
+        for i in range(10):
+            with SharedGrid(np.full((8, 8), i, dtype=np.int8), distances=np.zeros((8, 8))) as shared:
+                counts.append(executor.submit(attached_blocks, shared.spec).result())
+    assert max(counts) <= 2
@@ -0,0 +1,29 @@
+import numpy as np
+from astar import AStarAgentGrid, octile_distance
+from conftest import random_grid
+from sma_star import SMAStarAgentGrid
+
+
+def test_optimal_when_budget_fits_the_path():
+    # a budget of the optimal depth plus two once failed on solvable grids
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        n = int(rng.integers(5, 11))
+        grid = random_grid(rng, (n, n))
+        goal_node = (n - 1, n - 1)
+        path, _, cost = AStarAgentGrid(octile_distance).search(grid, (0, 0), goal_node)
+        if cost is None:
+            continue
+        agent = SMAStarAgentGrid(octile_distance, max_nodes=len(path) + 1)
+        _, _, sma_cost = agent.search(grid, (0, 0), goal_node)
+        assert sma_cost is not None and np.isclose(sma_cost, cost)
+
+
+def test_gives_up_at_the_expansion_cap():
+    # the path around the wall needs 30 moves: a budget of 32 thrashes
+    grid = np.zeros((16, 16), dtype=np.int8)
+    grid[8, 1:] = -1
+    agent = SMAStarAgentGrid(octile_distance, max_nodes=32, max_expansions=500)
+    path, nodes_expanded, cost = agent.search(grid, (0, 15), (15, 15))
+    assert path is None and cost is None and agent.capped
+    assert nodes_expanded == 500
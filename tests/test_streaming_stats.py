@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+from utils.streaming_stats import MetricAggregator, QuantileSketch, StreamingStats
+
+
+def stats_of(values):
+    stats = StreamingStats()
+    for value in values:
+        stats.add(value)
+    return stats
+
+
+def test_moments_and_extremes_match_numpy():
+    values = np.random.default_rng(0).lognormal(3, 1, size=2000)
+    stats = stats_of(values)
+    assert stats.count == len(values)
+    assert np.isclose(stats.mean, values.mean())
+    assert np.isclose(stats.std, values.std(ddof=1))
+    assert stats.min == values.min() and stats.max == values.max()
+
+
+def test_quantiles_within_the_relative_accuracy():
+    values = np.random.default_rng(1).lognormal(3, 2, size=5000)
+    values[:100] = 0.0
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+    for q in (0.0, 0.01, 0.1, 0.5, 0.9, 0.99, 1.0):
+        expected = np.quantile(values, q, method="lower")
+        assert abs(sketch.quantile(q) - expected) <= 0.01 * expected + 1e-12
+
+
+def test_merge_equals_the_combined_stream():
+    rng = np.random.default_rng(2)
+    parts = [rng.exponential(10, size=size) for size in (1, 300, 1000)]
+    merged = StreamingStats()
+    for part in parts:
+        merged.merge(stats_of(part))
+    merged.merge(StreamingStats())
+    combined = stats_of(np.concatenate(parts))
+    assert merged.count == combined.count
+    assert np.isclose(merged.mean, combined.mean)
+    assert np.isclose(merged.variance, combined.variance)
+    assert merged.min == combined.min and merged.max == combined.max
+    assert merged.sketch.buckets == combined.sketch.buckets
+    for q in (0.1, 0.5, 0.99):
+        assert merged.quantile(q) == combined.quantile(q)
+
+
+def test_state_survives_json():
+    stats = stats_of(np.random.default_rng(3).normal(50, 5, size=200))
+    restored = StreamingStats.from_dict(json.loads(json.dumps(stats.to_dict())))
+    assert restored.summary() == stats.summary()
+
+
+def test_aggregator_skips_missing_metrics():
+    first, second = MetricAggregator(["cost", "time"]), MetricAggregator(["cost", "time"])
+    first.add({"cost": 1.0, "time": None})
+    second.add({"cost": 3.0})
+    first.merge(second)
+    assert first.runs == 2 and first.mean("cost") == 2.0
+    assert set(first.summary()) == {"cost"}
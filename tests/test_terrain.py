@@ -0,0 +1,30 @@
+import numpy as np
+from astar import AStarAgentGrid, octile_distance
+from terrain import COST_SCALE, terrain_weights
+from ucs import UCSAgentGrid
+from utils.compact_path import path_cost
+
+
+def test_integer_and_float_costs_agree_on_weighted_terrain(grids):
+    for grid in grids:
+        goal_node = (grid.shape[0] - 1, grid.shape[1] - 1)
+        _, _, float_ucs = UCSAgentGrid().search(grid, (0, 0), goal_node)
+        integer_path, _, integer_ucs = UCSAgentGrid(integer_costs=True).search(grid, (0, 0), goal_node)
+        _, _, float_astar = AStarAgentGrid(octile_distance).search(grid, (0, 0), goal_node)
+        _, _, integer_astar = AStarAgentGrid(octile_distance, integer_costs=True).search(grid, (0, 0), goal_node)
+        if float_ucs is None:
+            assert integer_ucs is None and float_astar is None and integer_astar is None
+            continue
+        # integer costs are exact, so A* and UCS agree to the last unit
+        assert integer_astar == integer_ucs
+        assert np.isclose(float_astar, float_ucs)
+        # diagonal steps are sqrt(2) rounded down to 1/COST_SCALE
+        assert abs(integer_ucs - float_ucs) <= float_ucs / COST_SCALE
+        assert np.isclose(path_cost(integer_path, grid), float_ucs, rtol=1 / COST_SCALE)
+
+
+def test_weights_multiply_the_step_cost():
+    grid = np.array([[0, 5, 0]], dtype=np.int8)
+    assert terrain_weights(grid).tolist() == [[1, 5, 1]]
+    _, _, cost = UCSAgentGrid().search(grid, (0, 0), (0, 2))
+    assert cost == 6
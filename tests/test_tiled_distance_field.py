@@ -0,0 +1,17 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from distance_field import distance_field
+from tiled_distance_field import tiled_distance_field
+
+
+def test_small_tiles_match_the_serial_field(grids):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        for grid in grids[:4]:
+            for reverse in (False, True):
+                serial = distance_field(grid, (0, 0), reverse=reverse)
+                tiled, stats = tiled_distance_field(grid, (0, 0), reverse=reverse, tile_size=4, executor=executor)
+                assert stats["tiles"] > 1
+                assert np.array_equal(np.isfinite(serial), np.isfinite(tiled))
+                reachable = np.isfinite(serial)
+                assert np.allclose(serial[reachable], tiled[reachable])
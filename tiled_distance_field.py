@@ -0,0 +1,177 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from distance_field import distance_field, relax_to_convergence
+from utils.shared_grid import SharedGrid, attach_grid
+
+
+def tile_bounds(shape, tile_size):
+    """
+    Splits a grid shape into tiles.
+
+    Returns:
+        dict: (tile row, tile col) -> (row slice, col slice) of the tile.
+    """
+    rows, cols = shape
+    return {
+        (i, j): (slice(r, min(r + tile_size, rows)), slice(c, min(c + tile_size, cols)))
+        for i, r in enumerate(range(0, rows, tile_size))
+        for j, c in enumerate(range(0, cols, tile_size))
+    }
+
+
+def halo_slices(bounds, shape):
+    """Extends the slices of a tile by its one-cell halo, clipped to the grid."""
+    row_slice, col_slice = bounds
+    return (slice(max(row_slice.start - 1, 0), min(row_slice.stop + 1, shape[0])),
+            slice(max(col_slice.start - 1, 0), min(col_slice.stop + 1, shape[1])))
+
+
+def relax_tile(spec, block, interior, reverse=False):
+    """
+    Relaxes one tile together with its halo; runs inside a worker process.
+
+    The grid and the distance field live in shared memory (see SharedGrid):
+    the worker reads its block and writes the relaxed interior back in place,
+    so only the slices travel between processes. The halo cells carry the
+    current distances of the neighboring tiles and act as seeds, so paths
+    entering the tile from any side are accounted for. The interior is
+    already consistent with the previous halo values, so only the halo and
+    the sources (distance 0) are seeded.
+
+    Args:
+        spec (dict): SharedGrid spec holding "grid" and "distances".
+        block (tuple): slices of the tile including its halo.
+        interior (tuple): slices of the tile inside the block.
+        reverse (bool): see distance_field.
+
+    Returns:
+        tuple: (True if the border of the tile improved, iterations)
+    """
+    shared = attach_grid(spec)
+    distance_block = shared["distances"][block].copy()
+    seeds = np.ones(distance_block.shape, dtype=bool)
+    seeds[interior] = distance_block[interior] == 0
+    previous_border = border(distance_block[interior])
+    iterations = relax_to_convergence(distance_block, shared["grid"][block], reverse=reverse, seeds=seeds)
+    shared["distances"][block][interior] = distance_block[interior]
+    return not np.array_equal(border(distance_block[interior]), previous_border), iterations
+
+
+def border(block):
+    """Returns the outer ring of a 2D block as a flat array."""
+    if block.shape[0] <= 2 or block.shape[1] <= 2:
+        return block.ravel()
+    return np.concatenate([block[0], block[-1], block[1:-1, 0], block[1:-1, -1]])
+
+
+def tiled_distance_field(grid, sources, reverse=False, tile_size=1024, workers=None, executor=None):
+    """
+    Shortest-path costs from the source cell(s) to every cell, computed tile
+    by tile in parallel worker processes.
+
+    Every round relaxes the dirty tiles independently (Jacobi style), each
+    seeded with the current values of its one-cell halo. A tile whose border
+    improved marks its 8 neighbors dirty for the next round; the field has
+    converged once no tile is dirty. Distances only ever decrease and every
+    cell then satisfies the Bellman equations, so the result equals
+    distance_field().
+
+    Args:
+        grid (np.ndarray): The grid.
+        sources (tuple or list[tuple]): one (row, col) or a list of them.
+        reverse (bool): True computes the cost-to-go field of the sources.
+        tile_size (int): side length of the tiles.
+        workers (int): number of worker processes (default: os.cpu_count()).
+        executor (concurrent.futures.Executor): reuses an existing pool
+                                                instead of starting one.
+
+    Returns:
+        tuple: (float array of costs, np.inf where unreachable,
+                stats dict with rounds, tile solves and relaxation iterations)
+    """
+    started = time.perf_counter()
+    distances = np.full(grid.shape, np.inf)
+    if isinstance(sources, tuple):
+        sources = [sources]
+    for node in sources:
+        if grid[node] != -1:
+            distances[node] = 0.0
+
+    tiles = tile_bounds(grid.shape, tile_size)
+    dirty = {(node[0] // tile_size, node[1] // tile_size) for node in sources if grid[node] != -1}
+    stats = {"tiles": len(tiles), "rounds": 0, "tile_solves": 0, "iterations": 0}
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+    shared = SharedGrid(grid, distances=distances)
+    try:
+        while dirty:
+            stats["rounds"] += 1
+            futures = {}
+            for tile in dirty:
+                block = halo_slices(tiles[tile], grid.shape)
+                interior = tuple(slice(inner.start - outer.start, inner.stop - outer.start)
+                                 for inner, outer in zip(tiles[tile], block))
+                futures[tile] = executor.submit(relax_tile, shared.spec, block, interior, reverse)
+
+            dirty = set()
+            for (i, j), future in futures.items():
+                border_changed, iterations = future.result()
+                stats["tile_solves"] += 1
+                stats["iterations"] += iterations
+                if border_changed:
+                    for di in (-1, 0, 1):
+                        for dj in (-1, 0, 1):
+                            if (di or dj) and (i + di, j + dj) in tiles:
+                                dirty.add((i + di, j + dj))
+        distances = shared.tables["distances"].copy()
+    finally:
+        shared.close()
+        if own_executor:
+            executor.shutdown()
+
+    stats["elapsed"] = time.perf_counter() - started
+    return distances, stats
+
+
+def compare_with_serial(grid, sources, reverse=False, tile_size=1024, workers=None):
+    """
+    Times the tiled engine against the serial distance_field().
+
+    Returns:
+        dict: the tiled stats plus serial_elapsed, speedup and whether both
+              fields agree.
+    """
+    started = time.perf_counter()
+    serial = distance_field(grid, sources, reverse=reverse)
+    serial_elapsed = time.perf_counter() - started
+
+    tiled, stats = tiled_distance_field(grid, sources, reverse=reverse, tile_size=tile_size, workers=workers)
+    stats["workers"] = workers or os.cpu_count()
+    stats["serial_elapsed"] = serial_elapsed
+    stats["speedup"] = serial_elapsed / stats["elapsed"] if stats["elapsed"] > 0 else float("inf")
+    reachable = np.isfinite(serial)
+    difference = np.abs(serial[reachable] - tiled[reachable])
+    stats["max_difference"] = float(difference.max()) if difference.size else 0.0
+    stats["matches"] = bool(np.array_equal(reachable, np.isfinite(tiled))
+                            and np.allclose(serial[reachable], tiled[reachable]))
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiled multi-process distance field")
+    parser.add_argument("--size", type=int, default=4096, help="side length of the random grid")
+    parser.add_argument("--difficulty", type=int, default=30, help="percentage of blocked cells")
+    parser.add_argument("--tile-size", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    # GridSearch places obstacles one at a time, far too slowly for huge maps
+    grid = np.where(np.random.rand(args.size, args.size) < args.difficulty / 100, -1, 0).astype(np.int8)
+    goal_node = (args.size - 1, args.size - 1)
+    grid[goal_node] = 0
+    print(compare_with_serial(grid, goal_node, reverse=True, tile_size=args.tile_size, workers=args.workers))
@@ -1,6 +1,10 @@
 import random
 import heapq
-import numpy as np
+from terrain import COST_SCALE
+from utils.bucket_queue import MonotoneBucketQueue
+from utils.compact_path import format_path
+from utils.neighbor_masks import NeighborTable
+from utils.shared_grid import grid_array
 
 class UCSAgentGrid:
     """Agent for solving the GridSearch problem using Uniform-Cost Search (UCS).
@@ -10,14 +14,34 @@ class UCSAgentGrid:
     finds the shortest path from the initial node to the goal node.
     """
 
-    def __init__(self):
-        """Initializing with necessary data structures."""
+    def __init__(self, trace=None, integer_costs=False, path_format="list",
+                 connectivity=8, corner_cutting="allow", neighbor_table=None):
+        """Initializing with necessary data structures.
+
+        Args:
+            trace (SearchTrace): optional recorder of the expansion order.
+            integer_costs (bool): uses exact fixed-point integer costs and a
+                                  monotone bucket queue as the frontier.
+            path_format (str): "list" of tuples, "array" ((L, 2) int32) or
+                               "packed" (3-bit move codes, see utils.compact_path).
+            connectivity (int): 4 or 8 moves per cell.
+            corner_cutting (str): "allow", "no_squeeze" or "forbid" diagonal
+                                  moves past blocked cells (see utils.neighbor_masks).
+            neighbor_table (NeighborTable): precomputed move masks of the
+                                            searched grid; built per search otherwise.
+        """
         # priority queue to store nodes to be expanded
         self.frontier = [] # priority queue to store nodes to be expanded
         self.visited = set()  # set to track visited nodes
         self.nodes_expanded = 0  # counts the number of nodes expanded
         self.track_path_dict = {}  # dictionary to track the path to the goal
         self.track_cost_dict = {}  # cictionary to track the cost to reach each node
+        self.trace = trace  # optional SearchTrace recording the expansion order
+        self.integer_costs = integer_costs
+        self.path_format = path_format
+        self.connectivity = connectivity
+        self.corner_cutting = corner_cutting
+        self.neighbor_table = neighbor_table
 
     def search(self, grid, initial_node, goal_node) -> tuple:
         """Performs UCS on grid search
@@ -29,6 +53,15 @@ class UCSAgentGrid:
         Returns:
             tuple: A tuple (path from initial node to goal node, number of nodes expanded)
         """
+        grid = grid_array(grid)  # a SharedGrid or its spec is searched in place
+        if self.integer_costs:
+            return self.search_integer_costs(grid, initial_node, goal_node)
+        neighbors_of = self.neighbor_table_for(grid).neighbors
+        trace = self.trace
+        if trace is not None:
+            trace.start(grid.shape)
+            trace.record_push(initial_node, 0, 0)
+
         # Initialize the frontier with the initial node and its initial cost(==0)
         heapq.heappush(self.frontier, (0, initial_node))
         self.track_path_dict[initial_node] = None
@@ -43,6 +76,8 @@ class UCSAgentGrid:
             if current_node not in self.visited:
                 self.nodes_expanded += 1
                 self.visited.add(current_node)  # keeps track of visited nodes
+                if trace is not None:
+                    trace.record_expansion(current_node, current_cost, current_cost)
 
                 # if goal reached then retrace the path
                 if current_node == goal_node:
@@ -51,7 +86,7 @@ class UCSAgentGrid:
                     return (path, self.nodes_expanded, total_cost)
 
             # Explore the neighbors of the current node
-                for neighbor, step_cost in self.get_neighbors(current_node, grid):
+                for neighbor, step_cost in neighbors_of(current_node):
                     new_cost = self.track_cost_dict[current_node] + step_cost
                     if (
                         neighbor not in self.track_cost_dict
@@ -60,49 +95,70 @@ class UCSAgentGrid:
                         self.track_cost_dict[neighbor] = new_cost
                         heapq.heappush(self.frontier, (new_cost, neighbor))
                         self.track_path_dict[neighbor] = current_node
+                        if trace is not None:
+                            trace.record_push(neighbor, new_cost, new_cost)
 
         return (None, self.nodes_expanded, None)  # None if no path found
 
-    def get_neighbors(self, node, grid) -> list[tuple]:
-        """
-        Finding all valid neighbors out of 8 possible neighbors
-        of a given node in the grid.
-
-        Args:
-            node (tuple): The current grid coordinates (row, col).
-            grid (np.ndarray): The grid
+    def search_integer_costs(self, grid, initial_node, goal_node) -> tuple:
+        """Performs UCS with integer costs in units of 1/COST_SCALE.
 
-        Returns:
-            list[tuple]: A list of valid neighbors in a tuple (position, cost to reach them)
+        The frontier is a MonotoneBucketQueue keyed by the integer cost; the
+        returned total cost is converted back to steps.
         """
-        directions = [
-            (-1, 0,1),
-            (1, 0,1),
-            (0, -1,1),
-            (0, 1,1),
-            (-1, -1,np.sqrt(2)),
-            (-1, 1,np.sqrt(2)),
-            (1, -1,np.sqrt(2)),
-            (1, 1,np.sqrt(2)),
-        ]
-        neighbors = []
-        rows, cols = grid.shape
-
-        for dx, dy, step_cost in directions:
-            x, y = node[0] + dx, node[1] + dy
-            if 0 <= x < rows and 0 <= y < cols and grid[x, y] != -1:
-                neighbors.append(((x, y), step_cost))
-
-        return neighbors
-
-    def reconstruct_path(self, goal_node) -> list[tuple]:
+        neighbors_of = self.neighbor_table_for(grid).neighbors_integer
+        trace = self.trace
+        if trace is not None:
+            trace.start(grid.shape)
+            trace.record_push(initial_node, 0, 0)
+
+        self.frontier = MonotoneBucketQueue()
+        self.frontier.push(0, initial_node)
+        self.track_path_dict[initial_node] = None
+        self.track_cost_dict[initial_node] = 0
+
+        while self.frontier:
+            current_cost, current_node = self.frontier.pop()
+            if current_node in self.visited:
+                continue
+            self.nodes_expanded += 1
+            self.visited.add(current_node)
+            if trace is not None:
+                trace.record_expansion(current_node, current_cost / COST_SCALE, current_cost / COST_SCALE)
+
+            if current_node == goal_node:
+                total_cost = self.track_cost_dict[goal_node] / COST_SCALE
+                return (self.reconstruct_path(goal_node), self.nodes_expanded, total_cost)
+
+            for neighbor, step_cost in neighbors_of(current_node):
+                new_cost = current_cost + step_cost
+                if (
+                    neighbor not in self.track_cost_dict
+                    or new_cost < self.track_cost_dict[neighbor]
+                ):
+                    self.track_cost_dict[neighbor] = new_cost
+                    self.frontier.push(new_cost, neighbor)
+                    self.track_path_dict[neighbor] = current_node
+                    if trace is not None:
+                        trace.record_push(neighbor, new_cost / COST_SCALE, new_cost / COST_SCALE)
+
+        return (None, self.nodes_expanded, None)
+
+    def neighbor_table_for(self, grid):
+        """Returns the given neighbor table, or builds one for the grid."""
+        if self.neighbor_table is not None:
+            return self.neighbor_table
+        return NeighborTable(grid, self.connectivity, self.corner_cutting)
+
+    def reconstruct_path(self, goal_node):
         """Retraces the path from the initial node to the goal node.
 
         Args:
             goal_node (tuple): The goal node coordinates.
 
         Returns:
-            list[tuple]: The path from the initial node to the goal node as a list of coordinates.
+            The path from the initial node to the goal node in self.path_format:
+            a list of coordinates, an (L, 2) int32 array or a PackedPath.
         """
         path = []
         current = goal_node
@@ -110,4 +166,4 @@ class UCSAgentGrid:
             path.append(current)
             current = self.track_path_dict.get(current)
         path.reverse()  # path from start to goal
-        return path
+        return format_path(path, self.path_format)
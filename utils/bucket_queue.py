@@ -0,0 +1,42 @@
+class MonotoneBucketQueue:
+    """
+    Monotone priority queue for non-negative integer keys (radix heap).
+
+    Items live in buckets indexed by the highest bit in which their key
+    differs from the last popped key, so push is a list append and every
+    item is moved between buckets at most O(log C) times. Keys must not be
+    smaller than the last popped key; a smaller key is raised to it, which
+    amounts to the pathmax rule when the queue is used as an A* frontier.
+    """
+
+    def __init__(self):
+        self.last = 0  # last popped key
+        self.buckets = [[] for _ in range(65)]
+        self.size = 0
+
+    def push(self, key, item):
+        """Adds an item with an integer key."""
+        if key < self.last:
+            key = self.last
+        self.buckets[(key ^ self.last).bit_length()].append((key, item))
+        self.size += 1
+
+    def pop(self):
+        """Removes and returns the (key, item) pair with the smallest key."""
+        if not self.buckets[0]:
+            index = 1
+            while not self.buckets[index]:
+                index += 1
+            bucket = self.buckets[index]
+            self.buckets[index] = []
+            self.last = min(bucket)[0]
+            for key, item in bucket:
+                self.buckets[(key ^ self.last).bit_length()].append((key, item))
+        self.size -= 1
+        return self.buckets[0].pop()
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return self.size > 0
@@ -0,0 +1,128 @@
+import numpy as np
+from terrain import terrain_weights
+
+# the 8 moves in the order the agents generate neighbors; a move's index is
+# its 3-bit code
+moves = np.array([(-1, 0), (1, 0), (0, -1), (0, 1),
+                  (-1, -1), (-1, 1), (1, -1), (1, 1)], dtype=np.int32)
+
+# (drow + 1) * 3 + (dcol + 1) -> move code, -1 for steps that are not moves
+code_of_step = np.full(9, -1, dtype=np.int8)
+code_of_step[(moves[:, 0] + 1) * 3 + moves[:, 1] + 1] = np.arange(len(moves))
+
+# path formats the agents can return
+path_formats = ("list", "array", "packed")
+
+
+
+class PackedPath:
+    """
+    A path as its start cell plus one 3-bit move code per step, packed 8 codes
+    into 3 bytes (codes is a uint8 array from np.packbits).
+
+    len() and iteration behave as for the list of cells it encodes, so code
+    counting or walking path cells works with every path format.
+    """
+
+    __slots__ = ("start", "codes", "num_moves")
+
+    def __init__(self, start, codes, num_moves):
+        self.start = start
+        self.codes = codes
+        self.num_moves = num_moves
+
+    def __len__(self):
+        return self.num_moves + 1
+
+    def __iter__(self):
+        return iter(array_to_path(decode_path(self)))
+
+    def __repr__(self):
+        return f"PackedPath(start={self.start}, num_moves={self.num_moves})"
+
+
+def path_to_array(path):
+    """Converts a list of (row, col) tuples (or an array) to an (L, 2) int32 array."""
+    return np.asarray(path, dtype=np.int32).reshape(-1, 2)
+
+
+def array_to_path(path_array):
+    """Converts an (L, 2) array back to a list of (row, col) tuples."""
+    return list(map(tuple, np.asarray(path_array).tolist()))
+
+
+def encode_path(path):
+    """
+    Packs a path into its start cell and 3-bit move codes.
+
+    Args:
+        path (list[tuple] or np.ndarray): consecutive 8-connected cells.
+
+    Returns:
+        PackedPath: the packed path.
+
+    Raises:
+        ValueError: if two consecutive cells are not neighbors.
+    """
+    path_array = path_to_array(path)
+    steps = np.diff(path_array, axis=0)
+    if np.any(np.abs(steps) > 1):
+        raise ValueError("Consecutive path cells must be neighbors")
+    codes = code_of_step[(steps[:, 0] + 1) * 3 + steps[:, 1] + 1]
+    if np.any(codes < 0):
+        raise ValueError("Path repeats a cell")
+    bits = (codes[:, None] >> np.array([2, 1, 0], dtype=np.int8)) & 1
+    return PackedPath(tuple(path_array[0].tolist()), np.packbits(bits.astype(np.uint8)), len(codes))
+
+
+def decode_path(packed):
+    """Unpacks a PackedPath into an (L, 2) int32 array of cells."""
+    bits = np.unpackbits(packed.codes)[:3 * packed.num_moves].reshape(-1, 3)
+    codes = bits @ np.array([4, 2, 1])
+    path_array = np.empty((packed.num_moves + 1, 2), dtype=np.int32)
+    path_array[0] = packed.start
+    path_array[1:] = packed.start + np.cumsum(moves[codes], axis=0)
+    return path_array
+
+
+def as_path_array(path):
+    """Returns any path representation (list, array or PackedPath) as an (L, 2) array."""
+    if isinstance(path, PackedPath):
+        return decode_path(path)
+    return path_to_array(path)
+
+
+def format_path(path, path_format):
+    """
+    Converts a list-of-tuples path into the requested format.
+
+    Args:
+        path (list[tuple]): the path, or None.
+        path_format (str): "list", "array" ((L, 2) int32) or "packed" (PackedPath).
+    """
+    if path is None or path_format == "list":
+        return path
+    if path_format == "array":
+        return path_to_array(path)
+    if path_format == "packed":
+        return encode_path(path)
+    raise ValueError(f"Unknown path format: {path_format}")
+
+
+def path_length(path):
+    """Geometric length of a path: 1 per orthogonal and sqrt(2) per diagonal move."""
+    steps = np.abs(np.diff(as_path_array(path), axis=0))
+    diagonal = np.count_nonzero(steps.sum(axis=1) == 2)
+    return (len(steps) - diagonal) + diagonal * np.sqrt(2)
+
+
+def path_cost(path, grid):
+    """
+    Cost of a path on a grid, as the agents compute it: every move costs its
+    length times the terrain weight of the cell it enters.
+    """
+    path_array = as_path_array(path)
+    steps = np.abs(np.diff(path_array, axis=0))
+    lengths = np.where(steps.sum(axis=1) == 2, np.sqrt(2), 1.0)
+    weights = terrain_weights(grid)[path_array[1:, 0], path_array[1:, 1]]
+    return float(np.sum(lengths * weights))
@@ -0,0 +1,159 @@
+import copy
+import numpy as np
+from terrain import DIAGONAL_COST, ORTHOGONAL_COST
+from utils.compact_path import moves
+from utils.path_cache import tracked_hash
+
+# diagonal moves between two blocked orthogonal cells ("squeezing") or past
+# any blocked corner can be forbidden
+corner_cutting_modes = ("allow", "no_squeeze", "forbid")
+
+
+def mask_move_lists(step_costs):
+    """Lists mask -> [(dx, dy, step cost)] of its set bits, in move order, for the 256 masks."""
+    return [
+        [(dx, dy, step_costs[code]) for code, (dx, dy) in enumerate(moves.tolist()) if mask >> code & 1]
+        for mask in range(256)
+    ]
+
+
+# built once per process and shared by every NeighborTable
+step_costs = [1 if dx == 0 or dy == 0 else np.sqrt(2) for dx, dy in moves.tolist()]
+move_lists = mask_move_lists(step_costs)
+integer_move_lists = mask_move_lists([ORTHOGONAL_COST if cost == 1 else DIAGONAL_COST for cost in step_costs])
+
+
+def neighbor_masks(grid, connectivity=8, corner_cutting="allow"):
+    """
+    Computes a uint8 bitmask of the legal moves of every cell in one
+    vectorized pass: bit k is set when move k of utils.compact_path.moves
+    leads to a free cell inside the grid. Blocked cells get 0.
+
+    Args:
+        grid (np.ndarray): The grid (-1 marks a blocked cell).
+        connectivity (int): 4 (orthogonal moves only) or 8.
+        corner_cutting (str): "allow" any diagonal move into a free cell,
+                              "no_squeeze" unless both orthogonal cells it
+                              passes are blocked, "forbid" unless both are free.
+
+    Returns:
+        np.ndarray: uint8 array of the grid's shape.
+    """
+    if connectivity not in (4, 8):
+        raise ValueError(f"connectivity must be 4 or 8, not {connectivity}")
+    if corner_cutting not in corner_cutting_modes:
+        raise ValueError(f"corner_cutting must be one of {corner_cutting_modes}, not {corner_cutting!r}")
+    rows, cols = grid.shape
+    free = np.zeros((rows + 2, cols + 2), dtype=bool)
+    free[1:-1, 1:-1] = grid != -1
+
+    def shifted(dx, dy):
+        # free[x + dx, y + dy] for every cell (x, y) of the grid
+        return free[1 + dx:rows + 1 + dx, 1 + dy:cols + 1 + dy]
+
+    masks = np.zeros(grid.shape, dtype=np.uint8)
+    for code, (dx, dy) in enumerate(moves.tolist()):
+        if dx and dy:
+            if connectivity == 4:
+                continue
+            legal = shifted(dx, dy)
+            if corner_cutting == "no_squeeze":
+                legal = legal & (shifted(dx, 0) | shifted(0, dy))
+            elif corner_cutting == "forbid":
+                legal = legal & shifted(dx, 0) & shifted(0, dy)
+        else:
+            legal = shifted(dx, dy)
+        masks |= legal.astype(np.uint8) << np.uint8(code)
+    masks[grid == -1] = 0
+    return masks
+
+
+class NeighborTable:
+    """
+    Per-cell legal-move bitmasks of a grid, for neighbor generation by table
+    lookup instead of bounds checks.
+
+    The moves of each of the 256 masks are listed once per process (the
+    module-level move_lists), so the neighbors of a cell are a lookup of its
+    mask and a loop over the set bits. Editing the grid through set_cell
+    keeps the masks current.
+
+    Attributes:
+        grid (np.ndarray): the grid the masks describe.
+        masks (np.ndarray): uint8 legal-move mask of every cell.
+    """
+
+    def __init__(self, grid, connectivity=8, corner_cutting="allow"):
+        self.grid = grid
+        self.connectivity = connectivity
+        self.corner_cutting = corner_cutting
+        self.masks = neighbor_masks(grid, connectivity, corner_cutting)
+        self.move_lists = move_lists
+        self.integer_move_lists = integer_move_lists
+
+    def neighbors(self, node):
+        """
+        Returns the legal neighbors of node as a list of (position, cost),
+        the cost being the step length times the terrain weight of the
+        entered cell (see terrain.py).
+        """
+        x, y = node
+        grid = self.grid
+        neighbors = []
+        for dx, dy, step_cost in self.move_lists[self.masks[x, y]]:
+            value = grid[x + dx, y + dy]
+            neighbors.append(((x + dx, y + dy), step_cost * int(value) if value > 1 else step_cost))
+        return neighbors
+
+    def neighbors_integer(self, node):
+        """Same as neighbors with exact integer step costs in units of 1/COST_SCALE."""
+        x, y = node
+        grid = self.grid
+        neighbors = []
+        for dx, dy, step_cost in self.integer_move_lists[self.masks[x, y]]:
+            value = int(grid[x + dx, y + dy])
+            neighbors.append(((x + dx, y + dy), step_cost * value if value > 1 else step_cost))
+        return neighbors
+
+    def neighbor_cells(self, node):
+        """Returns the legal neighbor positions of node, in move order."""
+        x, y = node
+        return [(x + dx, y + dy) for dx, dy, _ in self.move_lists[self.masks[x, y]]]
+
+    def restricted_to(self, cells):
+        """
+        Returns a copy of the table whose moves stay inside the cells marked
+        in a boolean mask (the move lists are shared, the masks copied).
+        """
+        rows, cols = cells.shape
+        padded = np.zeros((rows + 2, cols + 2), dtype=bool)
+        padded[1:-1, 1:-1] = cells
+        allowed = np.zeros(cells.shape, dtype=np.uint8)
+        for code, (dx, dy) in enumerate(moves.tolist()):
+            allowed |= padded[1 + dx:rows + 1 + dx, 1 + dy:cols + 1 + dy].astype(np.uint8) << np.uint8(code)
+        allowed[~cells] = 0
+        table = copy.copy(self)
+        table.masks = self.masks & allowed
+        return table
+
+    def set_cell(self, node, value):
+        """
+        Writes value into a grid cell and recomputes the masks of the cell
+        and its 8 neighbors, the only ones whose legal moves can change.
+        The content hash tracking the grid, if any, is updated too.
+        """
+        x, y = node
+        rows, cols = self.grid.shape
+        grid_hash = tracked_hash(self.grid)
+        if grid_hash is not None:
+            grid_hash.set_cell(node, value)
+        else:
+            self.grid[node] = value
+        # the masks of rows/cols x-1..x+1 depend on the cells up to 2 away
+        top, left = max(x - 2, 0), max(y - 2, 0)
+        window = neighbor_masks(self.grid[top:min(x + 3, rows), left:min(y + 3, cols)],
+                                self.connectivity, self.corner_cutting)
+        inner_rows = slice(max(x - 1, 0), min(x + 2, rows))
+        inner_cols = slice(max(y - 1, 0), min(y + 2, cols))
+        self.masks[inner_rows, inner_cols] = window[inner_rows.start - top:inner_rows.stop - top,
+                                                    inner_cols.start - left:inner_cols.stop - left]
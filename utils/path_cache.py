@@ -0,0 +1,216 @@
+import weakref
+from collections import OrderedDict
+import numpy as np
+from utils.compact_path import PackedPath, decode_path, encode_path
+
+
+def splitmix64(values):
+    """Vectorized splitmix64 finalizer, used to derive per-cell random keys."""
+    z = np.asarray(values, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    with np.errstate(over="ignore"):
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def cell_keys(cell_ids, values, seed=0):
+    """
+    Zobrist keys of cells holding the given values: one pseudo-random 64-bit
+    key per (cell, value) pair. Cells holding 0 (free) contribute nothing.
+    """
+    cell_ids = np.asarray(cell_ids, dtype=np.uint64)
+    values = np.asarray(values).astype(np.int64).astype(np.uint64) & np.uint64(0xFF)
+    keys = splitmix64(splitmix64(cell_ids ^ np.uint64(seed)) ^ values)
+    return np.where(values == 0, np.uint64(0), keys)
+
+
+def grid_content_hash(grid, seed=0):
+    """Zobrist hash of a whole grid: XOR of the keys of all non-free cells."""
+    cell_ids = np.flatnonzero(grid)
+    keys = cell_keys(cell_ids, grid.ravel()[cell_ids], seed)
+    return int(np.bitwise_xor.reduce(keys)) if len(keys) else 0
+
+
+class GridHash:
+    """
+    Incrementally maintained content hash of a grid.
+
+    Editing a cell through set_cell XORs the old key of the cell out and the
+    new one in, so the hash stays current in O(1) per edit.
+
+    Attributes:
+        value (int): the current 64-bit hash, also folding in the grid shape.
+    """
+
+    def __init__(self, grid, seed=0):
+        self.grid = grid
+        self.seed = seed
+        self.content = grid_content_hash(grid, seed)
+
+    @property
+    def value(self):
+        return self.content ^ int(splitmix64(self.grid.shape[0] * 1_000_003 + self.grid.shape[1]))
+
+    def set_cell(self, node, new_value):
+        """Writes new_value into the grid cell and updates the hash."""
+        cell_id = node[0] * self.grid.shape[1] + node[1]
+        old_key = int(cell_keys([cell_id], [self.grid[node]], self.seed)[0])
+        new_key = int(cell_keys([cell_id], [new_value], self.seed)[0])
+        self.grid[node] = new_value
+        self.content ^= old_key ^ new_key
+
+
+# id(grid) -> the GridHash kept current by every set_cell on that grid
+# (GridHash, NeighborTable, GridSearch); held weakly, by its users
+tracked_hashes = weakref.WeakValueDictionary()
+
+
+def tracked_hash(grid):
+    """Returns the GridHash tracking a grid object, or None if none does."""
+    grid_hash = tracked_hashes.get(id(grid))
+    if grid_hash is None or grid_hash.grid is not grid:
+        return None
+    return grid_hash
+
+
+def hash_for(grid):
+    """
+    Returns the GridHash tracking a grid object, hashing the grid only if
+    none does yet. Edits through any set_cell keep it current; direct writes
+    into the array are not seen.
+    """
+    grid_hash = tracked_hash(grid)
+    if grid_hash is None:
+        grid_hash = GridHash(grid)
+        tracked_hashes[id(grid)] = grid_hash
+    return grid_hash
+
+
+class PathCache:
+    """
+    LRU cache of search results keyed by (agent, grid hash, start, goal).
+
+    Paths are stored packed as 3-bit move codes (3/64 of the size of an
+    (L, 2) int32 array) and handed out as (L, 2) arrays. Entries are evicted
+    in least-recently-used order whenever the entry count or the stored
+    bytes exceed their limits.
+
+    Attributes:
+        hits, misses, evictions (int): cache statistics.
+        nbytes (int): memory held by the stored paths.
+    """
+
+    entry_overhead = 64  # rough per-entry cost of the key and bookkeeping
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns (path array or None, nodes_expanded, cost), or None on a miss."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        packed, nodes_expanded, cost = entry
+        return (None if packed is None else decode_path(packed)), nodes_expanded, cost
+
+    def put(self, key, path, nodes_expanded, cost):
+        """Stores a search result; path is a list of (row, col), an array, a PackedPath or None."""
+        if path is not None and not isinstance(path, PackedPath):
+            path = encode_path(path)
+        entry = (path, nodes_expanded, cost)
+        if key in self.entries:
+            self.nbytes -= self.entry_size(self.entries.pop(key))
+        self.entries[key] = entry
+        self.nbytes += self.entry_size(entry)
+        while self.entries and (len(self.entries) > self.max_entries or self.nbytes > self.max_bytes):
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= self.entry_size(evicted)
+            self.evictions += 1
+
+    def entry_size(self, entry):
+        """Bytes accounted for one stored entry."""
+        packed = entry[0]
+        return self.entry_overhead + (0 if packed is None else packed.codes.nbytes)
+
+    def clear(self):
+        """Drops every entry; statistics are kept."""
+        self.entries.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        """Returns the cache statistics as a dict."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CachedAgent:
+    """
+    Memoizing wrapper with the same search() contract as the agents.
+
+    A fresh agent is built by agent_factory for every miss, since the agents
+    keep per-search state. name distinguishes agents sharing one cache; by
+    default the factory object itself is used, so two lambdas never share
+    entries.
+
+    The GridHash of the most recently searched grid objects is kept (see
+    hash_for), so a repeated query on the same grid is a dictionary lookup
+    rather than a scan of the grid. Edits through GridSearch.set_cell,
+    NeighborTable.set_cell or GridHash.set_cell keep it current; a grid
+    written into directly must be searched with an explicit grid_hash.
+    """
+
+    max_grid_hashes = 16  # grid objects whose GridHash is kept alive
+
+    def __init__(self, agent_factory, cache=None, name=None):
+        self.agent_factory = agent_factory
+        self.cache = cache if cache is not None else PathCache()
+        self.name = name if name is not None else agent_factory
+        self.grid_hashes = OrderedDict()  # id(grid) -> GridHash, least recently used first
+
+    def hash_of(self, grid):
+        """Returns the GridHash of a grid object, hashing the grid only the first time."""
+        grid_hash = hash_for(grid)
+        self.grid_hashes[id(grid)] = grid_hash  # keeps it tracked while recently used
+        self.grid_hashes.move_to_end(id(grid))
+        while len(self.grid_hashes) > self.max_grid_hashes:
+            self.grid_hashes.popitem(last=False)
+        return grid_hash
+
+    def search(self, grid, initial_node, goal_node, grid_hash=None):
+        """
+        Returns the cached result of the search, running it on a miss.
+
+        Args:
+            grid_hash (int): optional precomputed hash (e.g. GridHash.value),
+                             otherwise the one kept by hash_of(grid).
+
+        Returns:
+            tuple: (path as a list of tuples, nodes expanded, total cost)
+        """
+        if grid_hash is None:
+            grid_hash = self.hash_of(grid).value
+        key = (self.name, grid_hash, tuple(initial_node), tuple(goal_node))
+        entry = self.cache.get(key)
+        if entry is None:
+            path, nodes_expanded, cost = self.agent_factory().search(grid, initial_node, goal_node)
+            self.cache.put(key, path, nodes_expanded, cost)
+            return path, nodes_expanded, cost
+        path_array, nodes_expanded, cost = entry
+        path = None if path_array is None else list(map(tuple, path_array.tolist()))
+        return path, nodes_expanded, cost
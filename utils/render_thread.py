@@ -0,0 +1,114 @@
+import queue
+import threading
+from collections import namedtuple
+
+# state emitted by an agent: the node it is on and the cells visited since the last event
+RenderEvent = namedtuple("RenderEvent", ["current_node", "new_visited"])
+
+
+class RenderLoop:
+    """
+    Renders agent state events on the calling thread while the agent runs on
+    a worker thread, so search never waits for drawing or for the display.
+
+    GUI toolkits such as OpenCV HighGUI must run on the main thread (on
+    macOS in particular), so run() is meant to be called from the main
+    thread and the agent is the one moved to a background thread.
+
+    The agent emits RenderEvents into a bounded queue and continues
+    immediately. When the queue is full the oldest pending event is dropped:
+    its visited cells are folded into the new event, so only intermediate
+    frames are lost, never explored cells.
+
+    Attributes:
+        frames_rendered (int): number of frames passed to the sink.
+        frames_dropped (int): number of events dropped under backpressure.
+    """
+
+    def __init__(self, renderer, sink, maxsize=256, setup=None, teardown=None):
+        """
+        Args:
+            renderer (GridRenderer): turns events into frames.
+            sink (callable): called with every rendered frame (display, video writer).
+            maxsize (int): capacity of the event queue.
+            setup (callable): called once on the render thread before the first frame.
+            teardown (callable): called once on the render thread after the last frame.
+        """
+        self.renderer = renderer
+        self.sink = sink
+        self.setup = setup
+        self.teardown = teardown
+        self.events = queue.Queue(maxsize)
+        self.rendering = False  # True while run() consumes events
+        self.frames_rendered = 0
+        self.frames_dropped = 0
+
+    def emit(self, current_node, new_visited=()):
+        """
+        Queues a state event without ever blocking the caller.
+        Meant to be called from a single producer thread.
+        """
+        event = RenderEvent(current_node, list(new_visited))
+        while True:
+            try:
+                self.events.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    dropped = self.events.get_nowait()
+                except queue.Empty:
+                    continue  # the consumer made room in the meantime
+                self.frames_dropped += 1
+                event = RenderEvent(current_node, dropped.new_visited + event.new_visited)
+
+    def close(self, poll_interval=0.1):
+        """
+        Ends the event stream. Returns without waiting if the render loop
+        has stopped (for example because the sink raised), so the producer
+        can never block on a queue nobody empties.
+        """
+        while self.rendering:
+            try:
+                self.events.put(None, timeout=poll_interval)
+                return
+            except queue.Full:
+                continue
+
+    def run(self, agent):
+        """
+        Runs agent(self) on a worker thread and renders the events it emits
+        on the calling thread until the agent returns.
+
+        Exceptions raised by the agent or by the sink are re-raised here.
+        """
+        errors = []
+
+        def work():
+            try:
+                agent(self)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                self.close()
+
+        worker = threading.Thread(target=work, daemon=True)
+        if self.setup:
+            self.setup()
+        self.rendering = True
+        try:
+            worker.start()
+            while True:
+                event = self.events.get()
+                if event is None:
+                    break
+                frame = self.renderer.update(event.current_node, event.new_visited)
+                self.sink(frame)
+                self.frames_rendered += 1
+        finally:
+            # the window and the video writer are released even if the sink raised
+            self.rendering = False
+            worker.join()
+            if self.teardown:
+                self.teardown()
+        if errors:
+            raise errors[0]
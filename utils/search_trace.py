@@ -0,0 +1,131 @@
+import os
+import numpy as np
+
+# kinds of recorded events
+EXPANSION = 0
+PUSH = 1
+
+trace_dtype = np.dtype([("cell", np.uint32), ("g", np.float32), ("f", np.float32), ("kind", np.uint8)])
+
+
+class SearchTrace:
+    """
+    Opt-in recorder of the expansion order of a search agent.
+
+    Every expansion (and, if record_pushes is set, every frontier push) is
+    appended as a packed uint32 cell id (row * cols + col) with float32 g and
+    f values into a growable structured array, 13 bytes per event instead of
+    a Python tuple per node.
+
+    Attributes:
+        grid_shape (tuple): shape of the searched grid, set by start().
+        size (int): number of recorded events.
+    """
+
+    def __init__(self, record_pushes=False, capacity=1024):
+        self.record_pushes = record_pushes
+        self.events = np.empty(capacity, dtype=trace_dtype)
+        self.size = 0
+        self.grid_shape = None
+
+    def start(self, grid_shape):
+        """Called by the agent at the start of a search; clears the trace."""
+        self.grid_shape = tuple(grid_shape)
+        self.size = 0
+
+    def append(self, node, g, f, kind):
+        """Appends one event, doubling the storage when it is full."""
+        if self.size == len(self.events):
+            grown = np.empty(2 * len(self.events), dtype=trace_dtype)
+            grown[:self.size] = self.events
+            self.events = grown
+        self.events[self.size] = (node[0] * self.grid_shape[1] + node[1], g, f, kind)
+        self.size += 1
+
+    def record_expansion(self, node, g, f):
+        """Records the expansion of node with its cost g and priority f."""
+        self.append(node, g, f, EXPANSION)
+
+    def record_push(self, node, g, f):
+        """Records a frontier push; ignored unless record_pushes is set."""
+        if self.record_pushes:
+            self.append(node, g, f, PUSH)
+
+    def records(self, kind=None):
+        """
+        Returns the recorded events as a structured array view.
+
+        Args:
+            kind (int): EXPANSION or PUSH to select one kind of event, None for all.
+        """
+        events = self.events[:self.size]
+        if kind is None:
+            return events
+        return events[events["kind"] == kind]
+
+    def nodes(self, kind=EXPANSION):
+        """Returns the (row, col) coordinates of the events as two int arrays."""
+        return np.divmod(self.records(kind)["cell"].astype(np.int64), self.grid_shape[1])
+
+    def expanded_nodes(self):
+        """Returns the expanded nodes in expansion order as a list of tuples."""
+        rows, cols = self.nodes(EXPANSION)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def __len__(self):
+        return self.size
+
+    def save(self, path):
+        """
+        Saves the events and the grid shape as an .npz archive.
+
+        A .npy extension is replaced by .npz and other names get .npz
+        appended, as np.savez does.
+
+        Returns:
+            str: the path actually written.
+        """
+        root, extension = os.path.splitext(os.fspath(path))
+        path = root + ".npz" if extension in (".npy", ".npz") else os.fspath(path) + ".npz"
+        np.savez(path, events=self.records(), grid_shape=np.asarray(self.grid_shape))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Loads a trace saved by save(), including the grid shape needed to decode the cell ids."""
+        trace = cls()
+        with np.load(path) as bundle:
+            trace.events = bundle["events"]
+            trace.grid_shape = tuple(bundle["grid_shape"].tolist())
+        trace.size = len(trace.events)
+        trace.record_pushes = bool(np.any(trace.events["kind"] == PUSH))
+        return trace
+
+
+def expansion_batches(trace, frames=None):
+    """
+    Splits the expanded nodes of a trace, in expansion order, into batches.
+
+    Args:
+        trace (SearchTrace): the recorded search.
+        frames (int): number of batches to spread the expansions over,
+                      None for one batch per expansion.
+
+    Yields:
+        list[tuple]: consecutive expanded nodes.
+    """
+    expanded = trace.expanded_nodes()
+    chunk = 1 if frames is None else max(1, -(-len(expanded) // frames))
+    for start in range(0, len(expanded), chunk):
+        yield expanded[start:start + chunk]
+
+
+def replay_trace(trace, renderer, frames=None):
+    """
+    Replays the expansions of a trace on a GridRenderer.
+
+    Yields:
+        np.ndarray: the rendered frames, the newest expanded node being current.
+    """
+    for batch in expansion_batches(trace, frames):
+        yield renderer.update(batch[-1], batch)
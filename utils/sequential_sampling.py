@@ -0,0 +1,93 @@
+import math
+import numpy as np
+
+
+def half_width(std, count, confidence=0.95):
+    """
+    Half width of the Student-t confidence interval of a mean estimated
+    from count values with sample standard deviation std (inf for fewer
+    than two values).
+    """
+    from scipy import stats  # slow to import, only needed by adaptive sweeps
+
+    if count < 2:
+        return math.inf
+    return float(stats.t.ppf(0.5 + confidence / 2, count - 1) * std / math.sqrt(count))
+
+
+def confidence_interval(values, confidence=0.95):
+    """
+    Student-t confidence interval of the mean of a sample.
+
+    Returns:
+        tuple: (mean, half width of the interval); the half width is inf for
+               fewer than two values.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return math.nan, math.inf
+    std = values.std(ddof=1) if len(values) > 1 else 0.0
+    return float(values.mean()), half_width(std, len(values), confidence)
+
+
+class SequentialStopper:
+    """
+    Sequential-sampling rule for experiment sweeps.
+
+    Runs continue until the confidence interval of the mean of every tracked
+    metric is narrower than target_relative_width (half width divided by the
+    mean), or until max_runs is reached. Identical runs (zero variance)
+    satisfy any target, so they stop after min_runs.
+    """
+
+    def __init__(self, metrics, target_relative_width=0.05, confidence=0.95, min_runs=10, max_runs=100):
+        """
+        Args:
+            metrics (list[str]): metrics to track; runs where a metric is None
+                                 (not applicable) do not count for it.
+            target_relative_width (float): required half width / |mean|.
+            confidence (float): confidence level of the intervals.
+            min_runs (int): runs made before the rule is first checked.
+            max_runs (int): cap on the number of runs.
+        """
+        self.metrics = metrics
+        self.target_relative_width = target_relative_width
+        self.confidence = confidence
+        self.min_runs = min_runs
+        self.max_runs = max_runs
+
+    def precision(self, aggregator):
+        """
+        Returns the achieved precision of every tracked metric of a
+        utils.streaming_stats.MetricAggregator as
+        {metric: {"mean", "half_width", "relative_half_width"}}.
+        """
+        precision = {}
+        for metric in self.metrics:
+            stats = aggregator.stats.get(metric)
+            if stats is None or not stats.count:
+                continue
+            mean, width = stats.mean, half_width(stats.std, stats.count, self.confidence)
+            if width == 0:
+                relative = 0.0
+            elif mean == 0 or math.isinf(width):
+                relative = math.inf
+            else:
+                relative = width / abs(mean)
+            precision[metric] = {"mean": mean, "half_width": width, "relative_half_width": relative}
+        return precision
+
+    def converged(self, aggregator):
+        """Returns True if every tracked metric meets the target width."""
+        return all(entry["relative_half_width"] <= self.target_relative_width
+                   for entry in self.precision(aggregator).values())
+
+    def should_stop(self, *aggregators):
+        """
+        Returns True once enough runs were made: the cap is reached, or after
+        min_runs every aggregator (one per agent) has converged.
+        """
+        runs_made = min(aggregator.runs for aggregator in aggregators)
+        if runs_made >= self.max_runs:
+            return True
+        return runs_made >= self.min_runs and all(self.converged(aggregator) for aggregator in aggregators)
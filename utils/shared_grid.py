@@ -0,0 +1,153 @@
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+
+# blocks attached by this process: block name -> (SharedMemory, array view)
+attached = {}
+
+
+def open_block(name):
+    """
+    Attaches to an existing shared memory block without taking ownership.
+
+    Before Python 3.13 attaching registers the block with the resource
+    tracker, which would unlink it when the worker exits, so registration
+    is skipped while attaching and only the publisher unlinks the block.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def block_exists(name):
+    """Returns True while the publisher has not unlinked the block."""
+    try:
+        block = open_block(name)
+    except FileNotFoundError:
+        return False
+    release(block)
+    return True
+
+
+def release(block):
+    """Closes a block; views still held elsewhere keep the mapping alive."""
+    try:
+        block.close()
+    except BufferError:
+        pass
+
+
+class SharedGrid:
+    """
+    A grid and its precomputed tables published once in shared memory.
+
+    Worker processes receive only the small spec (block names, shapes and
+    dtypes) and attach to the same memory by name with attach_grid(), so a
+    large grid is never pickled per task. The publisher owns the blocks and
+    unlinks them in close(), or on leaving a with block.
+
+    Attributes:
+        grid (np.ndarray): view of the shared grid.
+        tables (dict): name -> view of each shared table.
+        spec (dict): picklable description passed to the workers.
+    """
+
+    def __init__(self, grid, **tables):
+        """
+        Args:
+            grid (np.ndarray): The grid to publish.
+            **tables (np.ndarray): precomputed per-grid arrays (distance
+                                   fields, component labels, ...).
+        """
+        self.blocks = {}
+        self.views = {}
+        self.spec = {}
+        for key, array in {"grid": grid, **tables}.items():
+            self.publish(key, array)
+
+    def publish(self, key, array):
+        """Copies one array into a new shared memory block."""
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        view[...] = array
+        self.blocks[key] = block
+        self.views[key] = view
+        self.spec[key] = (block.name, array.shape, array.dtype.str)
+
+    @property
+    def grid(self):
+        return self.views["grid"]
+
+    @property
+    def tables(self):
+        return {key: view for key, view in self.views.items() if key != "grid"}
+
+    def close(self):
+        """Unlinks the shared blocks; the memory is freed once no view uses it."""
+        self.views.clear()
+        for block in self.blocks.values():
+            block.unlink()
+            release(block)
+        self.blocks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def drop_stale_blocks(keep=()):
+    """
+    Detaches the blocks that their publisher has unlinked (a reloaded map,
+    a finished tiled_distance_field call), so worker processes do not keep
+    their memory mapped for the life of the pool.
+    """
+    for name in list(attached):
+        if name not in keep and not block_exists(name):
+            block = attached.pop(name)[0]
+            release(block)
+
+
+def attach_grid(spec):
+    """
+    Returns the arrays of a SharedGrid spec as NumPy views ("grid" and the
+    tables). Each block is attached once per process and reused by later tasks.
+    Attaching a new block first detaches the blocks unlinked since.
+    """
+    names = [name for name, _, _ in spec.values()]
+    if any(name not in attached for name in names):
+        drop_stale_blocks(keep=names)
+    views = {}
+    for key, (name, shape, dtype) in spec.items():
+        if name not in attached:
+            block = open_block(name)
+            attached[name] = (block, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf))
+        views[key] = attached[name][1]
+    return views
+
+
+def detach_grid(spec):
+    """Closes this process's attachments to the blocks of a spec."""
+    for name, _, _ in spec.values():
+        if name in attached:
+            block = attached.pop(name)[0]
+            release(block)
+
+
+def grid_array(source):
+    """
+    Returns the grid array of a SharedGrid, a SharedGrid spec or a plain
+    array, so callers accept any of them.
+    """
+    if isinstance(source, SharedGrid):
+        return source.grid
+    if isinstance(source, dict):
+        return attach_grid(source)["grid"]
+    return source
@@ -0,0 +1,218 @@
+import math
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error (DDSketch-style).
+
+    A non-negative value v falls into the log-scale bucket
+    ceil(log(v) / log(gamma)) with gamma = (1 + a) / (1 - a); every
+    quantile is answered within a relative error a of a value of the
+    stream. Sketches with the same accuracy merge by adding their bucket
+    counts. At most max_buckets buckets are kept (the lowest ones are
+    collapsed), so memory stays constant however many values are added.
+    """
+
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}  # bucket index -> count
+        self.zero_count = 0  # values too small for a bucket (0 and below)
+        self.count = 0
+
+    def add(self, value, count=1):
+        """Records a value count times."""
+        self.count += count
+        if value <= 1e-12:
+            self.zero_count += count
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self.collapse()
+
+    def collapse(self):
+        """Merges the lowest buckets until max_buckets remain."""
+        indices = sorted(self.buckets)
+        excess = len(indices) - self.max_buckets
+        target = indices[excess]
+        for index in indices[:excess]:
+            self.buckets[target] += self.buckets.pop(index)
+
+    def merge(self, other):
+        """Adds the values of another sketch of the same accuracy."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative accuracy can be merged")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if len(self.buckets) > self.max_buckets:
+            self.collapse()
+
+    def quantile(self, q):
+        """Returns the approximate q-quantile (0 <= q <= 1), None if empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # the value of the bucket with the least relative error to both its bounds
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self):
+        """Returns the sketch as a JSON-friendly dict."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "zero_count": self.zero_count,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuilds a sketch written by to_dict."""
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch.buckets = {int(index): count for index, count in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = sketch.zero_count + sum(sketch.buckets.values())
+        return sketch
+
+
+class StreamingStats:
+    """
+    Running statistics of a metric in constant memory: count, mean and
+    variance (Welford's method), min, max and quantiles from a
+    QuantileSketch. Two instances merge exactly (Chan's parallel update for
+    the moments), e.g. to combine the statistics of worker processes.
+
+    Attributes:
+        count (int): values added.
+        mean (float): their mean (0.0 while empty).
+        min, max (float): their extremes (inf / -inf while empty).
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, value):
+        """Records one value."""
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.sketch.add(value)
+
+    def merge(self, other):
+        """Adds the values summarized by another StreamingStats."""
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def variance(self):
+        """Sample variance (0.0 with fewer than two values)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        """Sample standard deviation."""
+        return math.sqrt(self.variance)
+
+    def quantile(self, q):
+        """Returns the approximate q-quantile, clamped to [min, max]; None if empty."""
+        value = self.sketch.quantile(q)
+        if value is None:
+            return None
+        return min(max(value, self.min), self.max)
+
+    def summary(self):
+        """Returns count, mean, std, min, max, p50, p90 and p99 as a dict."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+    def to_dict(self):
+        """Returns the full state as a JSON-friendly dict (see from_dict)."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "sketch": self.sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuilds a StreamingStats written by to_dict, e.g. by another process."""
+        stats = cls()
+        stats.count, stats.mean, stats.m2 = data["count"], data["mean"], data["m2"]
+        if stats.count:
+            stats.min, stats.max = data["min"], data["max"]
+        stats.sketch = QuantileSketch.from_dict(data["sketch"])
+        return stats
+
+
+class MetricAggregator:
+    """
+    StreamingStats of several metrics, fed one run result (dict) at a time;
+    metrics a run does not have, or has as None, are skipped.
+    """
+
+    def __init__(self, metrics, relative_accuracy=0.01):
+        self.metrics = list(metrics)
+        self.stats = {metric: StreamingStats(relative_accuracy) for metric in self.metrics}
+        self.runs = 0
+
+    def add(self, run):
+        """Records the metrics of one run result."""
+        self.runs += 1
+        for metric, stats in self.stats.items():
+            value = run.get(metric)
+            if value is not None:
+                stats.add(value)
+
+    def merge(self, other):
+        """Adds the statistics of another aggregator over the same metrics."""
+        self.runs += other.runs
+        for metric, stats in other.stats.items():
+            self.stats[metric].merge(stats)
+
+    def mean(self, metric):
+        """Returns the mean of a metric (0.0 before any value)."""
+        return self.stats[metric].mean
+
+    def summary(self, metrics=None):
+        """Returns {metric: StreamingStats.summary()} for the tracked metrics (default: all) seen."""
+        return {metric: self.stats[metric].summary() for metric in metrics or self.metrics
+                if metric in self.stats and self.stats[metric].count}
@@ -1,3 +1,4 @@
+import os
 import random
 import time
 import cv2
@@ -57,35 +58,166 @@ def visualize_2048(grid, delay=300):
 
 def visualize_grid(grid, current_node, initial_node, goal_node, visited_nodes):
     """Visualize the grid search problem using OpenCV."""
-    cell_size = 50
-    img_size = (grid.shape[0] * cell_size, grid.shape[1] * cell_size,3)
-    img = np.zeros(img_size, dtype=np.uint8) *255
-    
-    for i in range(grid.shape[0]):
-        for j in range(grid.shape[1]):
-            color = (255, 255, 255) # empty cell - white color
-            center = (j * cell_size + cell_size // 2, i * cell_size + cell_size // 2)
-            
-            if grid[i,j] == -1:
-                bottom_right = ((j+1)*cell_size, (i+1)*cell_size)
-                top_left = (j*cell_size, i*cell_size)
-                cv2.rectangle(img, top_left, bottom_right, (0, 0, 0), -1)
+    renderer = GridRenderer(grid, initial_node, goal_node)
+    return renderer.render(current_node, visited_nodes)
+
+
+class GridRenderer:
+    """
+    Renders grid search frames from a cached background image.
+
+    The background (black canvas, blocked cells and white circles on the
+    free cells) is drawn once per grid. Every frame only repaints the cells
+    whose color changed, by writing the precomputed circle mask with NumPy
+    fancy indexing instead of calling cv2 for every cell.
+
+    Attributes:
+        frame (np.ndarray): the current BGR image, updated in place.
+    """
+
+    def __init__(self, grid, initial_node, goal_node, cell_size=50, radius=15):
+        self.grid = grid
+        self.initial_node = initial_node
+        self.goal_node = goal_node
+        self.cell_size = cell_size
+        self.current_node = None
+        self.visited = set()
+
+        # pixel offsets covered by a single cell's circle
+        patch = np.zeros((cell_size, cell_size), dtype=np.uint8)
+        cv2.circle(patch, (cell_size // 2, cell_size // 2), radius, 1, -1)
+        self.mask_rows, self.mask_cols = np.nonzero(patch)
+
+        # background: every free cell as a white circle, blocked cells stay black
+        self.cell_colors = np.zeros(grid.shape + (3,), dtype=np.uint8)
+        self.cell_colors[grid != -1] = (255, 255, 255)
+        for node in (initial_node, goal_node):
+            self.cell_colors[node] = self.cell_color(node)
+        tiles = np.zeros((grid.shape[0], cell_size, grid.shape[1], cell_size, 3), dtype=np.uint8)
+        for y in range(cell_size):
+            xs = np.flatnonzero(patch[y])
+            if len(xs):
+                # each row of the circle is one contiguous span of pixels
+                tiles[:, y, :, xs[0]:xs[-1] + 1] = self.cell_colors[:, :, None, :]
+        self.background = tiles.reshape(grid.shape[0] * cell_size, grid.shape[1] * cell_size, 3)
+        self.background_colors = self.cell_colors.copy()
+        self.frame = self.background.copy()
+
+    def cell_color(self, node):
+        """Returns the color of a free cell given the current render state."""
+        if node == self.initial_node:
+            return (0, 0, 255)  # initial node - red color
+        if node == self.goal_node:
+            if node == self.current_node:
+                return (255, 255, 0)  # cyan color when current becomes goal
+            return (0, 255, 0)  # green color for goal node
+        if node == self.current_node:
+            return (255, 0, 0)  # current node - blue color
+        if node in self.visited:
+            return (0, 165, 255)  # orange for visited nodes
+        return (255, 255, 255)  # empty cell - white color
+
+    def paint(self, nodes, color):
+        """Paints the circles of the given cells with one color."""
+        if not nodes:
+            return
+        cells = np.asarray(nodes, dtype=np.intp).reshape(-1, 2)
+        pixel_rows = cells[:, :1] * self.cell_size + self.mask_rows
+        pixel_cols = cells[:, 1:] * self.cell_size + self.mask_cols
+        self.frame[pixel_rows, pixel_cols] = color
+        self.cell_colors[cells[:, 0], cells[:, 1]] = color
+
+    def update(self, current_node, new_visited=()):
+        """
+        Moves the current node and marks new cells as visited, repainting
+        only the cells whose color changed.
+
+        Args:
+            current_node (tuple): the current node (row, col).
+            new_visited (iterable): cells visited since the previous frame.
+
+        Returns:
+            np.ndarray: the updated frame.
+        """
+        changed = {self.current_node, current_node}
+        for node in new_visited:
+            if node not in self.visited:
+                self.visited.add(node)
+                changed.add(node)
+        self.current_node = current_node
+        changed.discard(None)
+
+        by_color = {}
+        for node in changed:
+            if self.grid[node] == -1:
                 continue
-            
-            if (i,j) == initial_node:
-                color = (0, 0, 255) # initial node - red color
-            elif (i,j) == goal_node:
-                if (i,j) == current_node:
-                    color = (255, 255, 0) # cyan color when current becomes goal
-                else:
-                    color = (0, 255, 0) # green color for goal node
-            elif (i,j) == current_node:
-                color = (255, 0, 0) # current node - blue color
-            elif (i,j) in visited_nodes:
-                color = (0,165,255) # orange for visited nodes
-            cv2.circle(img, center, 15, color, -1)
-           
-    return img
+            color = self.cell_color(node)
+            if tuple(self.cell_colors[node]) != color:
+                by_color.setdefault(color, []).append(node)
+        for color, nodes in by_color.items():
+            self.paint(nodes, color)
+        return self.frame
+
+    def render(self, current_node, visited_nodes):
+        """
+        Renders a frame from the full set of visited nodes, as visualize_grid
+        does; only the nodes not seen before are painted.
+        """
+        return self.update(current_node, visited_nodes)
+
+    def reset(self):
+        """Restores the background image and clears the render state."""
+        self.current_node = None
+        self.visited = set()
+        self.cell_colors = self.background_colors.copy()
+        self.frame[...] = self.background
+
+
+class FrameWriter:
+    """
+    Streams rendered frames to a video file or an image sequence, without
+    opening any window.
+
+    A path ending in .mp4/.avi/.mkv is encoded with cv2.VideoWriter, any other
+    path is used as a directory of numbered PNG images.
+    """
+
+    video_codecs = {".mp4": "mp4v", ".avi": "MJPG", ".mkv": "XVID"}
+
+    def __init__(self, path, fps=2):
+        self.path = path
+        self.fps = fps
+        self.frame_count = 0
+        self.writer = None
+        extension = os.path.splitext(path)[1].lower()
+        self.codec = self.video_codecs.get(extension)
+        if self.codec is None:
+            os.makedirs(path, exist_ok=True)
+
+    def write(self, frame):
+        """Appends one frame."""
+        if self.codec is not None:
+            if self.writer is None:
+                height, width = frame.shape[:2]
+                self.writer = cv2.VideoWriter(
+                    self.path, cv2.VideoWriter_fourcc(*self.codec), self.fps, (width, height)
+                )
+            self.writer.write(frame)
+        else:
+            cv2.imwrite(os.path.join(self.path, f"frame_{self.frame_count:05d}.png"), frame)
+        self.frame_count += 1
+
+    def close(self):
+        """Finalizes the video file."""
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
 def visualize_puzzle8(grid, move_count, elapsed_time):
     cell_size = 100